@@ -0,0 +1,254 @@
+"""A local stand-in for the Todoist REST and Sync APIs used by the benchmarks.
+
+Only the endpoints heidi_todoist calls are implemented. Project size, page size, latency
+and error injection are configurable, and every request and byte is counted so a run can
+report HTTP calls and bytes transferred per completeTask.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = '/api/v1/'
+TIMESTAMP = '2025-01-01T00:00:00.000000Z'
+
+
+def task_payload(task_id: str, content: str, project_id: str, due: dict | None = None, child_order: int = 0) -> dict:
+    """Return a task in the shape the Todoist v1 API sends."""
+    return {
+        'id': task_id,
+        'content': content,
+        'description': '',
+        'project_id': project_id,
+        'section_id': None,
+        'parent_id': None,
+        'labels': [],
+        'priority': 1,
+        'due': due,
+        'deadline': None,
+        'duration': None,
+        'collapsed': False,
+        'child_order': child_order,
+        'responsible_uid': None,
+        'assigned_by_uid': None,
+        'completed_at': None,
+        'added_by_uid': 'user1',
+        'added_at': TIMESTAMP,
+        'updated_at': TIMESTAMP,
+        'checked': False,
+        'is_deleted': False
+    }
+
+
+def project_payload(project_id: str, name: str) -> dict:
+    """Return a project in the shape the Todoist v1 API sends."""
+    return {
+        'id': project_id,
+        'name': name,
+        'description': '',
+        'child_order': 0,
+        'color': 'grey',
+        'collapsed': False,
+        'shared': False,
+        'is_favorite': False,
+        'is_archived': False,
+        'can_assign_tasks': False,
+        'view_style': 'list',
+        'created_at': TIMESTAMP,
+        'updated_at': TIMESTAMP,
+        'parent_id': None,
+        'inbox_project': False
+    }
+
+
+class FakeTodoist:
+    """In-memory Todoist state plus request accounting."""
+
+    def __init__(self, project_id: str = 'benchproject', project_name: str = 'Heidi', project_size: int = 100,
+                 page_size: int = 50, latency_ms: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.project_id = project_id
+        self.project_name = project_name
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.tasks: dict[str, dict] = {}
+        self.changes: list[str] = []
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.errors_injected = 0
+        self.lock = threading.Lock()
+
+        for position in range(project_size):
+            self._insert(f'Task {position}')
+
+    def _insert(self, content: str, due: dict | None = None) -> dict:
+        task = task_payload(uuid.uuid4().hex[:16], content, self.project_id, due, len(self.tasks))
+        self.tasks[task['id']] = task
+        self.changes.append(task['id'])
+        return task
+
+    def content_at(self, position: int) -> str:
+        """Return the content of the open task at a position in project order."""
+        return list(self.tasks.values())[position]['content']
+
+    def counters(self) -> dict:
+        with self.lock:
+            return {'requests': self.requests, 'bytes': self.bytes_in + self.bytes_out,
+                    'errors_injected': self.errors_injected}
+
+    def _open_tasks(self) -> list[dict]:
+        return [task for task in self.tasks.values() if not task['checked']]
+
+    def _page(self, tasks: list[dict], query: dict) -> dict:
+        start = int(query.get('cursor', ['0'])[0] or 0)
+        page_size = int(query.get('limit', [self.page_size])[0])
+        end = start + page_size
+        return {'results': tasks[start:end], 'next_cursor': str(end) if end < len(tasks) else None}
+
+    def handle(self, method: str, path: str, query: dict, body: bytes) -> tuple[int, dict | None]:
+        """Apply one API request and return (status, JSON body)."""
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors_injected += 1
+            return 503, {'error': 'Injected failure'}
+
+        route = path[len(API_PREFIX):] if path.startswith(API_PREFIX) else path
+        parts = route.strip('/').split('/')
+
+        if method == 'GET' and route == 'tasks':
+            project_id = query.get('project_id', [None])[0]
+            tasks = [task for task in self._open_tasks() if project_id in (None, task['project_id'])]
+            return 200, self._page(tasks, query)
+
+        if method == 'GET' and route == 'tasks/filter':
+            search = query.get('query', [''])[0].split('search:', 1)[-1].strip().replace('\\', '').lower()
+            tasks = [task for task in self._open_tasks() if search in task['content'].lower()]
+            return 200, self._page(tasks, query)
+
+        if method == 'GET' and parts[0] == 'tasks' and len(parts) == 2:
+            task = self.tasks.get(parts[1])
+            return (200, task) if task and not task['checked'] else (404, None)
+
+        if method == 'GET' and route == 'projects':
+            return 200, {'results': [project_payload(self.project_id, self.project_name)], 'next_cursor': None}
+
+        if method == 'GET' and parts[0] == 'projects' and len(parts) == 2:
+            if parts[1] != self.project_id:
+                return 404, None
+            return 200, project_payload(self.project_id, self.project_name)
+
+        if method == 'POST' and route == 'tasks':
+            data = json.loads(body or b'{}')
+            due = {'date': data['due_datetime'], 'is_recurring': False, 'string': '', 'lang': 'en'} \
+                if 'due_datetime' in data else None
+            return 200, self._insert(data['content'], due)
+
+        if method == 'POST' and parts[0] == 'tasks' and len(parts) == 3 and parts[2] in ('close', 'reopen'):
+            task = self.tasks.get(parts[1])
+            if task is None or task['checked'] == (parts[2] == 'close'):
+                return 404, None
+            task['checked'] = parts[2] == 'close'
+            self.changes.append(task['id'])
+            return 204, None
+
+        if method == 'DELETE' and parts[0] == 'tasks' and len(parts) == 2:
+            task = self.tasks.pop(parts[1], None)
+            return (204, None) if task else (404, None)
+
+        if method == 'POST' and route == 'sync':
+            return 200, self._sync(parse_qs(body.decode()))
+
+        return 404, None
+
+    def _sync(self, form: dict) -> dict:
+        if 'commands' in form:
+            sync_status = {}
+            temp_id_mapping = {}
+            for command in json.loads(form['commands'][0]):
+                args = command['args']
+                if command['type'] == 'item_close':
+                    task = self.tasks.get(args['id'])
+                    if task is None or task['checked']:
+                        sync_status[command['uuid']] = {'error': 'Item not found', 'error_code': 22}
+                        continue
+                    task['checked'] = True
+                    self.changes.append(task['id'])
+                elif command['type'] == 'item_add':
+                    due = args.get('due')
+                    task = self._insert(args['content'], {'is_recurring': False, 'string': '', 'lang': 'en', **due} if due else None)
+                    temp_id_mapping[command['temp_id']] = task['id']
+                sync_status[command['uuid']] = 'ok'
+            return {'sync_status': sync_status, 'temp_id_mapping': temp_id_mapping, 'sync_token': str(len(self.changes))}
+
+        sync_token = form.get('sync_token', ['*'])[0]
+        if sync_token == '*':
+            items = list(self.tasks.values())
+        else:
+            changed = dict.fromkeys(self.changes[int(sync_token):])
+            items = [self.tasks[task_id] for task_id in changed if task_id in self.tasks]
+        return {'full_sync': sync_token == '*', 'items': items, 'sync_token': str(len(self.changes))}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: 'FakeTodoistServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        url = urlparse(self.path)
+        fake = self.server.fake
+
+        if fake.latency_ms:
+            time.sleep(fake.latency_ms / 1000)
+
+        with fake.lock:
+            status, payload = fake.handle(self.command, url.path, parse_qs(url.query), body)
+            response_body = json.dumps(payload).encode() if payload is not None else b''
+            fake.requests += 1
+            fake.bytes_in += len(self.requestline) + len(str(self.headers)) + len(body)
+            fake.bytes_out += len(response_body)
+
+        self.send_response(status)
+        if response_body:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response_body)))
+        self.end_headers()
+        self.wfile.write(response_body)
+
+    do_GET = _respond
+    do_POST = _respond
+    do_DELETE = _respond
+    do_HEAD = _respond
+
+
+class FakeTodoistServer(ThreadingHTTPServer):
+    """Threaded HTTP server for a FakeTodoist, listening on a free localhost port."""
+
+    daemon_threads = True
+
+    def __init__(self, fake: FakeTodoist):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.fake = fake
+        self.thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/'
+
+    def start(self) -> 'FakeTodoistServer':
+        self.thread = threading.Thread(target=self.serve_forever, name='fake-todoist', daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
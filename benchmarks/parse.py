@@ -0,0 +1,99 @@
+"""Parse time and memory benchmarks for task listing pages.
+
+Compares decoding pages into todoist_api_python Task models, as the SDK's get_tasks does,
+with decoding them into the compact TaskRecords the lookup path uses. Reports time per page
+and the memory held per decoded task.
+
+    python -m benchmarks.parse --tasks 2000 --page-size 200
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from todoist_api_python.models import Task
+
+from benchmarks.fake_todoist import task_payload
+from heidi_todoist.records import parse_task_page
+
+
+def _sdk_parse(body: bytes) -> list:
+    return [Task.from_dict(task) for task in json.loads(body)['results']]
+
+
+def _records_parse(body: bytes) -> list:
+    return parse_task_page(body)[0]
+
+
+PARSERS = {'sdk': _sdk_parse, 'records': _records_parse}
+
+
+def _pages(tasks: int, page_size: int) -> list[bytes]:
+    """Return task listing pages as Todoist sends them, with due dates on every other task."""
+    payloads = [
+        task_payload(f'task{i}', f'Task {i}', 'benchproject',
+                     due={'date': '2025-01-01T08:30:00', 'string': 'Jan 1 8:30am', 'lang': 'en',
+                          'is_recurring': False, 'timezone': None} if i % 2 else None, child_order=i)
+        for i in range(tasks)
+    ]
+    return [
+        json.dumps({'results': payloads[start:start + page_size], 'next_cursor': None}).encode()
+        for start in range(0, tasks, page_size)
+    ]
+
+
+def _bytes_held(parse, pages: list[bytes]) -> int:
+    """Return the memory still allocated once every page has been decoded and kept."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        decoded = [parse(body) for body in pages]
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del decoded
+    return held
+
+
+def run_parse_benchmark(tasks: int = 2000, page_size: int = 200, repeat: int = 5) -> dict:
+    """Decode the same pages with each parser and return time per page and bytes per task."""
+    pages = _pages(tasks, page_size)
+    results = {'tasks': tasks, 'page_size': page_size, 'pages': len(pages)}
+
+    for name, parse in PARSERS.items():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for body in pages:
+                parse(body)
+            best = min(best, time.perf_counter() - started)
+
+        results[f'{name}_ms_per_page'] = best * 1000 / len(pages)
+        results[f'{name}_bytes_per_task'] = _bytes_held(parse, pages) / tasks
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5, help='Timed passes over the pages; the fastest is reported')
+    parser.add_argument('--json', action='store_true', help='Print the results as one JSON object')
+    args = parser.parse_args()
+
+    result = run_parse_benchmark(args.tasks, args.page_size, args.repeat)
+    if args.json:
+        print(json.dumps(result))
+        return
+
+    print(f'{result["tasks"]} tasks in {result["pages"]} pages of {result["page_size"]}')
+    print(f'{"parser":<8} {"ms/page":>9} {"bytes/task":>11}')
+    for name in PARSERS:
+        print(f'{name:<8} {result[f"{name}_ms_per_page"]:9.3f} {result[f"{name}_bytes_per_task"]:11.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Latency benchmarks for completeTask against a local Todoist stand-in.
+
+Drives the real blueprint handlers with Todoist traffic redirected to benchmarks.fake_todoist,
+and reports p50/p95/p99 latency, HTTP calls per request and bytes transferred per request.
+
+    python -m benchmarks.run --project-size 2000 --page-size 200 --latency-ms 20
+    python -m benchmarks.run --lookup-mode index scan filter mirror --write-mode rest sync parallel
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+from itertools import product
+from unittest.mock import patch
+
+import azure.functions as func
+
+from benchmarks.fake_todoist import FakeTodoist, FakeTodoistServer
+from heidi_todoist.session import TODOIST_API_PREFIX, TodoistAdapter, create_session
+
+TARGETS = ('deep', 'shallow', 'random', 'missing')
+
+
+class LocalRedirectAdapter(TodoistAdapter):
+    """Adapter that sends requests meant for api.todoist.com to the local stand-in instead."""
+
+    def __init__(self, base_url: str, **kwargs):
+        self.base_url = base_url
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.url = self.base_url + request.url[len(TODOIST_API_PREFIX):]
+        return super().send(request, **kwargs)
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percentile - 1]
+
+
+def _task_names(fake: FakeTodoist, target: str, count: int, seed: int) -> list[str]:
+    size = len(fake.tasks)
+    if target == 'missing':
+        return [f'Missing task {i}' for i in range(count)]
+    if target == 'shallow':
+        positions = [i % size for i in range(count)]
+    elif target == 'random':
+        positions = random.Random(seed).sample(range(size), min(count, size))
+    else:
+        positions = [size - 1 - (i % size) for i in range(count)]
+    return [fake.content_at(position) for position in positions]
+
+
+def run_benchmark(project_size: int = 500, page_size: int = 50, latency_ms: float = 0.0, error_rate: float = 0.0,
+                  requests: int = 20, lookup_mode: str = 'index', write_mode: str = 'rest',
+                  route: str = 'completeTask', target: str = 'deep', seed: int = 0, rate_limit: int = 0,
+                  prefetch: bool = True) -> dict:
+    """Run one configuration and return its latency, call and byte statistics."""
+    from heidi_todoist.blueprint import complete_task, complete_task_async
+    from heidi_todoist.pool import client_pool
+    from heidi_todoist.resilience import todoist_breaker
+    from heidi_todoist.settings import get_settings
+
+    fake = FakeTodoist(project_size=project_size, page_size=page_size, latency_ms=latency_ms,
+                       error_rate=error_rate, seed=seed)
+    server = FakeTodoistServer(fake).start()
+
+    def local_session(*args, **kwargs):
+        session = create_session(*args, **kwargs)
+        # Keep the real adapter's limiter and retry policy, only change where requests go
+        adapter = session.get_adapter(TODOIST_API_PREFIX)
+        session.mount(TODOIST_API_PREFIX, LocalRedirectAdapter(
+            server.base_url, limiter=adapter.limiter, retry_policy=adapter.retry_policy, breaker=adapter.breaker,
+            pool_maxsize=adapter._pool_maxsize, max_retries=0
+        ))
+        return session
+
+    environ = {
+        'TODOIST_API_TOKEN': 'benchmark-token',
+        'HEIDI_PROJECT_ID': fake.project_id,
+        'TASK_LOOKUP_MODE': lookup_mode,
+        'TASK_WRITE_MODE': write_mode,
+        'TASK_PAGE_SIZE': str(page_size),
+        'TASK_PREFETCH_PAGES': 'true' if prefetch else 'false',
+        # The client-side limiter is sized for real Todoist, so it is off unless being measured
+        'TODOIST_RATE_LIMIT': str(rate_limit),
+        # Every request must reach Todoist, so nothing is answered from the idempotency cache
+        'IDEMPOTENCY_WINDOW': '0'
+    }
+
+    latencies = []
+    statuses: dict[int, int] = {}
+    try:
+        with patch.dict(os.environ, environ), patch('heidi_todoist.services.create_session', local_session):
+            get_settings.cache_clear()
+            todoist_breaker.cache_clear()
+            client_pool.clear()
+            names = _task_names(fake, target, requests, seed)
+            before = fake.counters()
+
+            for name in names:
+                req = func.HttpRequest(
+                    method='POST',
+                    url=f'/api/{route}',
+                    body=json.dumps({'task_name': name}).encode(),
+                    headers={'Content-Type': 'application/json'}
+                )
+                started = time.perf_counter()
+                if route == 'completeTaskAsync':
+                    response = asyncio.run(complete_task_async(req))
+                else:
+                    response = complete_task(req)
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            after = fake.counters()
+    finally:
+        get_settings.cache_clear()
+        todoist_breaker.cache_clear()
+        client_pool.clear()
+        server.stop()
+
+    return {
+        'lookup_mode': lookup_mode,
+        'write_mode': write_mode,
+        'route': route,
+        'target': target,
+        'prefetch': prefetch,
+        'project_size': project_size,
+        'requests': len(latencies),
+        'p50_ms': _percentile(latencies, 50),
+        'p95_ms': _percentile(latencies, 95),
+        'p99_ms': _percentile(latencies, 99),
+        'http_calls_per_request': (after['requests'] - before['requests']) / len(latencies),
+        'bytes_per_request': (after['bytes'] - before['bytes']) / len(latencies),
+        'errors_injected': after['errors_injected'] - before['errors_injected'],
+        'statuses': statuses
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--project-size', type=int, default=500)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Added to every fake Todoist response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of fake Todoist calls that fail with 503')
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--lookup-mode', nargs='+', default=['index'])
+    parser.add_argument('--write-mode', nargs='+', default=['rest'])
+    parser.add_argument('--route', nargs='+', default=['completeTask'], choices=['completeTask', 'completeTaskAsync'])
+    parser.add_argument('--target', default='deep', choices=TARGETS, help='Where the completed tasks sit in the project')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rate-limit', type=int, default=0, help='TODOIST_RATE_LIMIT for the service (0 disables it)')
+    parser.add_argument('--no-prefetch', action='store_true', help='Fetch task pages strictly one after another')
+    parser.add_argument('--json', action='store_true', help='Print one JSON object per configuration')
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f'{"route":<18} {"lookup":<7} {"write":<9} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} '
+              f'{"calls/req":>9} {"bytes/req":>10}  statuses')
+
+    for route, lookup_mode, write_mode in product(args.route, args.lookup_mode, args.write_mode):
+        result = run_benchmark(args.project_size, args.page_size, args.latency_ms, args.error_rate, args.requests,
+                               lookup_mode, write_mode, route, args.target, args.seed, args.rate_limit,
+                               not args.no_prefetch)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(f'{route:<18} {lookup_mode:<7} {write_mode:<9} {result["p50_ms"]:8.1f} {result["p95_ms"]:8.1f} '
+                  f'{result["p99_ms"]:8.1f} {result["http_calls_per_request"]:9.2f} '
+                  f'{result["bytes_per_request"]:10.0f}  {result["statuses"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,12 @@
 import azure.functions as func
 
 from heidi_todoist.blueprint import bp
+from heidi_todoist.warmup import start_prewarm
 
 app = func.FunctionApp()
 
 # Register the blueprint
 app.register_functions(bp)
+
+# Optionally open the Todoist connection while the host finishes starting
+start_prewarm()
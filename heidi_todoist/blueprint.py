@@ -1,19 +1,395 @@
 import azure.functions as func
+import functools
+import inspect
 import json
 import logging
+import math
 import os
-from heidi_todoist.services import TodoistService
+import random
+import time
+from dataclasses import dataclass
+from heidi_todoist.coalesce import task_coalescer
+from heidi_todoist.idempotency import derive_key, idempotency_store, valid_key
+from heidi_todoist.queued import TASK_QUEUE_CONNECTION, TASK_QUEUE_NAME, parse_task_message, task_message
+from heidi_todoist.settings import get_settings
+from heidi_todoist.tenants import TENANT_HEADER, TENANT_KEY_HEADER, TenantAuthError, authenticate
+from heidi_todoist.timing import PhaseTimer, timed
+from heidi_todoist.warmup import keep_warm
+from heidi_todoist.webhooks import DELIVERY_HEADER, SIGNATURE_HEADER, apply_task_event, verify_signature
 
 bp = func.Blueprint()
 
 
+# The Todoist client, requests and the pool are imported on first use rather than when the
+# function app is indexed, which keeps them off the cold start path.
+def get_todoist_service(tenant_id: str | None = None):
+    """Return the warm TodoistService for a tenant, or for the configured token."""
+    from heidi_todoist.pool import get_todoist_service as pooled_service
+    return pooled_service(tenant_id)
+
+
+def get_async_todoist_service(tenant_id: str | None = None):
+    """Return the warm AsyncTodoistService for a tenant, or for the configured token."""
+    from heidi_todoist.pool import get_async_todoist_service as pooled_async_service
+    return pooled_async_service(tenant_id)
+
+
+def warm_todoist_services() -> list:
+    """Return every TodoistService already warm in this worker."""
+    from heidi_todoist.pool import client_pool
+    return client_pool.services()
+
+
+def _account(req: func.HttpRequest) -> tuple[str | None, str | None]:
+    """Return the caller's tenant id and project, or (None, HEIDI_PROJECT_ID) when no tenant is named.
+
+    Raises TenantAuthError when the named tenant's key is missing or wrong, or when only
+    tenants are configured and none is named.
+    """
+    settings = get_settings()
+    tenant_id = req.headers.get(TENANT_HEADER)
+    if not isinstance(tenant_id, str) or not tenant_id:
+        if settings.tenants and not settings.todoist_api_token:
+            raise TenantAuthError(f'{TENANT_HEADER} header is required')
+        return None, settings.heidi_project_id
+
+    tenant = authenticate(settings.tenants, tenant_id, req.headers.get(TENANT_KEY_HEADER))
+    return tenant.id, tenant.project_id
+
+
+def _unauthorized(error: TenantAuthError) -> func.HttpResponse:
+    return func.HttpResponse(
+        json.dumps({'success': False, 'error': str(error)}),
+        status_code=401,
+        mimetype="application/json"
+    )
+
+
+def _record_timings(route: str, timer: PhaseTimer, response: func.HttpResponse) -> None:
+    """Log the invocation's phase timings and add them as a Server-Timing header when TIMING_HEADER is on."""
+    timer.log(logging.getLogger(__name__), f'{route} timings', route=route, status_code=response.status_code)
+    try:
+        timing_header = get_settings().timing_header
+    except ValueError:
+        timing_header = False
+    if timing_header:
+        response.headers['Server-Timing'] = timer.server_timing()
+
+
+def with_timings(route: str):
+    """Time each invocation of a route handler, sync or async, recording its phases as they run."""
+    def decorator(handler):
+        if inspect.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def async_wrapper(req: func.HttpRequest) -> func.HttpResponse:
+                with PhaseTimer() as timer:
+                    response = await handler(req)
+                _record_timings(route, timer, response)
+                return response
+            return async_wrapper
+
+        @functools.wraps(handler)
+        def wrapper(req: func.HttpRequest) -> func.HttpResponse:
+            with PhaseTimer() as timer:
+                response = handler(req)
+            _record_timings(route, timer, response)
+            return response
+        return wrapper
+    return decorator
+
+
+def _idempotency_key(req: func.HttpRequest, req_body, project_id: str, task_name: str,
+                     tenant_id: str | None = None) -> tuple[str | None, float]:
+    """Return the request's idempotency key and how many seconds its result should be replayed for.
+
+    Keys are scoped to the tenant as well as the project, since two tenants may name the same project.
+    """
+    settings = get_settings()
+    key = valid_key(req.headers.get('Idempotency-Key'))
+    if not key and isinstance(req_body, dict):
+        key = valid_key(req_body.get('idempotency_key'))
+    if key:
+        scope = project_id if tenant_id is None else f'tenant:{tenant_id}:{project_id}'
+        return f'{scope}:{key}', settings.idempotency_ttl
+
+    # Without a key, a repeat of the same task within the window is treated as a duplicate
+    if settings.idempotency_window > 0:
+        return derive_key(project_id, task_name, tenant_id), settings.idempotency_window
+    return None, 0
+
+
+def _result_status(result: dict) -> tuple[int, dict | None]:
+    """Map a single-task result to its HTTP status and any extra headers."""
+    if result['success']:
+        return 200, None
+    if result.get('circuit_open'):
+        # Todoist is down and the breaker is failing fast; say when it will be tried again
+        return 503, {'Retry-After': str(math.ceil(result['retry_after']))}
+    if result.get('retry_after') is not None:
+        # Todoist (or our own limiter) is rate limiting; pass the wait on to the caller
+        return 429, {'Retry-After': str(math.ceil(result['retry_after']))}
+    return (404 if 'not found' in result.get('error', '') else 500), None
+
+
+def _coalesce_key(project_id: str, task_name: str, idempotency_key: str | None, tenant_id: str | None = None) -> tuple:
+    """Group in-flight requests by tenant and task, keeping requests the caller marked as distinct apart."""
+    if idempotency_key and not idempotency_key.startswith('derived:'):
+        return tenant_id, project_id, task_name, idempotency_key
+    return tenant_id, project_id, task_name
+
+
+def _coalesced_headers(headers: dict | None, coalesced: bool) -> dict | None:
+    """Mark a response whose result was shared from another request for the same task."""
+    if not coalesced:
+        return headers
+    return {**(headers or {}), 'Coalesced': 'true'}
+
+
+def _replayed_response(result: dict, status_code: int = 200) -> func.HttpResponse:
+    return func.HttpResponse(
+        json.dumps(result),
+        status_code=status_code,
+        mimetype="application/json",
+        headers={'Idempotent-Replayed': 'true'}
+    )
+
+
+@dataclass(frozen=True)
+class TaskRequest:
+    """A validated single-task request, with the idempotency key it is deduplicated by."""
+    tenant_id: str | None
+    project_id: str
+    task_name: str
+    idempotency_key: str | None
+    idempotency_ttl: float
+    # Result of an earlier request with the same key, to replay instead of acting again
+    stored_result: dict | None
+
+
+def _parse_task_request(req: func.HttpRequest) -> TaskRequest | func.HttpResponse:
+    """Read the caller's project and the task_name from a completeTask request, or return the error response."""
+    # Get the caller's project, from their tenant or from settings
+    try:
+        with timed('config'):
+            tenant_id, project_id = _account(req)
+    except TenantAuthError as e:
+        return _unauthorized(e)
+    if not project_id:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': 'HEIDI_PROJECT_ID not configured'}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+    # Get task name from JSON body
+    req_body = None
+    try:
+        req_body = req.get_json()
+        task_name = req_body.get('task_name') if req_body else None
+    except (ValueError, AttributeError):
+        task_name = None
+
+    if not task_name:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': 'task_name is required in JSON body'}),
+            status_code=400,
+            mimetype="application/json"
+        )
+
+    idempotency_key, idempotency_ttl = _idempotency_key(req, req_body, project_id, task_name, tenant_id)
+    stored_result = idempotency_store().get(idempotency_key) if idempotency_key else None
+    return TaskRequest(tenant_id, project_id, task_name, idempotency_key, idempotency_ttl, stored_result)
+
+
 @bp.route(route="completeTask", auth_level=func.AuthLevel.FUNCTION, methods=["POST"])
+@with_timings('completeTask')
 def complete_task(req: func.HttpRequest) -> func.HttpResponse:
     """Complete a task by name in the Heidi project."""
 
     try:
-        # Get project ID from environment
-        project_id = os.environ.get('HEIDI_PROJECT_ID')
+        task_request = _parse_task_request(req)
+        if isinstance(task_request, func.HttpResponse):
+            return task_request
+        tenant_id, project_id, task_name = task_request.tenant_id, task_request.project_id, task_request.task_name
+        idempotency_key = task_request.idempotency_key
+
+        # Replay the stored result for a duplicate request without calling Todoist
+        if task_request.stored_result is not None:
+            return _replayed_response(task_request.stored_result)
+
+        # Complete existing task and create new one
+        def complete() -> dict:
+            with timed('client'):
+                service = get_todoist_service(tenant_id)
+            result = service.complete_and_recreate_task(project_id, task_name)
+            # Stored before the call is released, so a repeat arriving just after is replayed too
+            if result['success'] and idempotency_key:
+                idempotency_store().put(idempotency_key, result, task_request.idempotency_ttl)
+            return result
+
+        # Concurrent requests for the same task share one close-and-recreate
+        result, coalesced = task_coalescer.run(
+            _coalesce_key(project_id, task_name, idempotency_key, tenant_id), complete
+        )
+
+        status_code, headers = _result_status(result)
+        headers = _coalesced_headers(headers, coalesced)
+
+        return func.HttpResponse(
+            json.dumps(result),
+            status_code=status_code,
+            mimetype="application/json",
+            headers=headers
+        )
+
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+    except Exception as e:
+        logging.error(f'Unexpected error: {str(e)}')
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+
+@bp.route(route="completeTaskAsync", auth_level=func.AuthLevel.FUNCTION, methods=["POST"])
+@with_timings('completeTaskAsync')
+async def complete_task_async(req: func.HttpRequest) -> func.HttpResponse:
+    """Complete a task by name in the Heidi project, running the Todoist calls in an executor thread."""
+
+    try:
+        task_request = _parse_task_request(req)
+        if isinstance(task_request, func.HttpResponse):
+            return task_request
+        tenant_id, project_id, task_name = task_request.tenant_id, task_request.project_id, task_request.task_name
+        idempotency_key = task_request.idempotency_key
+
+        if task_request.stored_result is not None:
+            return _replayed_response(task_request.stored_result)
+
+        async def complete() -> dict:
+            with timed('client'):
+                service = get_async_todoist_service(tenant_id)
+            result = await service.complete_and_recreate_task(project_id, task_name)
+            if result['success'] and idempotency_key:
+                idempotency_store().put(idempotency_key, result, task_request.idempotency_ttl)
+            return result
+
+        result, coalesced = await task_coalescer.run_async(
+            _coalesce_key(project_id, task_name, idempotency_key, tenant_id), complete
+        )
+
+        status_code, headers = _result_status(result)
+        headers = _coalesced_headers(headers, coalesced)
+
+        return func.HttpResponse(
+            json.dumps(result),
+            status_code=status_code,
+            mimetype="application/json",
+            headers=headers
+        )
+
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+    except Exception as e:
+        logging.error(f'Unexpected error: {str(e)}')
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+
+@bp.route(route="nextDue", auth_level=func.AuthLevel.FUNCTION, methods=["GET"])
+@with_timings('nextDue')
+def next_due(req: func.HttpRequest) -> func.HttpResponse:
+    """Report when a task in the Heidi project is next due, from cached state when it is recent enough."""
+
+    try:
+        try:
+            with timed('config'):
+                tenant_id, project_id = _account(req)
+                max_age = get_settings().next_due_max_age
+        except TenantAuthError as e:
+            return _unauthorized(e)
+        if not project_id:
+            return func.HttpResponse(
+                json.dumps({'success': False, 'error': 'HEIDI_PROJECT_ID not configured'}),
+                status_code=500,
+                mimetype="application/json"
+            )
+
+        task_name = req.params.get('task_name')
+        if not task_name:
+            return func.HttpResponse(
+                json.dumps({'success': False, 'error': 'task_name query parameter is required'}),
+                status_code=400,
+                mimetype="application/json"
+            )
+
+        # A caller can ask for fresher state than NEXT_DUE_MAX_AGE, never staler
+        if req.params.get('max_age') is not None:
+            try:
+                requested_max_age = float(req.params['max_age'])
+            except ValueError:
+                requested_max_age = -1.0
+            if not requested_max_age >= 0:
+                return func.HttpResponse(
+                    json.dumps({'success': False, 'error': 'max_age must be a non-negative number of seconds'}),
+                    status_code=400,
+                    mimetype="application/json"
+                )
+            max_age = min(max_age, requested_max_age)
+
+        with timed('client'):
+            service = get_todoist_service(tenant_id)
+        result = service.next_due(project_id, task_name, max_age)
+
+        status_code, headers = _result_status(result)
+        if result['success']:
+            # Seconds since the answer was read from Todoist
+            headers = {'Age': str(int(result['age']))}
+
+        return func.HttpResponse(
+            json.dumps(result),
+            status_code=status_code,
+            mimetype="application/json",
+            headers=headers
+        )
+
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+    except Exception as e:
+        logging.error(f'Unexpected error: {str(e)}')
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+
+@bp.route(route="completeTasks", auth_level=func.AuthLevel.FUNCTION, methods=["POST"])
+def complete_tasks(req: func.HttpRequest) -> func.HttpResponse:
+    """Complete several tasks by name in the Heidi project with one batched Todoist request."""
+
+    try:
+        try:
+            tenant_id, project_id = _account(req)
+        except TenantAuthError as e:
+            return _unauthorized(e)
         if not project_id:
             return func.HttpResponse(
                 json.dumps({'success': False, 'error': 'HEIDI_PROJECT_ID not configured'}),
@@ -21,29 +397,199 @@ def complete_task(req: func.HttpRequest) -> func.HttpResponse:
                 mimetype="application/json"
             )
 
-        # Get task name from JSON body
+        # Get task names from JSON body
         try:
             req_body = req.get_json()
-            task_name = req_body.get('task_name') if req_body else None
+            task_names = req_body.get('task_names') if req_body else None
         except (ValueError, AttributeError):
-            task_name = None
+            task_names = None
 
-        if not task_name:
+        if (not task_names or not isinstance(task_names, list)
+                or not all(isinstance(name, str) and name for name in task_names)):
             return func.HttpResponse(
-                json.dumps({'success': False, 'error': 'task_name is required in JSON body'}),
+                json.dumps({'success': False, 'error': 'task_names must be a non-empty list of task names'}),
                 status_code=400,
                 mimetype="application/json"
             )
 
-        # Complete existing task and create new one
-        service = TodoistService()
-        result = service.complete_and_recreate_task(project_id, task_name)
+        # One Sync API request carries the whole batch, so it is capped at what Todoist accepts
+        from heidi_todoist.services import MAX_BATCH_TASKS
+        if len(set(task_names)) > MAX_BATCH_TASKS:
+            return func.HttpResponse(
+                json.dumps({'success': False, 'error': f'At most {MAX_BATCH_TASKS} tasks can be completed at once'}),
+                status_code=400,
+                mimetype="application/json"
+            )
 
-        status_code = 200 if result['success'] else 404 if 'not found' in result.get('error', '') else 500
+        service = get_todoist_service(tenant_id)
+        result = service.complete_and_recreate_tasks(project_id, task_names)
+
+        # 207 Multi-Status when only some of the items went through
+        headers = None
+        if result['success']:
+            status_code = 200
+        elif result.get('succeeded'):
+            status_code = 207
+        elif result.get('retry_after') is not None:
+            # Todoist is down or rate limiting; tell the caller when to try again
+            status_code, headers = _result_status(result)
+        else:
+            status_code = 500
 
         return func.HttpResponse(
             json.dumps(result),
             status_code=status_code,
+            mimetype="application/json",
+            headers=headers
+        )
+
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+    except Exception as e:
+        logging.error(f'Unexpected error: {str(e)}')
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+
+@bp.route(route="completeTaskQueued", auth_level=func.AuthLevel.FUNCTION, methods=["POST"])
+@bp.queue_output(arg_name="msg", queue_name=TASK_QUEUE_NAME, connection=TASK_QUEUE_CONNECTION)
+def complete_task_queued(req: func.HttpRequest, msg: func.Out[str]) -> func.HttpResponse:
+    """Validate a completeTask request and queue it, answering 202 without waiting for Todoist."""
+
+    try:
+        task_request = _parse_task_request(req)
+        if isinstance(task_request, func.HttpResponse):
+            return task_request
+        tenant_id, project_id, task_name = task_request.tenant_id, task_request.project_id, task_request.task_name
+
+        # A double tap must not queue the task twice, or the second message would complete its replacement
+        if task_request.stored_result is not None:
+            return _replayed_response(task_request.stored_result, status_code=202)
+
+        message = task_message(project_id, task_name, tenant_id=tenant_id)
+        msg.set(json.dumps(message))
+
+        result = {
+            'success': True,
+            'message': f'Task "{task_name}" queued',
+            'request_id': message['request_id'],
+            'requested_at': message['requested_at']
+        }
+        if task_request.idempotency_key:
+            idempotency_store().put(task_request.idempotency_key, result, task_request.idempotency_ttl)
+
+        return func.HttpResponse(
+            json.dumps(result),
+            status_code=202,
+            mimetype="application/json"
+        )
+
+    except ValueError as e:
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+    except Exception as e:
+        logging.error(f'Unexpected error: {str(e)}')
+        return func.HttpResponse(
+            json.dumps({'success': False, 'error': str(e)}),
+            status_code=500,
+            mimetype="application/json"
+        )
+
+
+@bp.queue_trigger(arg_name="msg", queue_name=TASK_QUEUE_NAME, connection=TASK_QUEUE_CONNECTION)
+def process_queued_task(msg: func.QueueMessage) -> None:
+    """Complete and recreate a task queued by completeTaskQueued, due by its DUE_RULES rule from when it was requested.
+
+    A failure is raised so the message goes back on the queue; after the host's maxDequeueCount
+    attempts it is moved to the poison queue.
+    """
+    try:
+        message = parse_task_message(msg.get_body())
+    except ValueError as e:
+        # Retrying can't fix a malformed message, so it is logged and dropped
+        logging.error(f'Discarding queue message {msg.id}: {str(e)}')
+        return
+
+    # Queue delivery is at-least-once; a message that already succeeded is not applied again
+    processed_key = f'queued:{message["request_id"]}'
+    if idempotency_store().get(processed_key) is not None:
+        logging.info(f'Queue message {message["request_id"]} was already processed')
+        return
+
+    with PhaseTimer() as timer:
+        service = get_todoist_service(message.get('tenant_id'))
+        result = service.complete_and_recreate_task(
+            message['project_id'], message['task_name'], requested_at=message['requested_at']
+        )
+    timer.log(logging.getLogger(__name__), 'processQueuedTask timings', route='processQueuedTask',
+              success=result['success'], dequeue_count=msg.dequeue_count)
+
+    if not result['success']:
+        raise RuntimeError(f'Failed to complete queued task "{message["task_name"]}": {result.get("error")}')
+
+    idempotency_store().put(processed_key, result, get_settings().idempotency_ttl)
+    logging.info(f'Queued task "{message["task_name"]}" requested at {message["requested_at"].isoformat()} '
+                 f'completed: {result["message"]}')
+
+
+@bp.route(route="todoistWebhook", auth_level=func.AuthLevel.FUNCTION, methods=["POST"])
+def todoist_webhook(req: func.HttpRequest) -> func.HttpResponse:
+    """Apply a Todoist item webhook to the cached task index so lookups stay current without re-listing."""
+
+    try:
+        secret = get_settings().todoist_client_secret
+        if not secret:
+            return func.HttpResponse(
+                json.dumps({'success': False, 'error': 'TODOIST_CLIENT_SECRET not configured'}),
+                status_code=500,
+                mimetype="application/json"
+            )
+
+        # The signature covers the raw body, so it is checked before anything is parsed
+        body = req.get_body()
+        if not verify_signature(body, req.headers.get(SIGNATURE_HEADER), secret):
+            logging.warning(f'Rejected webhook delivery {req.headers.get(DELIVERY_HEADER)} with an invalid signature')
+            return func.HttpResponse(
+                json.dumps({'success': False, 'error': 'Invalid webhook signature'}),
+                status_code=401,
+                mimetype="application/json"
+            )
+
+        try:
+            payload = json.loads(body)
+            event_name = payload['event_name']
+            task = payload['event_data']
+            task_id = task['id']
+        except (ValueError, KeyError, TypeError):
+            return func.HttpResponse(
+                json.dumps({'success': False, 'error': 'Invalid webhook payload'}),
+                status_code=400,
+                mimetype="application/json"
+            )
+
+        # Task ids are unique across accounts, so the event is applied to every tenant's index
+        services = warm_todoist_services()
+        if not services and get_settings().todoist_api_token:
+            # A cold worker still applies it, so a shared task index stays current
+            services = [get_todoist_service()]
+        # Every event is acknowledged, even ones that change nothing, so Todoist does not redeliver it
+        applied = any([apply_task_event(service.task_index, event_name, task) for service in services])
+        logging.info(f'Webhook {event_name} for task {task_id} (delivery {req.headers.get(DELIVERY_HEADER)}): '
+                     f'{"applied to the task index" if applied else "no indexed state changed"}')
+
+        return func.HttpResponse(
+            json.dumps({'success': True, 'event_name': event_name, 'applied': applied}),
+            status_code=200,
             mimetype="application/json"
         )
 
@@ -60,3 +606,49 @@ def complete_task(req: func.HttpRequest) -> func.HttpResponse:
             status_code=500,
             mimetype="application/json"
         )
+
+
+@bp.timer_trigger(arg_name="timer", schedule="%PREWARM_SCHEDULE%", run_on_startup=False)
+def keep_warm_timer(timer: func.TimerRequest) -> None:
+    """Keep the worker, its Todoist connection and the project's cached tasks warm between requests."""
+    try:
+        settings = get_settings()
+    except ValueError as e:
+        logging.error(f'Skipping keep-warm, invalid settings: {str(e)}')
+        return
+    if not settings.todoist_api_token or not settings.heidi_project_id:
+        logging.warning('Skipping keep-warm, TODOIST_API_TOKEN or HEIDI_PROJECT_ID is not set')
+        return
+
+    # Spread ticks out so workers sharing a token don't all call Todoist at the same moment
+    # (scheduling jitter, not a security use of random)
+    time.sleep(random.uniform(0, settings.prewarm_jitter))  # nosec B311
+
+    with PhaseTimer() as phase_timer:
+        try:
+            result = keep_warm()
+        except Exception as e:
+            # The next tick tries again; a failed refresh leaves requests to load the state themselves
+            logging.warning(f'Keep-warm failed: {str(e)}')
+            return
+    phase_timer.log(logging.getLogger(__name__), 'keepWarm timings', route='keepWarm',
+                    past_due=timer.past_due, **result)
+
+
+@bp.route(route="stats", auth_level=func.AuthLevel.FUNCTION, methods=["GET"])
+def stats(req: func.HttpRequest) -> func.HttpResponse:
+    """Report warm client pool, idempotency cache, coalescing and circuit breaker metrics for this worker process."""
+    from heidi_todoist.pool import client_pool
+    from heidi_todoist.resilience import todoist_breaker
+
+    return func.HttpResponse(
+        json.dumps({
+            'pid': os.getpid(),
+            'client_pool': client_pool.stats(),
+            'idempotency': idempotency_store().stats(),
+            'coalescing': task_coalescer.stats(),
+            'circuit_breaker': todoist_breaker().stats()
+        }),
+        status_code=200,
+        mimetype="application/json"
+    )
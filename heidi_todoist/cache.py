@@ -0,0 +1,380 @@
+import logging
+import sqlite3
+import threading
+import time
+
+# Memory held per cached task (its content, its id and the dict slot), measured with tracemalloc
+ENTRY_BYTES = 160
+
+
+class TaskIndex:
+    """Thread-safe in-memory index of task content to task id for each project, expiring after a TTL.
+
+    Alongside each indexed task the index can hold its due date, as Todoist reports it. A task
+    id missing from the due dates means its due date is not known, not that it has none.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._projects: dict[str, tuple[float, dict[str, str]]] = {}
+        self._due: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def _forget(self, entries: dict[str, str]) -> None:
+        for task_id in entries.values():
+            self._due.pop(task_id, None)
+
+    def _entries(self, project_id: str) -> dict[str, str] | None:
+        """Return the project's entries if they are still fresh, dropping them once expired."""
+        cached = self._projects.get(project_id)
+        if cached is None:
+            return None
+        loaded_at, entries = cached
+        if time.monotonic() - loaded_at > self.ttl:
+            del self._projects[project_id]
+            self._forget(entries)
+            return None
+        return entries
+
+    def is_fresh(self, project_id: str) -> bool:
+        """Return whether the project has been loaded within the TTL."""
+        with self._lock:
+            return self._entries(project_id) is not None
+
+    def age(self, project_id: str) -> float | None:
+        """Return seconds since the project was loaded, or None when it is not fresh."""
+        with self._lock:
+            if self._entries(project_id) is None:
+                return None
+            return time.monotonic() - self._projects[project_id][0]
+
+    def lookup(self, project_id: str, content: str) -> tuple[bool, str | None]:
+        """Return (fresh, task_id); task_id is None when a fresh index has no task with that content."""
+        with self._lock:
+            entries = self._entries(project_id)
+            if entries is None:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            return True, entries.get(content)
+
+    def lookup_due(self, project_id: str, content: str, max_age: float) -> dict | None:
+        """Return {task_id, due, age} for content if loaded within max_age seconds with a known due date.
+
+        A fresh index without the task answers with task_id None. Returns None on a miss.
+        """
+        with self._lock:
+            entries = self._entries(project_id)
+            age = time.monotonic() - self._projects[project_id][0] if entries is not None else None
+            task_id = entries.get(content) if entries is not None else None
+            if age is None or age > max_age or (task_id is not None and task_id not in self._due):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return {'task_id': task_id, 'due': self._due.get(task_id) if task_id is not None else None, 'age': age}
+
+    def entries(self, project_id: str) -> dict[str, str] | None:
+        """Return a copy of the project's content -> id entries, or None when not fresh."""
+        with self._lock:
+            entries = self._entries(project_id)
+            if entries is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return dict(entries)
+
+    def replace(self, project_id: str, entries: dict[str, str], due_times: dict[str, str | None] | None = None) -> None:
+        """Replace the project's index with a freshly listed set of tasks and, when given, their due dates by id."""
+        with self._lock:
+            previous = self._projects.get(project_id)
+            if previous is not None:
+                self._forget(previous[1])
+            self._projects[project_id] = (time.monotonic(), dict(entries))
+            if due_times is not None:
+                self._due.update((task_id, due_times[task_id]) for task_id in entries.values() if task_id in due_times)
+
+    def put(self, project_id: str, content: str, task_id: str, due: str | None = None) -> None:
+        """Write through a newly created task and its due date; ignored when the project is not loaded."""
+        with self._lock:
+            entries = self._entries(project_id)
+            if entries is not None:
+                previous_id = entries.get(content)
+                if previous_id is not None:
+                    self._due.pop(previous_id, None)
+                entries[content] = task_id
+                self._due[task_id] = due
+
+    def remove(self, project_id: str, content: str, task_id: str | None = None) -> None:
+        """Write through a completed task; ignored when the project is not loaded.
+
+        When task_id is given the entry is only dropped if it still points at that task, so a
+        close finishing after a concurrent add cannot erase the new task's id.
+        """
+        with self._lock:
+            entries = self._entries(project_id)
+            if entries is None:
+                return
+            if task_id is None or entries.get(content) == task_id:
+                removed_id = entries.pop(content, None)
+                if removed_id is not None:
+                    self._due.pop(removed_id, None)
+
+    def update_task(self, task_id: str, project_id: str | None = None, content: str | None = None,
+                    due: str | None = None) -> bool:
+        """Apply an outside change to a task, returning whether any loaded project changed.
+
+        The task is dropped wherever it is indexed, so renames and moves between projects are
+        handled. Given a project and content it is then indexed again with its due date, unless
+        another task with the same content is already there: like a full listing, the first
+        task seen wins.
+        """
+        changed = False
+        unchanged = False
+        with self._lock:
+            for indexed_project_id in list(self._projects):
+                entries = self._entries(indexed_project_id)
+                if entries is None:
+                    continue
+                for indexed_content in [name for name, indexed_id in entries.items() if indexed_id == task_id]:
+                    if indexed_project_id == project_id and indexed_content == content:
+                        unchanged = True
+                        continue
+                    del entries[indexed_content]
+                    changed = True
+
+            if unchanged:
+                if task_id not in self._due or self._due[task_id] != due:
+                    self._due[task_id] = due
+                    changed = True
+                return changed
+
+            self._due.pop(task_id, None)
+            if project_id is not None and content is not None:
+                entries = self._entries(project_id)
+                if entries is not None and content not in entries:
+                    entries[content] = task_id
+                    self._due[task_id] = due
+                    changed = True
+        return changed
+
+    def invalidate(self, project_id: str | None = None) -> None:
+        """Forget one project, or every project when no id is given."""
+        with self._lock:
+            if project_id is None:
+                self._projects.clear()
+                self._due.clear()
+            else:
+                cached = self._projects.pop(project_id, None)
+                if cached is not None:
+                    self._forget(cached[1])
+
+    def memory_bytes(self) -> int:
+        """Estimate the memory held by the indexed tasks and their due dates."""
+        with self._lock:
+            return (sum(len(entries) for _, entries in self._projects.values()) + len(self._due)) * ENTRY_BYTES
+
+    def stats(self) -> dict:
+        """Return hit/miss counts and the number of indexed tasks."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'projects': len(self._projects),
+                'tasks': sum(len(entries) for _, entries in self._projects.values())
+            }
+
+
+class SharedTaskIndex(TaskIndex):
+    """Task index kept in a SQLite file that every worker process on the instance shares.
+
+    With FUNCTIONS_WORKER_PROCESS_COUNT > 1, a project listed by one process is then a hit in
+    all of them, and tasks written through by one are seen by the rest. Lookups are a single
+    indexed query, never an HTTP call. The database runs in WAL mode so readers are not
+    blocked by a writer. Freshness uses wall-clock time, the only clock the processes share.
+
+    Hits and misses are counted per process; projects and tasks are counted across the file.
+    A failing database is logged and treated as a miss, so lookups fall back to listing.
+    """
+
+    def __init__(self, path: str, ttl: float = 300.0):
+        super().__init__(ttl)
+        self.path = path
+        self._local = threading.local()
+        self.logger = logging.getLogger(__name__)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, creating the schema on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS projects (project_id TEXT PRIMARY KEY, loaded_at REAL)')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS tasks (project_id TEXT, content TEXT, task_id TEXT, due TEXT, '
+                'due_known INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (project_id, content))'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS tasks_by_id ON tasks (task_id)')
+            self._local.connection = connection
+        return connection
+
+    def _read(self, query: str, params: tuple = ()) -> list[tuple] | None:
+        try:
+            return self._connect().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f'Shared task index read failed: {str(e)}')
+            return None
+
+    def _write(self, statements: list[tuple[str, tuple]]) -> int:
+        """Run statements in one transaction, returning the rows changed (0 when it failed)."""
+        try:
+            connection = self._connect()
+            with connection:
+                connection.execute('BEGIN IMMEDIATE')
+                return sum(connection.execute(query, params).rowcount for query, params in statements)
+        except sqlite3.Error as e:
+            self.logger.warning(f'Shared task index write failed: {str(e)}')
+            return 0
+
+    def _oldest_fresh(self) -> float:
+        return time.time() - self.ttl
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def is_fresh(self, project_id: str) -> bool:
+        """Return whether any process has loaded the project within the TTL."""
+        return self.age(project_id) is not None
+
+    def age(self, project_id: str) -> float | None:
+        """Return seconds since the project was loaded by any process, or None when it is not fresh."""
+        rows = self._read('SELECT loaded_at FROM projects WHERE project_id = ? AND loaded_at >= ?',
+                          (project_id, self._oldest_fresh()))
+        if not rows:
+            return None
+        return max(0.0, time.time() - rows[0][0])
+
+    def lookup(self, project_id: str, content: str) -> tuple[bool, str | None]:
+        """Return (fresh, task_id); task_id is None when a fresh index has no task with that content."""
+        rows = self._read(
+            'SELECT t.task_id FROM projects p LEFT JOIN tasks t ON t.project_id = p.project_id AND t.content = ? '
+            'WHERE p.project_id = ? AND p.loaded_at >= ?',
+            (content, project_id, self._oldest_fresh())
+        )
+        self._count(bool(rows))
+        if not rows:
+            return False, None
+        return True, rows[0][0]
+
+    def lookup_due(self, project_id: str, content: str, max_age: float) -> dict | None:
+        """Return {task_id, due, age} for content if loaded within max_age seconds with a known due date."""
+        now = time.time()
+        rows = self._read(
+            'SELECT p.loaded_at, t.task_id, t.due, t.due_known FROM projects p '
+            'LEFT JOIN tasks t ON t.project_id = p.project_id AND t.content = ? '
+            'WHERE p.project_id = ? AND p.loaded_at >= ?',
+            (content, project_id, now - min(self.ttl, max_age))
+        )
+        if not rows or (rows[0][1] is not None and not rows[0][3]):
+            self._count(False)
+            return None
+        self._count(True)
+        loaded_at, task_id, due, _ = rows[0]
+        return {'task_id': task_id, 'due': due, 'age': max(0.0, now - loaded_at)}
+
+    def entries(self, project_id: str) -> dict[str, str] | None:
+        """Return the project's content -> id entries, or None when not fresh."""
+        if not self.is_fresh(project_id):
+            self._count(False)
+            return None
+        rows = self._read('SELECT content, task_id FROM tasks WHERE project_id = ?', (project_id,))
+        self._count(rows is not None)
+        return dict(rows) if rows is not None else None
+
+    def replace(self, project_id: str, entries: dict[str, str], due_times: dict[str, str | None] | None = None) -> None:
+        """Replace the project's index with a freshly listed set of tasks and, when given, their due dates by id."""
+        due_times = due_times or {}
+        self._write([
+            ('DELETE FROM tasks WHERE project_id = ?', (project_id,)),
+            *[('INSERT INTO tasks (project_id, content, task_id, due, due_known) VALUES (?, ?, ?, ?, ?)',
+               (project_id, content, task_id, due_times.get(task_id), task_id in due_times))
+              for content, task_id in entries.items()],
+            ('INSERT OR REPLACE INTO projects (project_id, loaded_at) VALUES (?, ?)', (project_id, time.time()))
+        ])
+
+    def put(self, project_id: str, content: str, task_id: str, due: str | None = None) -> None:
+        """Write through a newly created task and its due date; ignored when the project is not loaded."""
+        self._write([(
+            'INSERT OR REPLACE INTO tasks (project_id, content, task_id, due, due_known) '
+            'SELECT ?, ?, ?, ?, 1 WHERE EXISTS (SELECT 1 FROM projects WHERE project_id = ? AND loaded_at >= ?)',
+            (project_id, content, task_id, due, project_id, self._oldest_fresh())
+        )])
+
+    def remove(self, project_id: str, content: str, task_id: str | None = None) -> None:
+        """Write through a completed task, only dropping the entry if it still points at task_id when given."""
+        if task_id is None:
+            self._write([('DELETE FROM tasks WHERE project_id = ? AND content = ?', (project_id, content))])
+        else:
+            self._write([('DELETE FROM tasks WHERE project_id = ? AND content = ? AND task_id = ?',
+                          (project_id, content, task_id))])
+
+    def update_task(self, task_id: str, project_id: str | None = None, content: str | None = None,
+                    due: str | None = None) -> bool:
+        """Apply an outside change to a task, returning whether any loaded project changed."""
+        oldest_fresh = self._oldest_fresh()
+        rows = self._read(
+            'SELECT t.project_id, t.content, t.due, t.due_known FROM tasks t '
+            'JOIN projects p ON p.project_id = t.project_id WHERE t.task_id = ? AND p.loaded_at >= ?',
+            (task_id, oldest_fresh)
+        )
+        if rows is None:
+            return False
+        if rows == [(project_id, content, due, 1)]:
+            return False
+
+        statements: list[tuple[str, tuple]] = [
+            ('DELETE FROM tasks WHERE task_id = ? AND NOT (project_id IS ? AND content IS ?) '
+             'AND project_id IN (SELECT project_id FROM projects WHERE loaded_at >= ?)',
+             (task_id, project_id, content, oldest_fresh))
+        ]
+        if project_id is not None and content is not None:
+            # Like a full listing, the first task seen with a name wins
+            statements.append((
+                'INSERT OR IGNORE INTO tasks (project_id, content, task_id) '
+                'SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM projects WHERE project_id = ? AND loaded_at >= ?)',
+                (project_id, content, task_id, project_id, oldest_fresh)
+            ))
+            statements.append((
+                'UPDATE tasks SET due = ?, due_known = 1 WHERE task_id = ? AND project_id = ? AND content = ? '
+                'AND NOT (due_known = 1 AND due IS ?)',
+                (due, task_id, project_id, content, due)
+            ))
+        return self._write(statements) > 0
+
+    def invalidate(self, project_id: str | None = None) -> None:
+        """Forget one project, or every project when no id is given, for every process."""
+        if project_id is None:
+            self._write([('DELETE FROM tasks', ()), ('DELETE FROM projects', ())])
+        else:
+            self._write([('DELETE FROM tasks WHERE project_id = ?', (project_id,)),
+                         ('DELETE FROM projects WHERE project_id = ?', (project_id,))])
+
+    def memory_bytes(self) -> int:
+        """The tasks live in the shared file, not in this process."""
+        return 0
+
+    def stats(self) -> dict:
+        """Return this process's hit/miss counts and the fresh projects and tasks in the shared file."""
+        rows = self._read(
+            'SELECT COUNT(DISTINCT p.project_id), COUNT(t.task_id) FROM projects p '
+            'LEFT JOIN tasks t ON t.project_id = p.project_id WHERE p.loaded_at >= ?',
+            (self._oldest_fresh(),)
+        ) or [(0, 0)]
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'projects': rows[0][0], 'tasks': rows[0][1]}
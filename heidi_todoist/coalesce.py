@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable, Hashable
+from concurrent.futures import Future
+
+
+class Coalescer:
+    """Runs one call per key at a time and fans its result out to every caller that asks meanwhile.
+
+    Callers for the same key that arrive while a call is in flight wait for it instead of
+    starting their own. Sync and async callers share the same in-flight calls.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.shared = 0
+        self._calls: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key: Hashable) -> tuple[Future, bool]:
+        """Return the future to wait on and whether the caller must run the call itself."""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                return future, False
+
+            future = self._calls[key] = Future()
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: Hashable, future: Future, result=None, error: BaseException | None = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+
+    def run(self, key: Hashable, call: Callable[[], dict]) -> tuple[dict, bool]:
+        """Run call, or wait for the one already running for key. Returns (result, shared)."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = call()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    async def run_async(self, key: Hashable, call: Callable[[], Awaitable[dict]]) -> tuple[dict, bool]:
+        """Async counterpart of run; waiting never blocks the event loop."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+
+        try:
+            result = await call()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'leaders': self.leaders, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self.leaders = 0
+            self.shared = 0
+
+
+# Shared by every completeTask route in the worker process
+task_coalescer = Coalescer()
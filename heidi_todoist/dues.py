@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+
+def due_date(task: dict) -> str | None:
+    """Return a task payload's due date or datetime string, or None when it has no due date."""
+    due = task.get('due')
+    return due.get('date') if isinstance(due, dict) else None
+
+
+def todoist_due_date(due_datetime: str) -> str:
+    """Return an ISO due time as Todoist reports it in due.date: UTC with a Z when aware, floating otherwise.
+
+    Due dates written through after an add are cached in this form too, so the index holds one
+    format whether a task's due date came from a listing, a webhook or our own write.
+    """
+    due = datetime.fromisoformat(due_datetime)
+    if due.tzinfo is None:
+        return due.isoformat(timespec='seconds')
+    return due.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
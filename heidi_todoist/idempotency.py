@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from heidi_todoist.settings import get_settings
+
+
+MAX_KEY_LENGTH = 255
+
+
+def valid_key(value) -> str | None:
+    """Return the value if it is usable as an idempotency key, otherwise None."""
+    if isinstance(value, str) and 0 < len(value) <= MAX_KEY_LENGTH:
+        return value
+    return None
+
+
+def derive_key(project_id: str, task_name: str, tenant_id: str | None = None) -> str:
+    """Derive a key for callers that don't send one; repeats collide for as long as the entry lives."""
+    scope = f'{project_id}\0{task_name}' if tenant_id is None else f'{tenant_id}\0{project_id}\0{task_name}'
+    digest = hashlib.sha256(scope.encode()).hexdigest()
+    return f'derived:{digest}'
+
+
+class IdempotencyStore:
+    """In-process LRU of recent results by idempotency key, optionally backed by SQLite.
+
+    The SQLite file lets a repeat that lands on a different or restarted worker still be
+    answered from the stored result.
+    """
+
+    def __init__(self, max_size: int = 256, path: str | None = None):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._schema_ready = False
+        self.logger = logging.getLogger(__name__)
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(path, timeout=5)
+        if not self._schema_ready:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS idempotency (key TEXT PRIMARY KEY, result TEXT, expires_at REAL)'
+            )
+            self._schema_ready = True
+        return connection
+
+    def _get_persisted(self, path: str, key: str, now: float) -> tuple[float, dict] | None:
+        try:
+            with self._connect(path) as connection:
+                row = connection.execute(
+                    'SELECT result, expires_at FROM idempotency WHERE key = ? AND expires_at > ?', (key, now)
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f'Idempotency store read failed: {str(e)}')
+            return None
+        if row is None:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _put_persisted(self, path: str, key: str, expires_at: float, result: dict) -> None:
+        try:
+            with self._connect(path) as connection:
+                connection.execute(
+                    'INSERT OR REPLACE INTO idempotency (key, result, expires_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(result), expires_at)
+                )
+                connection.execute('DELETE FROM idempotency WHERE expires_at <= ?', (time.time(),))
+        except sqlite3.Error as e:
+            self.logger.warning(f'Idempotency store write failed: {str(e)}')
+
+    def get(self, key: str) -> dict | None:
+        """Return the stored result for a key that has not expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None and self.path:
+                entry = self._get_persisted(self.path, key, now)
+                if entry is not None:
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, result: dict, ttl: float) -> None:
+        """Store a result for ttl seconds."""
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, (expires_at, result))
+            if self.path:
+                self._put_persisted(self.path, key, expires_at, result)
+
+    def _remember(self, key: str, entry: tuple[float, dict]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit/miss counts and the number of results held in memory."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def clear(self) -> None:
+        """Forget every in-memory result and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+@lru_cache(maxsize=1)
+def idempotency_store() -> IdempotencyStore:
+    """Return the idempotency store shared by every route in the worker process, configured from settings."""
+    settings = get_settings()
+    return IdempotencyStore(settings.idempotency_cache_size, settings.idempotency_store_path)
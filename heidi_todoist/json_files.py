@@ -0,0 +1,27 @@
+import json
+import logging
+import os
+
+
+def load_json_file(path: str, logger: logging.Logger, description: str):
+    """Return the JSON held in a file, or None (logged) when it is missing or unreadable."""
+    try:
+        with open(path) as json_file:
+            return json.load(json_file)
+    except (OSError, ValueError) as e:
+        logger.info(f'No usable {description} at {path}: {str(e)}')
+        return None
+
+
+def save_json_file(path: str, data, logger: logging.Logger, description: str) -> None:
+    """Atomically replace a JSON file so a crash mid-write never leaves it torn; a failure is logged.
+
+    Each process writes its own temporary file, so workers sharing the path can't interleave.
+    """
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'w') as json_file:
+            json.dump(data, json_file)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f'Failed to write {description} {path}: {str(e)}')
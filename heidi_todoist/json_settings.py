@@ -0,0 +1,27 @@
+import json
+
+
+def load_json_setting(value: str | None, name: str, shape: str) -> dict[str, dict]:
+    """Parse a setting given as a JSON object of objects or as the path of a JSON file, raising ValueError if invalid.
+
+    shape describes the object for the error message, e.g. 'task names to rules'. A blank
+    setting is an empty object.
+    """
+    if not value or not value.strip():
+        return {}
+
+    text = value
+    if not value.lstrip().startswith('{'):
+        try:
+            with open(value, encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            raise ValueError(f'{name} file {value} could not be read: {e.strerror}')
+
+    try:
+        config = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError(f'{name} must be a JSON object of {shape}')
+    if not isinstance(config, dict) or not all(isinstance(spec, dict) for spec in config.values()):
+        raise ValueError(f'{name} must be a JSON object of {shape}')
+    return config
@@ -0,0 +1,108 @@
+import logging
+import threading
+import time
+from heidi_todoist.dues import due_date
+from heidi_todoist.json_files import load_json_file, save_json_file
+from heidi_todoist.sync_api import SyncClient
+
+
+class ProjectMirror:
+    """Local mirror of one project's active tasks, kept current with incremental Sync API deltas.
+
+    The mirror can be snapshotted to a JSON file so a cold worker resumes from its last
+    sync_token and only pulls what changed since, instead of re-reading the project.
+    """
+
+    def __init__(self, project_id: str, sync_client: SyncClient, snapshot_path: str | None = None):
+        self.project_id = project_id
+        self.sync_client = sync_client
+        self.snapshot_path = snapshot_path
+        # '*' asks the Sync API for a full sync; it is a sync token, not a credential
+        self.sync_token = '*'  # nosec B105
+        self.tasks: dict[str, str] = {}
+        self.due_times: dict[str, str | None] = {}
+        self.full_sync_at: float | None = None
+        self.refreshed_at: float | None = None
+        self.last_delta_size = 0
+        self.deltas = 0
+        self.full_syncs = 0
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        if snapshot_path:
+            self._load_snapshot(snapshot_path)
+
+    def _load_snapshot(self, snapshot_path: str) -> None:
+        """Resume from a snapshot written for this project, ignoring missing or unreadable files."""
+        snapshot = load_json_file(snapshot_path, self.logger, 'mirror snapshot')
+        if not isinstance(snapshot, dict) or snapshot.get('project_id') != self.project_id:
+            return
+        self.sync_token = snapshot['sync_token']
+        self.tasks = snapshot['tasks']
+        self.due_times = snapshot['due_times']
+        self.full_sync_at = snapshot.get('full_sync_at')
+        self.logger.info(f'Resumed mirror of {len(self.tasks)} tasks from {snapshot_path}')
+
+    def _save_snapshot(self, snapshot_path: str) -> None:
+        """Atomically write the mirror so a crash mid-write never leaves a torn snapshot."""
+        snapshot = {
+            'project_id': self.project_id,
+            'sync_token': self.sync_token,
+            'tasks': self.tasks,
+            'due_times': self.due_times,
+            'full_sync_at': self.full_sync_at
+        }
+        save_json_file(snapshot_path, snapshot, self.logger, 'mirror snapshot')
+
+    def refresh(self) -> dict[str, str]:
+        """Pull the delta since the last sync_token and return content -> task id for the project."""
+        with self._lock:
+            response = self.sync_client.sync(self.sync_token)
+            items = response.get('items', [])
+
+            if response.get('full_sync'):
+                self.tasks = {}
+                self.due_times = {}
+                self.full_sync_at = time.time()
+                self.full_syncs += 1
+
+            for item in items:
+                if item.get('is_deleted') or item.get('checked') or item.get('project_id') != self.project_id:
+                    self.tasks.pop(item['id'], None)
+                    self.due_times.pop(item['id'], None)
+                else:
+                    self.tasks[item['id']] = item['content']
+                    self.due_times[item['id']] = due_date(item)
+
+            self.sync_token = response.get('sync_token', self.sync_token)
+            self.refreshed_at = time.monotonic()
+            self.last_delta_size = len(items)
+            self.deltas += 1
+
+            if self.snapshot_path and (items or response.get('full_sync')):
+                self._save_snapshot(self.snapshot_path)
+
+            return self.entries()
+
+    def entries(self) -> dict[str, str]:
+        """Return content -> task id, keeping the first task seen for duplicate names."""
+        entries: dict[str, str] = {}
+        for task_id, content in self.tasks.items():
+            entries.setdefault(content, task_id)
+        return entries
+
+    def seconds_since_refresh(self) -> float | None:
+        """Return how long ago the last delta was pulled in this process."""
+        if self.refreshed_at is None:
+            return None
+        return time.monotonic() - self.refreshed_at
+
+    def stats(self) -> dict:
+        """Return delta size and sync age metrics."""
+        return {
+            'tasks': len(self.tasks),
+            'deltas': self.deltas,
+            'full_syncs': self.full_syncs,
+            'last_delta_size': self.last_delta_size,
+            'seconds_since_full_sync': None if self.full_sync_at is None else round(time.time() - self.full_sync_at, 1)
+        }
@@ -0,0 +1,187 @@
+import threading
+import time
+from collections import OrderedDict
+from heidi_todoist.services import TodoistService
+from heidi_todoist.services_async import AsyncTodoistService
+from heidi_todoist.session import connection_stats, rate_limit_stats
+from heidi_todoist.settings import get_settings
+
+
+class ClientPool:
+    """Process-wide, thread-safe holder of warm TodoistService instances keyed by API token.
+
+    Each tenant's service carries its own task index, project cache and mirrors. Services are
+    evicted least recently used first: beyond max_size, once unused for idle_ttl seconds, and
+    while the estimated memory of their cached tasks is over memory_limit bytes. Limits left
+    as None are read from settings.
+    """
+
+    def __init__(self, max_size: int | None = None, idle_ttl: float | None = None, memory_limit: int | None = None):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.memory_limit = memory_limit
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.idle_evictions = 0
+        self.memory_evictions = 0
+        self._services: OrderedDict[str, TodoistService] = OrderedDict()
+        self._last_used: dict[str, float] = {}
+        self._async_services: dict[str, AsyncTodoistService] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self) -> tuple[int, float, int]:
+        if self.max_size is not None and self.idle_ttl is not None and self.memory_limit is not None:
+            return self.max_size, self.idle_ttl, self.memory_limit
+        settings = get_settings()
+        return (
+            self.max_size if self.max_size is not None else settings.client_pool_size,
+            self.idle_ttl if self.idle_ttl is not None else settings.client_idle_ttl,
+            self.memory_limit if self.memory_limit is not None else int(settings.client_pool_memory_mb * 1024 * 1024)
+        )
+
+    def _evict(self, token: str) -> None:
+        evicted = self._services.pop(token)
+        self._last_used.pop(token, None)
+        self._async_services.pop(token, None)
+        evicted.session.close()
+        self.evictions += 1
+
+    def _evict_over_limits(self, current: str) -> None:
+        """Drop least recently used services until the pool is within its limits, always keeping current."""
+        max_size, idle_ttl, memory_limit = self._limits()
+
+        # A rotated token or a departed tenant leaves the old client behind
+        while len(self._services) > max_size:
+            self._evict(next(iter(self._services)))
+
+        if idle_ttl > 0:
+            idle_since = time.monotonic() - idle_ttl
+            for token in [token for token, last_used in self._last_used.items() if last_used < idle_since]:
+                if token != current:
+                    self._evict(token)
+                    self.idle_evictions += 1
+
+        if memory_limit > 0:
+            sizes = {token: service.cache_bytes() for token, service in self._services.items()}
+            total = sum(sizes.values())
+            for token in list(self._services):
+                if total <= memory_limit:
+                    break
+                if token != current:
+                    total -= sizes[token]
+                    self._evict(token)
+                    self.memory_evictions += 1
+
+    def get(self, token: str) -> TodoistService:
+        """Return the warm service for a token, building it (and its HTTP session) on first use."""
+        with self._lock:
+            service = self._services.get(token)
+            if service is not None:
+                self.hits += 1
+                self._services.move_to_end(token)
+            else:
+                self.misses += 1
+                service = TodoistService(token=token, settings=get_settings())
+                self._services[token] = service
+
+            self._last_used[token] = time.monotonic()
+            self._evict_over_limits(token)
+            return service
+
+    def services(self) -> list[TodoistService]:
+        """Return the warm services, least recently used first."""
+        with self._lock:
+            return list(self._services.values())
+
+    def get_async(self, token: str) -> AsyncTodoistService:
+        """Return the async wrapper around the warm service for a token."""
+        service = self.get(token)
+        with self._lock:
+            async_service = self._async_services.get(token)
+            if async_service is None or async_service.service is not service:
+                async_service = AsyncTodoistService(service)
+                self._async_services[token] = async_service
+            return async_service
+
+    def stats(self) -> dict:
+        """Return client hit/miss counts, connection reuse, retries, task index and mirror metrics across the pool."""
+        with self._lock:
+            connections_opened = 0
+            requests_sent = 0
+            index_hits = 0
+            index_misses = 0
+            retries = 0
+            rate_limit_waits = 0
+            mirrors = {}
+            cache_bytes = 0
+            for service in self._services.values():
+                session_stats = connection_stats(service.session)
+                connections_opened += session_stats['connections_opened']
+                requests_sent += session_stats['requests_sent']
+                index_hits += service.task_index.hits
+                index_misses += service.task_index.misses
+                limiter_stats = rate_limit_stats(service.session)
+                retries += limiter_stats.get('retries', 0)
+                rate_limit_waits += limiter_stats.get('waits', 0)
+                mirrors.update(service.mirror_stats())
+                cache_bytes += service.cache_bytes()
+            index_lookups = index_hits + index_misses
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'idle_evictions': self.idle_evictions,
+                'memory_evictions': self.memory_evictions,
+                'size': len(self._services),
+                'cache_bytes': cache_bytes,
+                'connections_opened': connections_opened,
+                'requests_sent': requests_sent,
+                'index_hits': index_hits,
+                'index_misses': index_misses,
+                'index_hit_rate': round(index_hits / index_lookups, 3) if index_lookups else None,
+                'retries': retries,
+                'rate_limit_waits': rate_limit_waits,
+                'mirrors': mirrors
+            }
+
+    def clear(self) -> None:
+        """Close every pooled session and reset the counters."""
+        with self._lock:
+            for service in self._services.values():
+                service.session.close()
+            self._services.clear()
+            self._last_used.clear()
+            self._async_services.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.idle_evictions = 0
+            self.memory_evictions = 0
+
+
+client_pool = ClientPool()
+
+
+def _token(tenant_id: str | None) -> str:
+    """Return the tenant's token, or TODOIST_API_TOKEN when no tenant is given."""
+    settings = get_settings()
+    if tenant_id is not None:
+        tenant = settings.tenants.get(tenant_id)
+        if tenant is None:
+            raise ValueError(f'Tenant {tenant_id} is not configured in TENANTS')
+        return tenant.token
+    if not settings.todoist_api_token:
+        raise ValueError('TODOIST_API_TOKEN environment variable not set')
+    return settings.todoist_api_token
+
+
+def get_todoist_service(tenant_id: str | None = None) -> TodoistService:
+    """Return the warm TodoistService for a tenant, or for the configured TODOIST_API_TOKEN."""
+    return client_pool.get(_token(tenant_id))
+
+
+def get_async_todoist_service(tenant_id: str | None = None) -> AsyncTodoistService:
+    """Return the warm AsyncTodoistService for a tenant, or for the configured TODOIST_API_TOKEN."""
+    return client_pool.get_async(_token(tenant_id))
@@ -0,0 +1,81 @@
+import logging
+import threading
+from todoist_api_python.api import TodoistAPI
+from heidi_todoist.json_files import load_json_file, save_json_file
+
+
+class ProjectNotFoundError(ValueError):
+    """Raised when a configured project id or name matches none of the account's projects."""
+
+
+class ProjectResolver:
+    """Maps a project's URL id ("heidi-6cvcJh2HrqCMxvcF"), API id or name to its API id.
+
+    Every resolution lists the account's projects once and is then remembered for the life of
+    the worker. With a cache path the mapping is also kept in a JSON file, so a cold worker
+    resolves without calling Todoist at all.
+    """
+
+    def __init__(self, cache_path: str | None = None):
+        self.cache_path = cache_path
+        self.lookups = 0
+        self._project_ids: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        if cache_path:
+            self._load_cache(cache_path)
+
+    def _load_cache(self, cache_path: str) -> None:
+        """Start from a previously written cache, ignoring missing or unreadable files."""
+        project_ids = load_json_file(cache_path, self.logger, 'project cache')
+        if isinstance(project_ids, dict):
+            self._project_ids = {str(value): str(project_id) for value, project_id in project_ids.items()}
+
+    def cached(self, value: str) -> str | None:
+        """Return the API id already resolved for value, without calling Todoist."""
+        with self._lock:
+            return self._project_ids.get(value)
+
+    def _match(self, value: str, projects: list) -> str | None:
+        """Pick the project value refers to, preferring an exact id over the URL id over the name."""
+        slug_id = value.rsplit('-', 1)[-1]
+        by_id = {project.id: project for project in projects}
+        if value in by_id:
+            return value
+        if slug_id in by_id:
+            return slug_id
+
+        names = [project for project in projects if project.name.casefold() == value.casefold()]
+        if len(names) > 1:
+            self.logger.warning(f'{len(names)} projects are named {value}, using {names[0].id}')
+        return names[0].id if names else None
+
+    def resolve(self, value: str, api: TodoistAPI) -> str:
+        """Return the API project id for value, listing the account's projects the first time."""
+        project_id = self.cached(value)
+        if project_id is not None:
+            return project_id
+
+        with self._lock:
+            # Another thread may have resolved it while this one waited
+            project_id = self._project_ids.get(value)
+            if project_id is not None:
+                return project_id
+
+            projects = [project for page in api.get_projects() for project in page]
+            self.lookups += 1
+            project_id = self._match(value, projects)
+            if project_id is None:
+                raise ProjectNotFoundError(f'Project {value} not found among {len(projects)} Todoist projects')
+
+            self._project_ids[value] = project_id
+            if self.cache_path:
+                save_json_file(self.cache_path, self._project_ids, self.logger, 'project cache')
+
+        self.logger.info(f'Resolved project {value} to {project_id}')
+        return project_id
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'resolved': len(self._project_ids), 'lookups': self.lookups}
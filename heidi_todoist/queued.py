@@ -0,0 +1,54 @@
+import json
+import uuid
+from datetime import datetime, timezone
+
+# Created by terraform; Azurite creates it on first use when running locally
+TASK_QUEUE_NAME = 'heidi-complete-task'
+
+# App setting holding the storage connection string (UseDevelopmentStorage=true for Azurite)
+TASK_QUEUE_CONNECTION = 'AzureWebJobsStorage'
+
+
+def task_message(project_id: str, task_name: str, requested_at: datetime | None = None,
+                 tenant_id: str | None = None) -> dict:
+    """Build the queue message for a completeTask request accepted now (or at requested_at)."""
+    requested_at = requested_at or datetime.now(timezone.utc)
+    message = {
+        'request_id': uuid.uuid4().hex,
+        'project_id': project_id,
+        'task_name': task_name,
+        'requested_at': requested_at.isoformat()
+    }
+    # Without a tenant the message is processed with TODOIST_API_TOKEN
+    if tenant_id is not None:
+        message['tenant_id'] = tenant_id
+    return message
+
+
+def parse_task_message(body: bytes | str) -> dict:
+    """Parse and validate a queue message, returning it with requested_at as an aware datetime.
+
+    Raises ValueError for a message that can never be processed.
+    """
+    try:
+        message = json.loads(body)
+    except (TypeError, ValueError):
+        raise ValueError('Queue message is not valid JSON')
+    if not isinstance(message, dict):
+        raise ValueError('Queue message must be a JSON object')
+
+    for field in ('request_id', 'project_id', 'task_name', 'requested_at'):
+        if not isinstance(message.get(field), str) or not message[field]:
+            raise ValueError(f'Queue message is missing {field}')
+
+    if 'tenant_id' in message and (not isinstance(message['tenant_id'], str) or not message['tenant_id']):
+        raise ValueError('Queue message has an invalid tenant_id')
+
+    try:
+        requested_at = datetime.fromisoformat(message['requested_at'])
+    except ValueError:
+        raise ValueError(f'Queue message has an invalid requested_at: {message["requested_at"]}')
+    if requested_at.tzinfo is None:
+        raise ValueError('Queue message requested_at must include a UTC offset')
+
+    return {**message, 'requested_at': requested_at}
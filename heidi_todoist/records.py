@@ -0,0 +1,117 @@
+import json
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+import requests
+from heidi_todoist.dues import due_date
+from heidi_todoist.session import TIMEOUT, auth_headers
+from heidi_todoist.timing import count
+
+
+TASKS_URL = 'https://api.todoist.com/api/v1/tasks'
+TASKS_FILTER_URL = 'https://api.todoist.com/api/v1/tasks/filter'
+
+# Shared by every reader in the process so prefetching doesn't spawn threads per request
+_prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='todoist-prefetch')
+
+
+class TaskRecord:
+    """The only fields of a Todoist task the lookup and next-due paths read."""
+
+    __slots__ = ('id', 'content', 'project_id', 'due')
+
+    def __init__(self, id: str, content: str, project_id: str, due: str | None = None):
+        self.id = id
+        self.content = content
+        self.project_id = project_id
+        self.due = due
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TaskRecord):
+            return NotImplemented
+        return (self.id, self.content, self.project_id, self.due) == \
+            (other.id, other.content, other.project_id, other.due)
+
+    def __repr__(self) -> str:
+        return (f'TaskRecord(id={self.id!r}, content={self.content!r}, project_id={self.project_id!r}, '
+                f'due={self.due!r})')
+
+
+def parse_task_page(body: bytes | str) -> tuple[list[TaskRecord], str | None]:
+    """Decode a page of a task listing into records and the cursor of the next page."""
+    page = json.loads(body)
+    if not isinstance(page, dict) or not isinstance(page.get('results'), list):
+        raise TypeError('Unexpected task listing response from Todoist')
+    return [TaskRecord(task['id'], task['content'], task['project_id'], due_date(task)) for task in page['results']], \
+        page.get('next_cursor')
+
+
+class TaskReader:
+    """Pages through Todoist's task listings, decoding each page straight into TaskRecords.
+
+    Mirrors the get_tasks and filter_tasks calls of todoist_api_python, but skips building a
+    full Task (due, labels, timestamps...) for every task that is only matched by content.
+
+    With prefetch on, the next page is requested in the background as soon as its cursor is
+    known, so it downloads while the caller scans the current one. Cursors are opaque, so
+    page N+1 can never be requested before page N has arrived. Closing the iterator early,
+    e.g. breaking out of a scan once the task is found, drops the page still in flight.
+    """
+
+    def __init__(self, session: requests.Session, token: str, page_size: int | None = None, prefetch: bool = False):
+        self.session = session
+        self.token = token
+        self.page_size = page_size
+        self.prefetch = prefetch
+
+    def _fetch(self, url: str, params: dict, cursor: str | None) -> tuple[list[TaskRecord], str | None]:
+        if self.page_size:
+            params = {**params, 'limit': self.page_size}
+        if cursor:
+            params = {**params, 'cursor': cursor}
+        response = self.session.get(
+            url,
+            params=params,
+            headers=auth_headers(self.token),
+            timeout=TIMEOUT
+        )
+        response.raise_for_status()
+        return parse_task_page(response.content)
+
+    def _pages(self, url: str, params: dict) -> Iterator[list[TaskRecord]]:
+        if self.prefetch:
+            yield from self._prefetched_pages(url, params)
+            return
+
+        cursor = None
+        while True:
+            records, cursor = self._fetch(url, params, cursor)
+            yield records
+            if not cursor:
+                return
+
+    def _submit(self, url: str, params: dict, cursor: str | None) -> Future:
+        # Run in a copy of the caller's context so retries are still counted on its timer
+        return _prefetch_executor.submit(copy_context().run, self._fetch, url, params, cursor)
+
+    def _prefetched_pages(self, url: str, params: dict) -> Iterator[list[TaskRecord]]:
+        pending: Future | None = self._submit(url, params, None)
+        try:
+            while pending is not None:
+                current, pending = pending, None
+                records, cursor = current.result()
+                if cursor:
+                    pending = self._submit(url, params, cursor)
+                yield records
+        finally:
+            # The caller stopped early: cancel the next page if it has not been sent yet
+            if pending is not None and not pending.cancel():
+                count('pages_discarded')
+
+    def get_tasks(self, project_id: str) -> Iterator[list[TaskRecord]]:
+        """Yield the project's active tasks a page at a time."""
+        return self._pages(TASKS_URL, {'project_id': project_id})
+
+    def filter_tasks(self, query: str) -> Iterator[list[TaskRecord]]:
+        """Yield the active tasks matching a filter query a page at a time."""
+        return self._pages(TASKS_FILTER_URL, {'query': query})
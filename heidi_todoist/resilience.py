@@ -0,0 +1,224 @@
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+import requests
+from urllib3.exceptions import NewConnectionError
+from heidi_todoist.settings import get_settings
+
+# Todoist allows 1000 requests per user per 15 minutes across the REST and Sync APIs
+TODOIST_RATE_WINDOW = 15 * 60
+
+# Methods Todoist applies at most once however often they are sent
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+
+RETRYABLE_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """Raised when the client-side limiter would make a request wait longer than allowed."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'Todoist rate limit reached, retry after {math.ceil(retry_after)} seconds')
+        self.retry_after = retry_after
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every call made with one Todoist token."""
+
+    def __init__(self, rate: float, capacity: int, max_wait: float = 10.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.waits = 0
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available, and return how long that took.
+
+        Raises RateLimitExceeded instead of sleeping longer than max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Tokens are reserved ahead of time so concurrent callers queue up in order
+            wait = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0.0)
+            if wait > self.max_wait:
+                raise RateLimitExceeded(wait)
+            self._tokens -= 1
+            if wait:
+                self.waits += 1
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every caller for the given time, e.g. after Todoist answers 429 with Retry-After."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {'tokens': round(self._tokens, 2), 'waits': self.waits}
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded retries with full-jitter exponential backoff that honour Retry-After.
+
+    A write is retried only when Todoist cannot have applied it: a 429, or a connection that
+    was never established. Anything else that fails part-way, like a 5xx or a read timeout, is
+    only retried for idempotent methods, so retries never create a task twice.
+    """
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    retry_after_max: float = 30.0
+
+    def should_retry_status(self, method: str, status_code: int) -> bool:
+        if status_code == 429:
+            return True
+        return status_code in RETRYABLE_STATUSES and method in IDEMPOTENT_METHODS
+
+    def should_retry_error(self, method: str, error: Exception) -> bool:
+        if method in IDEMPOTENT_METHODS:
+            return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        # requests wraps urllib3's MaxRetryError, whose reason says whether the connection was ever made
+        reason = getattr(error.args[0], 'reason', None) if error.args else None
+        return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float | None:
+        """Return how long to wait before the given retry, or None if Retry-After asks for too long."""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.retry_after_max else None
+        # Full jitter spreads retries out; it is not a security use of random
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))  # nosec B311
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling Todoist while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'Todoist is unavailable, retry after {math.ceil(retry_after)} seconds')
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker that fails Todoist calls fast while Todoist is down.
+
+    Closed: calls go through, and consecutive failures (5xx, connection errors, timeouts) are
+    counted. After failure_threshold of them the breaker opens and rejects every call for
+    reset_timeout seconds. It then goes half-open and lets a single trial call through: a
+    success closes it again, a failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def _retry_after(self, now: float) -> float:
+        return max(0.0, self._opened_at + self.reset_timeout - now)
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call must not go to Todoist right now."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                retry_after = self._retry_after(now)
+                if retry_after > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(retry_after)
+                self.state = self.HALF_OPEN
+                self.logger.info('Circuit breaker half-open, letting a trial call through to Todoist')
+
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(1.0)
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                self.logger.info('Circuit breaker closed, Todoist is responding again')
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opens += 1
+                self._opened_at = time.monotonic()
+                self.logger.warning(f'Circuit breaker opened after {self.failures} consecutive Todoist failures, '
+                                    f'failing fast for {self.reset_timeout:.0f}s')
+
+    def release(self) -> None:
+        """Give back a half-open trial call that never reached Todoist."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'opens': self.opens,
+                'rejected': self.rejected,
+                'retry_after': round(self._retry_after(time.monotonic()), 1) if self.state == self.OPEN else 0.0
+            }
+
+
+@lru_cache(maxsize=1)
+def todoist_breaker() -> CircuitBreaker:
+    """Return the circuit breaker shared by every Todoist client in the worker process."""
+    settings = get_settings()
+    return CircuitBreaker(settings.breaker_failure_threshold, settings.breaker_reset_timeout)
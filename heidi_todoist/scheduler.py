@@ -0,0 +1,165 @@
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from heidi_todoist.json_settings import load_json_setting
+
+WEEKDAYS = ('mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun')
+ALL_WEEKDAYS = 0b1111111
+
+# The due time every task gets unless DUE_RULES says otherwise: 4.5 hours later, not before 8:30am
+DEFAULT_RULE_SPEC = {'interval': 4.5, 'not_before': '08:30'}
+
+RULE_FIELDS = ('interval', 'not_before', 'not_after', 'quiet_hours', 'weekdays')
+
+# Each adjustment only moves the due time forward, so a consistent rule settles within a few passes
+MAX_ADJUSTMENTS = 8
+
+ONE_DAY = timedelta(days=1)
+
+
+def _minutes(value, name: str) -> int:
+    """Parse 'HH:MM' into minutes after midnight."""
+    try:
+        hours_text, minutes_text = str(value).split(':')
+        hours, minutes = int(hours_text), int(minutes_text)
+    except ValueError:
+        raise ValueError(f'{name} must be a time of day like "08:30"')
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f'{name} must be a time of day like "08:30"')
+    return hours * 60 + minutes
+
+
+def _at(moment: datetime, minutes: int) -> datetime:
+    return moment.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+
+@dataclass(frozen=True)
+class DueRule:
+    """A compiled due-time rule: an interval, moved forward to respect time-of-day and weekday limits.
+
+    Times of day are kept as minutes after midnight and weekdays as a bitmask, so evaluating
+    a rule is integer comparisons plus at most a few datetime replaces.
+    """
+
+    interval: timedelta
+    not_before: int | None = None
+    not_after: int | None = None
+    quiet_start: int | None = None
+    quiet_end: int | None = None
+    weekdays: int = ALL_WEEKDAYS
+
+    @classmethod
+    def compile(cls, spec: Mapping, name: str = 'default') -> 'DueRule':
+        """Build a rule from its config, raising ValueError for invalid values."""
+        unknown = set(spec) - set(RULE_FIELDS)
+        if unknown:
+            raise ValueError(f'DUE_RULES {name} has unknown fields: {", ".join(sorted(unknown))}')
+
+        try:
+            interval = float(spec['interval'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f'DUE_RULES {name} interval must be a number of hours')
+        if interval <= 0:
+            raise ValueError(f'DUE_RULES {name} interval must be positive')
+
+        not_before = _minutes(spec['not_before'], f'DUE_RULES {name} not_before') \
+            if spec.get('not_before') is not None else None
+        not_after = _minutes(spec['not_after'], f'DUE_RULES {name} not_after') \
+            if spec.get('not_after') is not None else None
+        if not_before is not None and not_after is not None and not_before > not_after:
+            raise ValueError(f'DUE_RULES {name} not_before must not be later than not_after')
+
+        quiet_start = quiet_end = None
+        if spec.get('quiet_hours') is not None:
+            try:
+                start, end = str(spec['quiet_hours']).split('-')
+            except ValueError:
+                raise ValueError(f'DUE_RULES {name} quiet_hours must look like "22:00-07:00"')
+            quiet_start = _minutes(start.strip(), f'DUE_RULES {name} quiet_hours')
+            quiet_end = _minutes(end.strip(), f'DUE_RULES {name} quiet_hours')
+            if quiet_start == quiet_end:
+                raise ValueError(f'DUE_RULES {name} quiet_hours must not start and end at the same time')
+
+        weekdays = ALL_WEEKDAYS
+        if spec.get('weekdays') is not None:
+            weekdays = 0
+            for day in spec['weekdays']:
+                day = str(day)[:3].lower()
+                if day not in WEEKDAYS:
+                    raise ValueError(f'DUE_RULES {name} weekdays must be names like "mon" or "tuesday"')
+                weekdays |= 1 << WEEKDAYS.index(day)
+            if not weekdays:
+                raise ValueError(f'DUE_RULES {name} weekdays must not be empty')
+
+        return cls(timedelta(hours=interval), not_before, not_after, quiet_start, quiet_end, weekdays)
+
+    @staticmethod
+    def _in_quiet_hours(minutes: int, quiet_start: int, quiet_end: int) -> bool:
+        if quiet_start < quiet_end:
+            return quiet_start <= minutes < quiet_end
+        # Quiet hours that run past midnight
+        return minutes >= quiet_start or minutes < quiet_end
+
+    def _adjust(self, due: datetime) -> datetime:
+        """Move due to the next moment the rule allows, or return it unchanged if it already does."""
+        if not self.weekdays >> due.weekday() & 1:
+            return _at(due + ONE_DAY, self.not_before or 0)
+
+        minutes = due.hour * 60 + due.minute
+        if self.not_before is not None and minutes < self.not_before:
+            return _at(due, self.not_before)
+        if self.not_after is not None and minutes > self.not_after:
+            return _at(due + ONE_DAY, self.not_before or 0)
+        quiet_start, quiet_end = self.quiet_start, self.quiet_end
+        if quiet_start is not None and quiet_end is not None and self._in_quiet_hours(minutes, quiet_start, quiet_end):
+            return _at(due if minutes < quiet_end else due + ONE_DAY, quiet_end)
+        return due
+
+    def next_due(self, now: datetime) -> datetime:
+        """Return when a task completed at now (a local time) is next due."""
+        due = now + self.interval
+        for _ in range(MAX_ADJUSTMENTS):
+            adjusted = self._adjust(due)
+            if adjusted == due:
+                break
+            due = adjusted
+        return due
+
+
+@dataclass(frozen=True)
+class DueSchedule:
+    """Due-time rules by task name, with a default for every other task."""
+
+    default: DueRule
+    rules: Mapping[str, DueRule] = field(default_factory=dict)
+
+    def rule_for(self, task_name: str | None) -> DueRule:
+        return self.rules.get(task_name, self.default) if task_name is not None else self.default
+
+    def next_due(self, task_name: str | None, now: datetime) -> datetime:
+        return self.rule_for(task_name).next_due(now)
+
+    def next_due_many(self, task_names: Iterable[str], now: datetime) -> dict[str, datetime]:
+        """Return each task's due time for a batch completed at now, evaluating each distinct rule once."""
+        by_rule: dict[DueRule, datetime] = {}
+        due_times = {}
+        for task_name in task_names:
+            rule = self.rule_for(task_name)
+            if rule not in by_rule:
+                by_rule[rule] = rule.next_due(now)
+            due_times[task_name] = by_rule[rule]
+        return due_times
+
+
+def load_due_schedule(value: str | None) -> DueSchedule:
+    """Compile DUE_RULES, given as JSON or as the path of a JSON file, raising ValueError if invalid.
+
+    The JSON maps task names to rules; a "default" entry replaces the built-in default rule,
+    and every task rule inherits the fields it leaves out from the default.
+    """
+    config = load_json_setting(value, 'DUE_RULES', 'task names to rules')
+
+    default_spec = {**DEFAULT_RULE_SPEC, **config.pop('default', {})}
+    default = DueRule.compile(default_spec)
+    rules = {name: DueRule.compile({**default_spec, **spec}, name) for name, spec in config.items()}
+    return DueSchedule(default, rules)
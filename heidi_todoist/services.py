@@ -1,95 +1,525 @@
-import os
+import hashlib
 import logging
-from datetime import datetime, timedelta
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime
 import requests
-from zoneinfo import ZoneInfo
 from todoist_api_python.api import TodoistAPI
+from heidi_todoist.cache import ENTRY_BYTES, SharedTaskIndex, TaskIndex
+from heidi_todoist.dues import todoist_due_date
+from heidi_todoist.mirror import ProjectMirror
+from heidi_todoist.projects import ProjectResolver
+from heidi_todoist.records import TaskReader
+from heidi_todoist.resilience import CircuitOpenError, RateLimitExceeded, retry_after_seconds, todoist_breaker
+from heidi_todoist.session import create_session
+from heidi_todoist.settings import Settings
+from heidi_todoist.sync_api import (MAX_COMMANDS, SyncClient, SyncCommandError, add_command, close_command,
+                                   command_error)
+from heidi_todoist.timing import count, timed
+
+
+# Shared by every service in the process so parallel writes don't spawn threads per request
+_write_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='todoist-write')
+
+# Characters with a meaning in Todoist's filter query language
+FILTER_SPECIAL_CHARACTERS = '\\&|!(),#@*'
+
+# Each task in a batch takes up to two commands, a close and an add
+MAX_BATCH_TASKS = MAX_COMMANDS // 2
+
+
+def _account_path(path: str | None, token: str, settings: Settings) -> str | None:
+    """Give every token other than TODOIST_API_TOKEN its own copy of a cache file."""
+    if not path or token == settings.todoist_api_token:
+        return path
+    root, extension = os.path.splitext(path)
+    return f'{root}.{hashlib.sha256(token.encode()).hexdigest()[:12]}{extension}'
 
 
 # noinspection PyMethodMayBeStatic
 class TodoistService:
     """Minimal service class for completing and recreating Todoist tasks."""
 
-    def __init__(self):
-        token = os.environ.get('TODOIST_API_TOKEN')
+    def __init__(self, token: str | None = None, session: requests.Session | None = None,
+                 settings: Settings | None = None):
+        self.settings = settings if settings is not None else Settings.from_env()
+        token = token or self.settings.todoist_api_token
         if not token:
             raise ValueError('TODOIST_API_TOKEN environment variable not set')
 
-        self.api = TodoistAPI(token)
+        self.token = token
+        self.session = session if session is not None else create_session(
+            self.settings.pool_maxsize, self.settings.rate_limit, self.settings.rate_burst, self.settings.max_retries,
+            todoist_breaker() if self.settings.breaker_failure_threshold > 0 else None
+        )
+        self.api = TodoistAPI(token, session=self.session)
+        self.sync = SyncClient(self.session, token)
+        # Lookups only need id and content, so task listings skip the SDK's full Task models
+        self.tasks = TaskReader(self.session, token, self.settings.page_size, self.settings.prefetch_pages)
+        self.task_index: TaskIndex
+        if self.settings.task_cache_path:
+            self.task_index = SharedTaskIndex(self.settings.task_cache_path, ttl=self.settings.task_index_ttl)
+        else:
+            self.task_index = TaskIndex(ttl=self.settings.task_index_ttl)
+        # Tenants' projects can share names, so each account resolves through its own cache file
+        self.project_resolver = ProjectResolver(_account_path(self.settings.project_cache_path, token, self.settings))
+        self.mirror_path = _account_path(self.settings.mirror_path, token, self.settings)
+        self.lookup_mode = self.settings.lookup_mode
+        self.write_mode = self.settings.write_mode
+        self.mirror_interval = self.settings.mirror_interval
+        self._project_names: dict[str, str] = {}
+        self._mirrors: dict[str, ProjectMirror] = {}
         self.logger = logging.getLogger(__name__)
 
-    def _calculate_next_due_time(self) -> str:
-        """Calculate the next due time: 4.5 hours from now, but not before 8:30am in the configured timezone."""
-        timezone_name = os.environ.get('TIMEZONE', 'America/New_York')
-        tz = ZoneInfo(timezone_name)
-        now = datetime.now(tz)
-        next_due = now + timedelta(hours=4.5)
+    def _local_now(self, requested_at: datetime | None = None) -> datetime:
+        """Return requested_at, or now, in the configured timezone."""
+        if requested_at is not None:
+            return requested_at.astimezone(self.settings.timezone)
+        return datetime.now(self.settings.timezone)
 
-        # If the calculated time is before 8:30am, set it to 8:30am
-        if next_due.hour < 8 or (next_due.hour == 8 and next_due.minute < 30):
-            next_due = next_due.replace(hour=8, minute=30, second=0, microsecond=0)
+    def _calculate_next_due_time(self, requested_at: datetime | None = None, task_name: str | None = None) -> str:
+        """Calculate the task's next due time from its DUE_RULES rule, counting from requested_at (or now)."""
+        next_due = self.settings.due_schedule.next_due(task_name, self._local_now(requested_at))
 
         # Format as ISO datetime string with timezone for Todoist API
         return next_due.isoformat()
 
-    def _extract_project_id(self, project_id: str) -> str:
-        """Extract or validate the project ID format."""
-        # If project_id contains a dash, it might be formatted as "name-id"
-        # Try to extract the part after the last dash
-        if '-' in project_id:
-            parts = project_id.split('-')
-            # Return the last part which should be the actual ID
-            potential_id = parts[-1]
-            self.logger.info(f'Extracted potential project ID: {potential_id} from {project_id}')
-            return potential_id
-
-        # Return as-is if no dash found
-        return project_id
-
-    def complete_and_recreate_task(self, project_id: str, task_name: str) -> dict:
-        """Complete a task by name and create a new one with the same name due in 4.5 hours."""
-        completed_task_id = None
-        created_task_id = None
+    def resolve_project_id(self, project_id: str) -> str:
+        """Return the API id for a project given by URL id, API id or name."""
+        return self.project_resolver.resolve(project_id, self.api)
 
-        try:
-            # Extract/validate project_id format
-            actual_project_id = self._extract_project_id(project_id)
-            self.logger.info(f'Using project_id: {actual_project_id} (original: {project_id})')
+    def _refresh_task_index(self, project_id: str) -> dict[str, str]:
+        """List every open task in the project and reload the content -> id index and due dates."""
+        return self._list_project(project_id)[0]
 
-            # Step 1: Find and complete the existing task (if it exists)
-            tasks_iterator = self.api.get_tasks(project_id=actual_project_id)
-
-            target_task = None
-            for task_batch in tasks_iterator:
-                for task in task_batch:
-                    if task.content == task_name:
-                        target_task = task
-                        break
-                if target_task:
+    def _list_project(self, project_id: str) -> tuple[dict[str, str], dict[str, str | None]]:
+        """Reload the project's index, returning its content -> id entries and due dates by id."""
+        entries: dict[str, str] = {}
+        due_times: dict[str, str | None] = {}
+        for task_batch in self.tasks.get_tasks(project_id=project_id):
+            count('pages')
+            count('tasks_scanned', len(task_batch))
+            for task in task_batch:
+                # Keep the first match, as the original scan did
+                if task.content not in entries:
+                    entries[task.content] = task.id
+                    due_times[task.id] = task.due
+
+        self.task_index.replace(project_id, entries, due_times)
+        self.logger.info(f'Indexed {len(entries)} tasks for project {project_id}')
+        return entries, due_times
+
+    def _escape_filter(self, value: str) -> str:
+        """Escape a literal for use in a Todoist filter query."""
+        return ''.join(f'\\{char}' if char in FILTER_SPECIAL_CHARACTERS else char for char in value)
+
+    def _project_name(self, project_id: str) -> str:
+        """Return the project's name, fetching it once per service."""
+        if project_id not in self._project_names:
+            self._project_names[project_id] = self.api.get_project(project_id).name
+        return self._project_names[project_id]
+
+    def _scan_for_task_id(self, project_id: str, task_name: str) -> str | None:
+        """Page through the project until a task with matching content is found."""
+        pages = 0
+        scanned = 0
+        task_id = None
+        for task_batch in self.tasks.get_tasks(project_id=project_id):
+            pages += 1
+            for task in task_batch:
+                scanned += 1
+                if task.content == task_name:
+                    task_id = task.id
+                    break
+            if task_id:
+                break
+
+        count('pages', pages)
+        count('tasks_scanned', scanned)
+        self.logger.info(f'Scan lookup: {pages} pages, {scanned} tasks scanned')
+        return task_id
+
+    def _filter_for_task_id(self, project_id: str, task_name: str) -> str | None:
+        """Let Todoist narrow the candidates, then confirm the exact match locally."""
+        project_name = self._escape_filter(self._project_name(project_id))
+        query = f'#{project_name} & search: {self._escape_filter(task_name)}'
+
+        pages = 0
+        scanned = 0
+        task_id = None
+        # search: is a case-insensitive substring match, so candidates still need checking
+        for task_batch in self.tasks.filter_tasks(query=query):
+            pages += 1
+            for task in task_batch:
+                scanned += 1
+                if task.content == task_name and task.project_id == project_id:
+                    task_id = task.id
                     break
+            if task_id:
+                break
+
+        count('pages', pages)
+        count('tasks_scanned', scanned)
+        self.logger.info(f'Filter lookup: {pages} pages, {scanned} candidates')
+        return task_id
+
+    def _mirror(self, project_id: str) -> ProjectMirror:
+        """Return the project's mirror, resuming from TASK_MIRROR_PATH on first use."""
+        mirror = self._mirrors.get(project_id)
+        if mirror is None:
+            mirror = self._mirrors.setdefault(
+                project_id, ProjectMirror(project_id, self.sync, self.mirror_path)
+            )
+        return mirror
+
+    def _mirror_task_id(self, project_id: str, task_name: str) -> str | None:
+        """Pull the mirror's delta (at most once per TASK_MIRROR_INTERVAL) and resolve the name from it."""
+        mirror = self._mirror(project_id)
+        age = mirror.seconds_since_refresh()
+        if age is not None and age < self.mirror_interval:
+            fresh, task_id = self.task_index.lookup(project_id, task_name)
+            if fresh:
+                return task_id
+
+        entries = mirror.refresh()
+        count('delta_items', mirror.last_delta_size)
+        # The index carries our own write-through updates between deltas
+        self.task_index.replace(project_id, entries, dict(mirror.due_times))
+        self.logger.info(f'Mirror delta: {mirror.last_delta_size} items, {len(entries)} tasks mirrored')
+        return entries.get(task_name)
+
+    def cache_bytes(self) -> int:
+        """Estimate the memory held by this account's cached and mirrored tasks."""
+        mirrored = sum(len(mirror.tasks) for mirror in list(self._mirrors.values()))
+        return self.task_index.memory_bytes() + mirrored * ENTRY_BYTES
 
-            if target_task:
-                # Complete the existing task
-                success = self.api.complete_task(task_id=target_task.id)
-                if success:
-                    completed_task_id = target_task.id
-                    self.logger.info(f'Completed existing task: {target_task.id}')
+    def mirror_stats(self) -> dict:
+        """Return delta size and sync age metrics for every mirrored project."""
+        return {project_id: mirror.stats() for project_id, mirror in self._mirrors.items()}
+
+    def refresh_project(self, project_id: str) -> dict:
+        """Bring the project's cached tasks up to date ahead of requests, skipping the work when nothing changed.
+
+        Mirror mode pulls the Sync API delta and only rebuilds the index when the delta has
+        items. Index mode re-lists the project once the index is past half its TTL, so requests
+        between two refreshes keep finding it fresh. Scan and filter modes cache nothing.
+        """
+        actual_project_id = self.resolve_project_id(project_id)
+        result = {'project_id': actual_project_id, 'lookup_mode': self.lookup_mode, 'refreshed': False}
+
+        if self.lookup_mode == 'mirror':
+            mirror = self._mirror(actual_project_id)
+            entries = mirror.refresh()
+            count('delta_items', mirror.last_delta_size)
+            result['changes'] = mirror.last_delta_size
+            if mirror.last_delta_size or not self.task_index.is_fresh(actual_project_id):
+                self.task_index.replace(actual_project_id, entries, dict(mirror.due_times))
+                result['refreshed'] = True
+        elif self.lookup_mode == 'index':
+            age = self.task_index.age(actual_project_id)
+            if age is None or age > self.task_index.ttl / 2:
+                self._refresh_task_index(actual_project_id)
+                result['refreshed'] = True
+
+        return result
+
+    def _error_result(self, error: Exception, project_id: str | None = None) -> dict:
+        """Log a failed call and describe it as an error result.
+
+        Rate limits and an open circuit carry retry_after (and circuit_open) so the route can
+        tell the caller when to try again. Given the project_id, a 400 is reported as a bad one.
+        """
+        if isinstance(error, CircuitOpenError):
+            self.logger.warning(str(error))
+            return {'success': False, 'error': str(error), 'circuit_open': True, 'retry_after': error.retry_after}
+        if isinstance(error, RateLimitExceeded):
+            self.logger.error(str(error))
+            return {'success': False, 'error': str(error), 'retry_after': error.retry_after}
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            if error.response.status_code == 400 and project_id is not None:
+                self.logger.error(f'Bad Request (400) - likely invalid project_id format: {project_id}. '
+                                  f'Error: {str(error)}')
+                return {'success': False, 'error': f'Invalid project_id format: {project_id}. '
+                                                   f'Please check that the project ID is correct.'}
+            if error.response.status_code == 429:
+                self.logger.error(f'Rate limited by Todoist: {str(error)}')
+                return {'success': False, 'error': f'Rate limited by Todoist: {str(error)}',
+                        'retry_after': retry_after_seconds(error.response.headers.get('Retry-After')) or 0}
+        if isinstance(error, requests.exceptions.HTTPError):
+            self.logger.error(f'Todoist API HTTP error: {str(error)}')
+            return {'success': False, 'error': f'API error: {str(error)}'}
+        if isinstance(error, requests.exceptions.RequestException):
+            self.logger.error(f'Todoist API request error: {str(error)}')
+            return {'success': False, 'error': f'API request error: {str(error)}'}
+        self.logger.error(f'Unexpected error: {str(error)}')
+        return {'success': False, 'error': str(error)}
+
+    def next_due(self, project_id: str, task_name: str, max_age: float) -> dict:
+        """Return the open task's id and due date for a name, without calling Todoist when possible.
+
+        Answers from the cached index when the project was loaded at most max_age seconds ago
+        and the task's due date is known; otherwise lists the project once and answers from that.
+        """
+        try:
+            actual_project_id = self.resolve_project_id(project_id)
+            with timed('lookup'):
+                cached = self.task_index.lookup_due(actual_project_id, task_name, max_age)
+                if cached is not None:
+                    task_id, due, age = cached['task_id'], cached['due'], cached['age']
                 else:
-                    self.logger.warning(f'Failed to complete existing task: {target_task.id}')
-            else:
-                self.logger.info(f'No existing task "{task_name}" found to complete')
+                    entries, due_times = self._list_project(actual_project_id)
+                    task_id, age = entries.get(task_name), 0.0
+                    due = due_times.get(task_id) if task_id is not None else None
+
+            if task_id is None:
+                return {'success': False, 'error': f'Task "{task_name}" not found in project',
+                        'cached': cached is not None, 'age': round(age, 1)}
+            return {
+                'success': True,
+                'task_name': task_name,
+                'task_id': task_id,
+                'due': due,
+                'cached': cached is not None,
+                'age': round(age, 1)
+            }
+
+        except requests.exceptions.RequestException as e:
+            return self._error_result(e)
+
+    def _find_task_id(self, project_id: str, task_name: str, lookup_mode: str | None = None) -> str | None:
+        """Resolve a task name to its id using the configured lookup mode."""
+        lookup_mode = lookup_mode or self.lookup_mode
+        if lookup_mode == 'scan':
+            return self._scan_for_task_id(project_id, task_name)
+        if lookup_mode == 'filter':
+            return self._filter_for_task_id(project_id, task_name)
+        if lookup_mode == 'mirror':
+            return self._mirror_task_id(project_id, task_name)
+
+        # Index mode lists the project only when the index is stale
+        fresh, task_id = self.task_index.lookup(project_id, task_name)
+        if fresh:
+            return task_id
+        return self._refresh_task_index(project_id).get(task_name)
+
+    def _complete_task(self, project_id: str, task_name: str, task_id: str,
+                          retry_stale: bool = True) -> str | None:
+        """Close a task, refreshing the index and retrying once if the cached id is stale.
+
+        With retry_stale off a stale id just means there is nothing to close: when the add runs
+        alongside the close, the re-listed id could be the replacement it has just created.
+        """
+        closed_id = task_id
+        with timed('close'):
+            try:
+                success = self.api.complete_task(task_id=closed_id)
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code != 404:
+                    raise
 
-            # Step 2: Create new task with calculated due time
-            due_datetime = self._calculate_next_due_time()
+                if not retry_stale:
+                    self.task_index.invalidate(project_id)
+                    self.logger.info(f'Cached task id {task_id} for "{task_name}" is stale, nothing to complete')
+                    return None
 
+                self.logger.info(f'Cached task id {task_id} for "{task_name}" is stale, refreshing index')
+                current_id = self._refresh_task_index(project_id).get(task_name)
+                if not current_id:
+                    return None
+                closed_id = current_id
+                success = self.api.complete_task(task_id=closed_id)
+
+        if success:
+            self.task_index.remove(project_id, task_name, closed_id)
+            self.logger.info(f'Completed existing task: {closed_id}')
+            return closed_id
+
+        self.task_index.invalidate(project_id)
+        self.logger.warning(f'Failed to complete existing task: {closed_id}')
+        return None
+
+    def _add_task(self, project_id: str, task_name: str, due_datetime: str) -> str:
+        """Create the replacement task and write its id through to the index."""
+        with timed('add'):
             new_task = self.api.add_task(
                 content=task_name,
-                project_id=actual_project_id,
+                project_id=project_id,
                 due_datetime=datetime.fromisoformat(due_datetime)
             )
+        self.task_index.put(project_id, task_name, new_task.id, todoist_due_date(due_datetime))
+        return new_task.id
+
+    def _parallel_complete_and_add(self, project_id: str, task_name: str, task_id: str | None,
+                                   due_datetime: str) -> tuple[str | None, str | None, Exception | None]:
+        """Issue the close and the add concurrently, returning (completed id, new id, error).
+
+        If exactly one write fails the other is compensated so the project is left as it was:
+        a new task whose close failed is deleted, and a closed task whose replacement failed
+        is reopened. Ids are only reported for writes that are still in effect.
+        """
+        # Each write runs in a copy of the caller's context so its timings land on the caller's timer
+        close_future = _write_executor.submit(
+            copy_context().run, self._complete_task, project_id, task_name, task_id, False
+        ) if task_id else None
+        add_future = _write_executor.submit(copy_context().run, self._add_task, project_id, task_name, due_datetime)
+
+        completed_task_id = None
+        created_task_id = None
+        close_error = None
+        add_error = None
+        try:
+            completed_task_id = close_future.result() if close_future else None
+        except Exception as e:
+            close_error = e
+        try:
+            created_task_id = add_future.result()
+        except Exception as e:
+            add_error = e
+
+        if close_error and created_task_id:
+            self.logger.warning(f'Close of {task_id} failed, deleting new task {created_task_id}')
+            self.task_index.invalidate(project_id)
+            try:
+                self.api.delete_task(task_id=created_task_id)
+                created_task_id = None
+            except Exception as e:
+                self.logger.error(f'Failed to delete new task {created_task_id} after failed close: {str(e)}')
+
+        if add_error and completed_task_id:
+            self.logger.warning(f'Add of "{task_name}" failed, reopening completed task {completed_task_id}')
+            self.task_index.invalidate(project_id)
+            try:
+                self.api.uncomplete_task(task_id=completed_task_id)
+                completed_task_id = None
+            except Exception as e:
+                self.logger.error(f'Failed to reopen task {completed_task_id} after failed add: {str(e)}')
+
+        return completed_task_id, created_task_id, close_error or add_error
+
+    def _resend_close(self, project_id: str, task_name: str, task_id: str, created_task_id: str | None,
+                      close_error: str) -> tuple[str | None, str | None]:
+        """Close the task's current id after a batched close of task_id was rejected, returning (completed id, error).
+
+        The add in the same batch has already gone through, so the listing skips the task it created.
+        """
+        self.logger.info(f'Close of cached task id {task_id} for "{task_name}" was rejected ({close_error}), '
+                         f're-listing project')
+        self.task_index.invalidate(project_id)
+        current_id = None
+        for task_batch in self.tasks.get_tasks(project_id=project_id):
+            current_id = next((task.id for task in task_batch
+                               if task.content == task_name and task.id != created_task_id), None)
+            if current_id is not None:
+                break
+
+        if current_id is None:
+            # Completed or deleted elsewhere, so there is nothing left to close
+            return None, None
+        if current_id == task_id:
+            # The cached id was current, so the rejection stands
+            return None, close_error
+
+        close = close_command(current_id)
+        resend_error = command_error(self.sync.execute([close]).get('sync_status', {}), close)
+        return (None, resend_error) if resend_error else (current_id, None)
+
+    def _sync_complete_and_add(self, project_id: str, task_name: str, task_id: str | None,
+                               due_datetime: str) -> tuple[str | None, str | None, str | None]:
+        """Close and recreate in one Sync API request, returning (completed id, new id, error).
+
+        A close rejected because the cached id is stale is resent for the task's current id, so
+        the old task does not stay open beside its replacement. If it still cannot be closed the
+        error is returned along with the new id.
+        """
+        add = add_command(task_name, project_id, due_datetime)
+        close = close_command(task_id) if task_id else None
+        commands = [close, add] if close else [add]
+
+        sync_response = self.sync.execute(commands)
+        sync_status = sync_response.get('sync_status', {})
+
+        add_error = command_error(sync_status, add)
+        if add_error:
+            created_task_id = None
+        else:
+            created_task_id = sync_response.get('temp_id_mapping', {}).get(add['temp_id'])
+            self.task_index.put(project_id, task_name, created_task_id, todoist_due_date(due_datetime))
+
+        completed_task_id = None
+        close_error = None
+        if close and task_id:
+            close_error = command_error(sync_status, close)
+            if close_error:
+                completed_task_id, close_error = self._resend_close(
+                    project_id, task_name, task_id, created_task_id, close_error
+                )
+            else:
+                completed_task_id = task_id
+            if completed_task_id:
+                self.task_index.remove(project_id, task_name, completed_task_id)
+                self.logger.info(f'Completed existing task: {completed_task_id}')
+            elif close_error:
+                self.task_index.invalidate(project_id)
+                self.logger.warning(f'Failed to complete existing task: {task_id} ({close_error})')
+
+        if add_error:
+            return completed_task_id, None, f'Failed to create new task: {add_error}'
+        if close_error:
+            return completed_task_id, created_task_id, f'Failed to complete existing task: {close_error}'
+        return completed_task_id, created_task_id, None
+
+    def complete_and_recreate_task(self, project_id: str, task_name: str, lookup_mode: str | None = None,
+                                   write_mode: str | None = None, requested_at: datetime | None = None) -> dict:
+        """Complete a task by name and create a new one with the same name, due when its DUE_RULES rule says.
+
+        requested_at is when the caller asked, if that was earlier than now (e.g. a queued request);
+        the due time is counted from it.
+        """
+        completed_task_id = None
+        created_task_id = None
+
+        try:
+            # Extract/validate project_id format
+            actual_project_id = self.resolve_project_id(project_id)
+            self.logger.info(f'Using project_id: {actual_project_id} (original: {project_id})')
+
+            # Step 1: Find and complete the existing task (if it exists)
+            with timed('lookup'):
+                target_task_id = self._find_task_id(actual_project_id, task_name, lookup_mode)
+            if not target_task_id:
+                self.logger.info(f'No existing task "{task_name}" found to complete')
+
+            write_mode = write_mode or self.write_mode
+            if write_mode == 'sync':
+                # Steps 1 and 2 in a single round trip
+                with timed('due'):
+                    due_datetime = self._calculate_next_due_time(requested_at, task_name)
+                with timed('sync_write'):
+                    completed_task_id, created_task_id, sync_error = self._sync_complete_and_add(
+                        actual_project_id, task_name, target_task_id, due_datetime
+                    )
+                if sync_error:
+                    raise SyncCommandError(sync_error)
+            elif write_mode == 'parallel':
+                # The due time doesn't depend on the close, so steps 1 and 2 run side by side
+                with timed('due'):
+                    due_datetime = self._calculate_next_due_time(requested_at, task_name)
+                completed_task_id, created_task_id, write_error = self._parallel_complete_and_add(
+                    actual_project_id, task_name, target_task_id, due_datetime
+                )
+                if write_error:
+                    raise write_error
+            else:
+                if target_task_id:
+                    completed_task_id = self._complete_task(actual_project_id, task_name, target_task_id)
+
+                # Step 2: Create new task with calculated due time
+                with timed('due'):
+                    due_datetime = self._calculate_next_due_time(requested_at, task_name)
+                created_task_id = self._add_task(actual_project_id, task_name, due_datetime)
 
-            created_task_id = new_task.id
-            self.logger.info(f'Created new task: {new_task.id} due at {due_datetime}')
+            self.logger.info(f'Created new task: {created_task_id} due at {due_datetime}')
 
             # Prepare response
             response = {
@@ -107,36 +537,81 @@ class TodoistService:
 
             return response
 
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 400:
-                self.logger.error(f'Bad Request (400) - likely invalid project_id format: {project_id}. Error: {str(e)}')
-                return {
-                    'success': False,
-                    'error': f'Invalid project_id format: {project_id}. Please check that the project ID is correct.',
-                    'completed_task_id': completed_task_id,
-                    'created_task_id': created_task_id
-                }
-            else:
-                self.logger.error(f'Todoist API HTTP error: {str(e)}')
-                return {
-                    'success': False,
-                    'error': f'API error: {str(e)}',
-                    'completed_task_id': completed_task_id,
-                    'created_task_id': created_task_id
-                }
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f'Todoist API request error: {str(e)}')
-            return {
-                'success': False,
-                'error': f'API request error: {str(e)}',
-                'completed_task_id': completed_task_id,
-                'created_task_id': created_task_id
-            }
         except Exception as e:
-            self.logger.error(f'Unexpected error: {str(e)}')
+            result = self._error_result(e, project_id)
+            result.update(completed_task_id=completed_task_id, created_task_id=created_task_id)
+            return result
+
+    def complete_and_recreate_tasks(self, project_id: str, task_names: list[str]) -> dict:
+        """Complete and recreate several tasks with one project read and one Sync API request."""
+        # A name repeated in one batch would try to close the same task twice
+        task_names = list(dict.fromkeys(task_names))
+        if len(task_names) > MAX_BATCH_TASKS:
+            return {'success': False, 'error': f'At most {MAX_BATCH_TASKS} tasks can be completed in one batch',
+                    'results': []}
+
+        try:
+            actual_project_id = self.resolve_project_id(project_id)
+            self.logger.info(f'Using project_id: {actual_project_id} (original: {project_id})')
+
+            # Resolve every name against a single read of the project
+            task_ids = self.task_index.entries(actual_project_id)
+            if task_ids is None:
+                task_ids = self._refresh_task_index(actual_project_id)
+
+            # One clock read and one evaluation per distinct rule for the whole batch
+            due_times = self.settings.due_schedule.next_due_many(task_names, self._local_now())
+
+            planned = []
+            commands = []
+            for task_name in task_names:
+                close = close_command(task_ids[task_name]) if task_name in task_ids else None
+                due_datetime = due_times[task_name].isoformat()
+                add = add_command(task_name, actual_project_id, due_datetime)
+                planned.append((task_name, close, add, due_datetime))
+                if close:
+                    commands.append(close)
+                commands.append(add)
+
+            sync_response = self.sync.execute(commands)
+            sync_status = sync_response.get('sync_status', {})
+            temp_id_mapping = sync_response.get('temp_id_mapping', {})
+
+            results = []
+            for task_name, close, add, due_datetime in planned:
+                result: dict = {'task_name': task_name, 'success': True}
+
+                if close:
+                    close_error = command_error(sync_status, close)
+                    if close_error:
+                        result['success'] = False
+                        result['error'] = f'Failed to complete existing task: {close_error}'
+                        self.task_index.invalidate(actual_project_id)
+                    else:
+                        result['completed_task_id'] = close['args']['id']
+                        self.task_index.remove(actual_project_id, task_name, close['args']['id'])
+
+                add_error = command_error(sync_status, add)
+                if add_error:
+                    result['success'] = False
+                    result['error'] = f'Failed to create new task: {add_error}'
+                else:
+                    new_task_id = temp_id_mapping.get(add['temp_id'])
+                    result['new_task_id'] = new_task_id
+                    result['new_due_time'] = due_datetime
+                    self.task_index.put(actual_project_id, task_name, new_task_id, todoist_due_date(due_datetime))
+
+                results.append(result)
+
+            succeeded = sum(1 for result in results if result['success'])
+            self.logger.info(f'Batch completed {succeeded} of {len(results)} tasks in one Sync API request')
+
             return {
-                'success': False,
-                'error': str(e),
-                'completed_task_id': completed_task_id,
-                'created_task_id': created_task_id
+                'success': succeeded == len(results),
+                'succeeded': succeeded,
+                'failed': len(results) - succeeded,
+                'results': results
             }
+
+        except Exception as e:
+            return {**self._error_result(e), 'results': []}
@@ -0,0 +1,24 @@
+import asyncio
+from heidi_todoist.services import TodoistService
+
+
+class AsyncTodoistService:
+    """Awaitable front for a warm TodoistService.
+
+    The Todoist calls block either way (todoist_api_python's async client only runs its sync
+    one in an executor), so each completion is handed to a worker thread in one piece. Both
+    routes then share one HTTP session, task index, lookup and write modes, and due time rules.
+    """
+
+    def __init__(self, service: TodoistService):
+        self.service = service
+
+    async def complete_and_recreate_task(self, project_id: str, task_name: str, lookup_mode: str | None = None,
+                                         write_mode: str | None = None) -> dict:
+        """Run TodoistService.complete_and_recreate_task in a worker thread without blocking the event loop.
+
+        The thread runs in a copy of the caller's context, so its phase timings land on the caller's timer.
+        """
+        return await asyncio.to_thread(
+            self.service.complete_and_recreate_task, project_id, task_name, lookup_mode, write_mode
+        )
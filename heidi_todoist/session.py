@@ -0,0 +1,153 @@
+import logging
+import socket
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from heidi_todoist.resilience import (TODOIST_RATE_WINDOW, CircuitBreaker, RetryPolicy, TokenBucket,
+                                     retry_after_seconds)
+from heidi_todoist.timing import count
+
+
+TODOIST_API_PREFIX = 'https://api.todoist.com/'
+
+# Same (connect, read) timeouts the todoist_api_python client uses
+TIMEOUT = (10, 60)
+
+
+def auth_headers(token: str) -> dict[str, str]:
+    """Return the headers that authenticate a request to the Todoist API as the token's account."""
+    return {'Authorization': f'Bearer {token}'}
+
+
+def _keepalive_socket_options() -> list:
+    """Socket options that keep idle pooled connections alive behind Azure's SNAT/load balancer."""
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Probe well before Azure's 4 minute idle timeout drops the connection
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive enabled on every pooled connection."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', _keepalive_socket_options())
+        super().init_poolmanager(*args, **kwargs)
+
+
+class TodoistAdapter(KeepAliveAdapter):
+    """KeepAliveAdapter that guards requests with a circuit breaker, paces them through a token
+    bucket and retries them under a RetryPolicy.
+
+    urllib3's own retries stay off so every attempt, including retries, takes a token.
+    """
+
+    def __init__(self, limiter: TokenBucket | None = None, retry_policy: RetryPolicy | None = None,
+                 breaker: CircuitBreaker | None = None, **kwargs):
+        self.limiter = limiter
+        self.retry_policy = retry_policy or RetryPolicy(max_retries=0)
+        self.breaker = breaker
+        self.retries = 0
+        self.logger = logging.getLogger(__name__)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if self.breaker is None:
+            return self._send_with_retries(request, **kwargs)
+
+        # Fails fast with CircuitOpenError while Todoist is known to be down
+        self.breaker.before_call()
+        try:
+            response = self._send_with_retries(request, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # e.g. turned away by the rate limiter, so Todoist was never asked
+            self.breaker.release()
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def _send_with_retries(self, request, **kwargs):
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                self.limiter.acquire()
+
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= policy.max_retries or not policy.should_retry_error(request.method, e):
+                    raise
+                delay = policy.delay(attempt)
+                reason = type(e).__name__
+            else:
+                if attempt >= policy.max_retries or not policy.should_retry_status(request.method, response.status_code):
+                    return response
+                retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                delay = policy.delay(attempt, retry_after)
+                if delay is None:
+                    return response
+                if response.status_code == 429 and self.limiter is not None and retry_after is not None:
+                    self.limiter.pause(retry_after)
+                    # The limiter now holds every caller back for Retry-After
+                    delay = 0.0
+                reason = str(response.status_code)
+                response.content  # Consume the body so the connection goes back to the pool
+
+            attempt += 1
+            self.retries += 1
+            count('retries')
+            self.logger.warning(f'Retrying {request.method} {request.path_url} after {reason} '
+                                f'(attempt {attempt} of {policy.max_retries}) in {delay:.2f}s')
+            time.sleep(delay)
+
+
+def create_session(pool_maxsize: int = 10, rate_limit: int = 0, rate_burst: int = 50,
+                   max_retries: int = 0, breaker: CircuitBreaker | None = None) -> requests.Session:
+    """Create a requests session tuned for long-lived reuse against the Todoist API.
+
+    rate_limit is the number of requests allowed per 15 minutes (0 disables the limiter).
+    """
+    session = requests.Session()
+    limiter = TokenBucket(rate_limit / TODOIST_RATE_WINDOW, rate_burst) if rate_limit > 0 else None
+    adapter = TodoistAdapter(limiter, RetryPolicy(max_retries=max_retries), breaker,
+                             pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount(TODOIST_API_PREFIX, adapter)
+    return session
+
+
+def rate_limit_stats(session: requests.Session) -> dict:
+    """Return retries and limiter state for the session's Todoist adapter."""
+    adapter = session.get_adapter(TODOIST_API_PREFIX)
+    if not isinstance(adapter, TodoistAdapter):
+        return {}
+    stats = {'retries': adapter.retries}
+    if adapter.limiter is not None:
+        stats.update(adapter.limiter.stats())
+    return stats
+
+
+def connection_stats(session: requests.Session) -> dict:
+    """Return how many connections were opened versus requests sent through the session's pools."""
+    connections_opened = 0
+    requests_sent = 0
+    for adapter in session.adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is None:
+            continue
+        for key in pool_manager.pools.keys():
+            pool = pool_manager.pools[key]
+            connections_opened += pool.num_connections
+            requests_sent += pool.num_requests
+    return {'connections_opened': connections_opened, 'requests_sent': requests_sent}
@@ -0,0 +1,154 @@
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from heidi_todoist.scheduler import DueSchedule, load_due_schedule
+from heidi_todoist.tenants import Tenant, load_tenants
+
+
+# How complete_and_recreate_task finds the existing task:
+#   index  - cached content -> id index, listing the project only when stale
+#   scan   - page through the whole project on every request
+#   filter - ask Todoist's filter endpoint for the project's tasks matching the content
+#   mirror - local mirror of the project kept current with Sync API deltas
+LOOKUP_MODES = ('index', 'scan', 'filter', 'mirror')
+
+# How the close and the add are sent:
+#   rest     - two sequential REST calls
+#   sync     - one Sync API request carrying both commands
+#   parallel - both REST calls issued at once, undoing one if the other fails
+WRITE_MODES = ('rest', 'sync', 'parallel')
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def _float(environ, name: str, default: str) -> float:
+    try:
+        return float(environ.get(name, default))
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
+
+
+def _int(environ, name: str, default: str) -> int:
+    try:
+        return int(environ.get(name, default))
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Validated, immutable configuration read once from the environment."""
+
+    todoist_api_token: str | None
+    todoist_client_secret: str | None
+    heidi_project_id: str | None
+    timezone: ZoneInfo
+    task_index_ttl: float
+    task_cache_path: str | None
+    lookup_mode: str
+    write_mode: str
+    mirror_path: str | None
+    mirror_interval: float
+    idempotency_window: float
+    idempotency_ttl: float
+    idempotency_cache_size: int
+    idempotency_store_path: str | None
+    pool_maxsize: int
+    prewarm: bool
+    prewarm_jitter: float
+    timing_header: bool
+    rate_limit: int
+    rate_burst: int
+    max_retries: int
+    breaker_failure_threshold: int
+    breaker_reset_timeout: float
+    due_schedule: DueSchedule
+    project_cache_path: str | None
+    page_size: int
+    prefetch_pages: bool
+    tenants: Mapping[str, Tenant]
+    client_pool_size: int
+    client_idle_ttl: float
+    client_pool_memory_mb: float
+    next_due_max_age: float
+
+    @classmethod
+    def from_env(cls, environ=None) -> 'Settings':
+        """Build settings from environment variables, raising ValueError for invalid values.
+
+        The token and project id stay optional here so each route can report them missing
+        with its own message.
+        """
+        environ = os.environ if environ is None else environ
+
+        timezone_name = environ.get('TIMEZONE', 'America/New_York')
+        try:
+            timezone = ZoneInfo(timezone_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f'TIMEZONE {timezone_name} is not a valid IANA time zone')
+
+        lookup_mode = environ.get('TASK_LOOKUP_MODE', 'index')
+        if lookup_mode not in LOOKUP_MODES:
+            raise ValueError(f'TASK_LOOKUP_MODE must be one of {", ".join(LOOKUP_MODES)}')
+
+        write_mode = environ.get('TASK_WRITE_MODE', 'rest')
+        if write_mode not in WRITE_MODES:
+            raise ValueError(f'TASK_WRITE_MODE must be one of {", ".join(WRITE_MODES)}')
+
+        # Todoist returns at most 200 tasks per page
+        page_size = _int(environ, 'TASK_PAGE_SIZE', '200')
+        if not 1 <= page_size <= 200:
+            raise ValueError('TASK_PAGE_SIZE must be between 1 and 200')
+
+        idempotency_cache_size = _int(environ, 'IDEMPOTENCY_CACHE_SIZE', '256')
+        if idempotency_cache_size < 1:
+            raise ValueError('IDEMPOTENCY_CACHE_SIZE must be at least 1')
+
+        # Room for every tenant plus the TODOIST_API_TOKEN account unless set lower
+        tenants = load_tenants(environ.get('TENANTS'))
+        client_pool_size = _int(environ, 'CLIENT_POOL_SIZE', str(max(4, len(tenants) + 1)))
+        if client_pool_size < 1:
+            raise ValueError('CLIENT_POOL_SIZE must be at least 1')
+
+        return cls(
+            todoist_api_token=environ.get('TODOIST_API_TOKEN') or None,
+            todoist_client_secret=environ.get('TODOIST_CLIENT_SECRET') or None,
+            heidi_project_id=environ.get('HEIDI_PROJECT_ID') or None,
+            timezone=timezone,
+            task_index_ttl=_float(environ, 'TASK_INDEX_TTL', '300'),
+            task_cache_path=environ.get('TASK_CACHE_PATH') or None,
+            lookup_mode=lookup_mode,
+            write_mode=write_mode,
+            mirror_path=environ.get('TASK_MIRROR_PATH') or None,
+            mirror_interval=_float(environ, 'TASK_MIRROR_INTERVAL', '0'),
+            idempotency_window=_float(environ, 'IDEMPOTENCY_WINDOW', '60'),
+            idempotency_ttl=_float(environ, 'IDEMPOTENCY_TTL', '86400'),
+            idempotency_cache_size=idempotency_cache_size,
+            idempotency_store_path=environ.get('IDEMPOTENCY_STORE_PATH') or None,
+            pool_maxsize=_int(environ, 'TODOIST_POOL_MAXSIZE', '10'),
+            prewarm=environ.get('PREWARM_ON_STARTUP', '').lower() in TRUE_VALUES,
+            prewarm_jitter=_float(environ, 'PREWARM_JITTER', '10'),
+            timing_header=environ.get('TIMING_HEADER', '').lower() in TRUE_VALUES,
+            rate_limit=_int(environ, 'TODOIST_RATE_LIMIT', '1000'),
+            rate_burst=_int(environ, 'TODOIST_RATE_BURST', '50'),
+            max_retries=_int(environ, 'TODOIST_MAX_RETRIES', '3'),
+            breaker_failure_threshold=_int(environ, 'CIRCUIT_BREAKER_THRESHOLD', '5'),
+            breaker_reset_timeout=_float(environ, 'CIRCUIT_BREAKER_RESET_TIMEOUT', '30'),
+            due_schedule=load_due_schedule(environ.get('DUE_RULES')),
+            project_cache_path=environ.get('PROJECT_CACHE_PATH') or None,
+            page_size=page_size,
+            prefetch_pages=environ.get('TASK_PREFETCH_PAGES', 'true').lower() in TRUE_VALUES,
+            tenants=tenants,
+            client_pool_size=client_pool_size,
+            client_idle_ttl=_float(environ, 'CLIENT_IDLE_TTL', '3600'),
+            client_pool_memory_mb=_float(environ, 'CLIENT_POOL_MEMORY_MB', '64'),
+            next_due_max_age=_float(environ, 'NEXT_DUE_MAX_AGE', '300')
+        )
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, loading them on first use."""
+    return Settings.from_env()
@@ -0,0 +1,76 @@
+import json
+import uuid
+import requests
+from heidi_todoist.dues import todoist_due_date
+from heidi_todoist.session import TIMEOUT, auth_headers
+
+
+SYNC_URL = 'https://api.todoist.com/api/v1/sync'
+
+# Most commands Todoist accepts in one Sync API request
+MAX_COMMANDS = 100
+
+
+class SyncCommandError(Exception):
+    """Raised when a command in a Sync API batch is rejected."""
+
+
+def format_due(due_datetime: str) -> dict:
+    """Convert an ISO due time into a Sync API due object, normalising aware times to UTC."""
+    return {'date': todoist_due_date(due_datetime)}
+
+
+def close_command(task_id: str) -> dict:
+    """Build an item_close command."""
+    return {'type': 'item_close', 'uuid': str(uuid.uuid4()), 'args': {'id': task_id}}
+
+
+def add_command(content: str, project_id: str, due_datetime: str) -> dict:
+    """Build an item_add command with a temp_id that resolves to the new task id."""
+    return {
+        'type': 'item_add',
+        'uuid': str(uuid.uuid4()),
+        'temp_id': str(uuid.uuid4()),
+        'args': {'content': content, 'project_id': project_id, 'due': format_due(due_datetime)}
+    }
+
+
+def command_error(sync_status: dict, command: dict) -> str | None:
+    """Return the error message for a command, or None if it succeeded."""
+    status = sync_status.get(command['uuid'])
+    if status == 'ok':
+        return None
+    if isinstance(status, dict):
+        return status.get('error') or str(status)
+    return 'No status returned for command'
+
+
+class SyncClient:
+    """Minimal client for sending batches of commands to the Todoist Sync API."""
+
+    def __init__(self, session: requests.Session, token: str):
+        self.session = session
+        self.token = token
+
+    def execute(self, commands: list[dict]) -> dict:
+        """Send all commands in a single request and return the decoded response."""
+        response = self.session.post(
+            SYNC_URL,
+            headers=auth_headers(self.token),
+            data={'commands': json.dumps(commands)},
+            timeout=TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()
+
+    # '*' asks for a full sync; it is a sync token, not a credential
+    def sync(self, sync_token: str = '*', resource_types: tuple[str, ...] = ('items',)) -> dict:  # nosec B107
+        """Read resources changed since sync_token ('*' for a full sync)."""
+        response = self.session.post(
+            SYNC_URL,
+            headers=auth_headers(self.token),
+            data={'sync_token': sync_token, 'resource_types': json.dumps(list(resource_types))},
+            timeout=TIMEOUT
+        )
+        response.raise_for_status()
+        return response.json()
@@ -0,0 +1,52 @@
+import hmac
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from heidi_todoist.json_settings import load_json_setting
+
+TENANT_HEADER = 'X-Tenant-ID'
+TENANT_KEY_HEADER = 'X-Tenant-Key'
+
+TENANT_FIELDS = ('token', 'project_id', 'key')
+
+
+class TenantAuthError(Exception):
+    """Raised when a request names a tenant it cannot authenticate as."""
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """A household member served by this app: their Todoist token, project and request key."""
+
+    id: str
+    token: str = field(repr=False)
+    project_id: str
+    key: str = field(repr=False)
+
+
+def load_tenants(value: str | None) -> Mapping[str, Tenant]:
+    """Parse TENANTS, given as JSON or as the path of a JSON file, raising ValueError if invalid.
+
+    The JSON maps tenant ids to {"token", "project_id", "key"}; the key is the secret the
+    tenant's requests send in X-Tenant-Key.
+    """
+    config = load_json_setting(value, 'TENANTS', 'tenant ids to tenants')
+
+    tenants = {}
+    for tenant_id, spec in config.items():
+        for name in TENANT_FIELDS:
+            if not isinstance(spec.get(name), str) or not spec[name]:
+                raise ValueError(f'TENANTS {tenant_id} {name} must be a non-empty string')
+        unknown = set(spec) - set(TENANT_FIELDS)
+        if unknown:
+            raise ValueError(f'TENANTS {tenant_id} has unknown fields: {", ".join(sorted(unknown))}')
+        tenants[tenant_id] = Tenant(tenant_id, spec['token'], spec['project_id'], spec['key'])
+    return tenants
+
+
+def authenticate(tenants: Mapping[str, Tenant], tenant_id: str, key) -> Tenant:
+    """Return the tenant whose key the request sent, raising TenantAuthError otherwise."""
+    tenant = tenants.get(tenant_id)
+    # An unknown tenant and a wrong key get the same answer, so ids can't be probed
+    if tenant is None or not isinstance(key, str) or not hmac.compare_digest(key.encode(), tenant.key.encode()):
+        raise TenantAuthError(f'Invalid {TENANT_HEADER} or {TENANT_KEY_HEADER}')
+    return tenant
@@ -0,0 +1,94 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# The timer for the invocation in progress; copied into awaited tasks and to_thread calls
+_current_timer: ContextVar['PhaseTimer | None'] = ContextVar('heidi_phase_timer', default=None)
+
+
+class PhaseTimer:
+    """Per-invocation wall-clock timings for named phases, plus counters such as pages fetched.
+
+    Used as a context manager around an invocation so code further down can record into it
+    with timed() and count() without the timer being passed through every call.
+    """
+
+    def __init__(self):
+        self.phases: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._token = None
+
+    def __enter__(self) -> 'PhaseTimer':
+        self._token = _current_timer.set(self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        _current_timer.reset(self._token)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Add the time spent in the block to the named phase."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def dimensions(self, **extra) -> dict:
+        """Return flat custom dimensions for Application Insights, e.g. {'lookup_ms': 12.3, 'pages': 2}."""
+        with self._lock:
+            dimensions = {f'{name}_ms': round(elapsed, 2) for name, elapsed in self.phases.items()}
+            dimensions.update(self.counters)
+        dimensions['total_ms'] = round(self.total_ms(), 2)
+        dimensions.update(extra)
+        return dimensions
+
+    def server_timing(self) -> str:
+        """Format the phases as a Server-Timing header value."""
+        with self._lock:
+            phases = list(self.phases.items())
+        entries = [f'{name};dur={elapsed:.1f}' for name, elapsed in phases]
+        entries.append(f'total;dur={self.total_ms():.1f}')
+        return ', '.join(entries)
+
+    def log(self, logger: logging.Logger, message: str, **extra) -> None:
+        """Log the timings as JSON after the message, also attached as custom dimensions.
+
+        The Functions host only forwards the message text to Application Insights, so queries
+        parse the JSON; custom_dimensions is there for a handler that exports it, such as
+        OpenCensus' AzureLogHandler.
+        """
+        dimensions = self.dimensions(**extra)
+        logger.info(f'{message}: {json.dumps(dimensions)}', extra={'custom_dimensions': dimensions})
+
+
+@contextmanager
+def timed(name: str):
+    """Record the block as a phase of the current invocation's timer, if there is one."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+
+def count(name: str, amount: int = 1) -> None:
+    """Add to a counter on the current invocation's timer, if there is one."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.count(name, amount)
@@ -0,0 +1,74 @@
+import logging
+import threading
+from heidi_todoist.settings import get_settings
+
+
+logger = logging.getLogger(__name__)
+
+# Connect and read timeouts for the warm-up request; it only needs to open the connection
+WARMUP_TIMEOUT = (10, 10)
+
+
+def _open_connection(service) -> None:
+    from heidi_todoist.session import TODOIST_API_PREFIX
+
+    # Any response will do: the connection stays in the keep-alive pool for the next request
+    response = service.session.head(f'{TODOIST_API_PREFIX}api/v1/', timeout=WARMUP_TIMEOUT)
+    response.close()
+    logger.info(f'Pre-warmed Todoist connection (HTTP {response.status_code})')
+
+
+def prewarm() -> None:
+    """Import the Todoist client, build the pooled service, open its TLS connection and resolve the project."""
+    from heidi_todoist.pool import get_todoist_service
+    from heidi_todoist.projects import ProjectNotFoundError
+
+    service = get_todoist_service()
+    _open_connection(service)
+
+    # Resolving now means no request pays for it, and a wrong id shows up at startup
+    project_id = get_settings().heidi_project_id
+    if project_id:
+        try:
+            service.resolve_project_id(project_id)
+        except ProjectNotFoundError as e:
+            logger.error(f'HEIDI_PROJECT_ID is invalid: {str(e)}')
+
+
+def keep_warm() -> dict:
+    """Resolve the project and refresh its cached tasks, or just keep the connection open if nothing changed."""
+    from heidi_todoist.pool import get_todoist_service
+
+    project_id = get_settings().heidi_project_id
+    if not project_id:
+        raise ValueError('HEIDI_PROJECT_ID not configured')
+
+    service = get_todoist_service()
+    result = service.refresh_project(project_id)
+    if not result['refreshed'] and result['lookup_mode'] != 'mirror':
+        # Nothing was sent to Todoist, so keep the connection from idling out
+        _open_connection(service)
+    return result
+
+
+def _prewarm_safely() -> None:
+    try:
+        prewarm()
+    except Exception as e:
+        logger.warning(f'Pre-warm failed, first request will connect instead: {str(e)}')
+
+
+def start_prewarm() -> threading.Thread | None:
+    """Pre-warm in the background when PREWARM_ON_STARTUP is set, so indexing is not held up."""
+    try:
+        enabled = get_settings().prewarm
+    except ValueError as e:
+        logger.warning(f'Skipping pre-warm, invalid settings: {str(e)}')
+        return None
+
+    if not enabled:
+        return None
+
+    thread = threading.Thread(target=_prewarm_safely, name='heidi-prewarm', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,37 @@
+import base64
+import hashlib
+import hmac
+from heidi_todoist.cache import TaskIndex
+from heidi_todoist.dues import due_date
+
+SIGNATURE_HEADER = 'X-Todoist-Hmac-SHA256'
+DELIVERY_HEADER = 'X-Todoist-Delivery-ID'
+
+# Events that leave the task open and those that take it out of the project's open tasks
+ACTIVE_EVENTS = ('item:added', 'item:updated', 'item:uncompleted')
+CLOSED_EVENTS = ('item:completed', 'item:deleted')
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Return the signature Todoist sends for a webhook body: base64 of its HMAC-SHA256."""
+    return base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def verify_signature(body: bytes, signature: str | None, secret: str) -> bool:
+    """Check a webhook's signature header in constant time."""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign(body, secret), signature)
+
+
+def apply_task_event(index: TaskIndex, event_name: str, task: dict) -> bool:
+    """Apply a Todoist item event to the name -> id index and due dates, returning whether it changed anything."""
+    if event_name in CLOSED_EVENTS:
+        return index.update_task(task['id'])
+    if event_name not in ACTIVE_EVENTS:
+        return False
+
+    # An update can itself complete or delete the task
+    if task.get('checked') or task.get('is_deleted'):
+        return index.update_task(task['id'])
+    return index.update_task(task['id'], task.get('project_id'), task.get('content'), due_date(task))
@@ -0,0 +1,100 @@
+"""Measure cold start: time to import the function app and time to the first response.
+
+Each run happens in a fresh interpreter so nothing is already imported or connected.
+
+    python scripts/cold_start.py                       # stats route, no Todoist calls
+    python scripts/cold_start.py --task-name "Feed"    # completeTask against Todoist
+    python scripts/cold_start.py --prewarm --runs 5    # with PREWARM_ON_STARTUP enabled
+
+completeTask needs TODOIST_API_TOKEN and HEIDI_PROJECT_ID in the environment.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once(task_name: str | None, startup_delay: float) -> dict:
+    """Import the app and send two requests, timing each step (runs inside the child process)."""
+    sys.path.insert(0, REPO_ROOT)
+
+    started = time.perf_counter()
+    import function_app  # noqa: F401
+    imported = time.perf_counter()
+
+    import azure.functions as func
+    from heidi_todoist.blueprint import complete_task, stats
+
+    # Give a background pre-warm the time the host would normally spend starting up
+    time.sleep(startup_delay)
+
+    def send() -> tuple[float, int]:
+        if task_name:
+            req = func.HttpRequest(
+                method='POST',
+                url='/api/completeTask',
+                body=json.dumps({'task_name': task_name}).encode(),
+                headers={'Content-Type': 'application/json'}
+            )
+            handler = complete_task
+        else:
+            req = func.HttpRequest(method='GET', url='/api/stats', body=b'')
+            handler = stats
+        request_started = time.perf_counter()
+        response = handler(req)
+        return (time.perf_counter() - request_started) * 1000, response.status_code
+
+    first_ms, first_status = send()
+    second_ms, second_status = send()
+
+    return {
+        'import_ms': (imported - started) * 1000,
+        'first_response_ms': first_ms,
+        'first_status': first_status,
+        'warm_response_ms': second_ms,
+        'warm_status': second_status
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--task-name', help='Call completeTask with this task instead of the stats route')
+    parser.add_argument('--prewarm', action='store_true', help='Enable PREWARM_ON_STARTUP')
+    parser.add_argument('--startup-delay', type=float, default=0.0,
+                        help='Seconds to wait between import and the first request')
+    parser.add_argument('--runs', type=int, default=3, help='Number of fresh interpreters to measure')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_once(args.task_name, args.startup_delay)))
+        return
+
+    env = dict(os.environ)
+    if args.prewarm:
+        env['PREWARM_ON_STARTUP'] = 'true'
+    # Repeated completions of the same task must not be answered from the idempotency cache
+    env.setdefault('IDEMPOTENCY_WINDOW', '0')
+
+    command = [sys.executable, os.path.abspath(__file__), '--child', '--startup-delay', str(args.startup_delay)]
+    if args.task_name:
+        command += ['--task-name', args.task_name]
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(command, env=env, cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    for key in ('import_ms', 'first_response_ms', 'warm_response_ms'):
+        values = [run[key] for run in runs]
+        print(f'{key:>18}: median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}')
+    print(f'{"statuses":>18}: {sorted({(run["first_status"], run["warm_status"]) for run in runs})}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Replay recorded Todoist webhook payloads against a running function host.
+
+Each payload is signed with TODOIST_CLIENT_SECRET the way Todoist signs deliveries, so the
+route's signature check passes exactly as it would in production.
+
+    func start
+    python scripts/replay_webhooks.py tests/fixtures/webhooks/item_added.json tests/fixtures/webhooks/item_completed.json
+    python scripts/replay_webhooks.py --url 'https://{function-name}.azurewebsites.net/api/todoistWebhook?code={function-key}' ...
+
+Payloads are sent in the order given. The secret can also be passed with --secret.
+"""
+import argparse
+import os
+import sys
+import uuid
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from heidi_todoist.webhooks import DELIVERY_HEADER, SIGNATURE_HEADER, sign  # noqa: E402
+
+DEFAULT_URL = 'http://localhost:7071/api/todoistWebhook'
+
+
+def replay(url: str, secret: str, paths: list[str]) -> list[tuple[str, int, str]]:
+    """Sign and POST each payload file, returning (path, status code, response body) for each."""
+    results = []
+    with requests.Session() as session:
+        for path in paths:
+            with open(path, 'rb') as payload_file:
+                body = payload_file.read()
+            response = session.post(url, data=body, timeout=30, headers={
+                'Content-Type': 'application/json',
+                'User-Agent': 'Todoist-Webhooks',
+                SIGNATURE_HEADER: sign(body, secret),
+                DELIVERY_HEADER: str(uuid.uuid4())
+            })
+            results.append((path, response.status_code, response.text))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('payloads', nargs='+', help='Recorded webhook payload files')
+    parser.add_argument('--url', default=DEFAULT_URL)
+    parser.add_argument('--secret', default=os.environ.get('TODOIST_CLIENT_SECRET'),
+                        help='Defaults to TODOIST_CLIENT_SECRET')
+    args = parser.parse_args()
+
+    if not args.secret:
+        parser.error('a secret is required: pass --secret or set TODOIST_CLIENT_SECRET')
+
+    for path, status_code, text in replay(args.url, args.secret, args.payloads):
+        print(f'{status_code} {path}: {text}')
+
+
+if __name__ == '__main__':
+    main()
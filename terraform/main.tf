@@ -25,6 +25,11 @@ resource "azurerm_storage_account" "main" {
   account_tier             = "Standard"
 }
 
+resource "azurerm_storage_queue" "complete_task" {
+  name               = "heidi-complete-task"
+  storage_account_id = azurerm_storage_account.main.id
+}
+
 resource "azurerm_application_insights" "main" {
   name                = "${ local.service_name }-insights"
   resource_group_name = azurerm_resource_group.main.name
@@ -59,5 +64,6 @@ resource "azurerm_linux_function_app" "main" {
     "TIMEZONE"                              = "America/New_York"
     "TODOIST_API_TOKEN"                     = var.todoist_api_token
     "HEIDI_PROJECT_ID"                      = var.heidi_project_id
+    "PREWARM_SCHEDULE"                      = "0 */5 * * * *"
   }
 }
@@ -2,6 +2,51 @@
 
 import pytest
 from unittest.mock import Mock
+from heidi_todoist.coalesce import task_coalescer
+from heidi_todoist.idempotency import idempotency_store
+from heidi_todoist.pool import client_pool
+from heidi_todoist.resilience import todoist_breaker
+from heidi_todoist.settings import get_settings
+
+
+@pytest.fixture(autouse=True)
+def reset_settings():
+    """Re-read settings in every test so patched environment variables take effect."""
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breaker():
+    """Start every test with a closed, newly configured circuit breaker."""
+    todoist_breaker.cache_clear()
+    yield
+    todoist_breaker.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_client_pool():
+    """Start every test with an empty process-wide client pool."""
+    client_pool.clear()
+    yield
+    client_pool.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_idempotency_store():
+    """Start every test without remembered results from earlier requests."""
+    idempotency_store.cache_clear()
+    yield
+    idempotency_store.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_task_coalescer():
+    """Start every test without in-flight or lingering coalesced results."""
+    task_coalescer.clear()
+    yield
+    task_coalescer.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,62 @@
+from benchmarks.fake_todoist import FakeTodoist
+from benchmarks.parse import run_parse_benchmark
+from benchmarks.run import run_benchmark
+
+
+class TestFakeTodoist:
+    """Test cases for the Todoist stand-in used by the benchmarks."""
+
+    def setup_method(self):
+        """Set up a small fake project before each test."""
+        self.fake = FakeTodoist(project_size=5, page_size=2)
+
+    def test_tasks_are_paginated(self):
+        """Test that listing tasks follows the requested page size and cursor."""
+        status, page = self.fake.handle('GET', '/api/v1/tasks', {'project_id': ['benchproject']}, b'')
+
+        assert status == 200
+        assert len(page['results']) == 2
+        assert page['next_cursor'] == '2'
+
+    def test_error_injection(self):
+        """Test that every call fails when the error rate is 1."""
+        self.fake.error_rate = 1.0
+
+        status, _ = self.fake.handle('GET', '/api/v1/projects', {}, b'')
+
+        assert status == 503
+        assert self.fake.errors_injected == 1
+
+
+class TestRunBenchmark:
+    """Test cases for running a benchmark configuration end to end."""
+
+    def test_index_mode_reports_latency_and_calls(self):
+        """Test that a small index-mode run succeeds and reports calls and bytes per request."""
+        result = run_benchmark(project_size=20, page_size=10, requests=3)
+
+        assert result['statuses'] == {200: 3}
+        assert result['requests'] == 3
+        assert result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['http_calls_per_request'] > 0
+        assert result['bytes_per_request'] > 0
+
+    def test_sync_write_mode(self):
+        """Test that the Sync API stand-in completes and recreates tasks."""
+        result = run_benchmark(project_size=20, page_size=10, requests=3, lookup_mode='mirror', write_mode='sync',
+                               route='completeTaskAsync')
+
+        assert result['statuses'] == {200: 3}
+
+
+class TestParseBenchmark:
+    """Test cases for the task page parsing benchmark."""
+
+    def test_records_hold_less_than_sdk_models(self):
+        """Test that both parsers are measured and compact records take less memory per task."""
+        result = run_parse_benchmark(tasks=40, page_size=20, repeat=1)
+
+        assert result['pages'] == 2
+        assert result['sdk_ms_per_page'] > 0
+        assert result['records_ms_per_page'] > 0
+        assert result['records_bytes_per_task'] < result['sdk_bytes_per_task']
@@ -1,9 +1,20 @@
+import asyncio
 import os
+import threading
 import json
 import pytest
 from unittest.mock import Mock, patch
 import azure.functions as func
-from heidi_todoist.blueprint import complete_task
+import requests
+from unittest.mock import AsyncMock
+from datetime import datetime, timezone
+from heidi_todoist.blueprint import (complete_task, complete_task_async, complete_task_queued, complete_tasks,
+                                     keep_warm_timer, next_due, process_queued_task, stats, todoist_webhook)
+from heidi_todoist.cache import TaskIndex
+from heidi_todoist.coalesce import task_coalescer
+from heidi_todoist.timing import count, timed
+from heidi_todoist.webhooks import sign
+from tests.test_webhooks import FIXTURES, PROJECT_ID, TASK_ID
 
 
 class TestBlueprint:
@@ -28,7 +39,7 @@ class TestBlueprint:
             mock_req.get_json.return_value = {'task_name': 'Test Task'}
 
             # Mock TodoistService
-            with patch('heidi_todoist.blueprint.TodoistService') as mock_service_class:
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
                 mock_service = Mock()
                 mock_service.complete_and_recreate_task.return_value = {
                     'success': True,
@@ -37,7 +48,7 @@ class TestBlueprint:
                     'message': 'Task "Test Task" completed and recreated',
                     'new_due_time': '2023-01-01T14:30:00'
                 }
-                mock_service_class.return_value = mock_service
+                mock_get_service.return_value = mock_service
 
                 response = complete_task(mock_req)
 
@@ -134,7 +145,7 @@ class TestBlueprint:
             mock_req = Mock(spec=func.HttpRequest)
             mock_req.get_json.return_value = {'task_name': 'Test Task'}
 
-            with patch('heidi_todoist.blueprint.TodoistService') as mock_service_class:
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
                 mock_service = Mock()
                 mock_service.complete_and_recreate_task.return_value = {
                     'success': False,
@@ -142,7 +153,7 @@ class TestBlueprint:
                     'completed_task_id': None,
                     'created_task_id': None
                 }
-                mock_service_class.return_value = mock_service
+                mock_get_service.return_value = mock_service
 
                 response = complete_task(mock_req)
 
@@ -159,7 +170,7 @@ class TestBlueprint:
             mock_req = Mock(spec=func.HttpRequest)
             mock_req.get_json.return_value = {'task_name': 'Test Task'}
 
-            with patch('heidi_todoist.blueprint.TodoistService') as mock_service_class:
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
                 mock_service = Mock()
                 mock_service.complete_and_recreate_task.return_value = {
                     'success': False,
@@ -167,7 +178,7 @@ class TestBlueprint:
                     'completed_task_id': None,
                     'created_task_id': None
                 }
-                mock_service_class.return_value = mock_service
+                mock_get_service.return_value = mock_service
 
                 response = complete_task(mock_req)
 
@@ -201,8 +212,8 @@ class TestBlueprint:
 
             # Mock the TodoistAPI constructor to avoid real API calls
             with patch('heidi_todoist.services.TodoistAPI'):
-                with patch('heidi_todoist.blueprint.TodoistService') as mock_service_class:
-                    mock_service_class.side_effect = Exception("Unexpected error")
+                with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+                    mock_get_service.side_effect = Exception("Unexpected error")
 
                     # Mock logging to verify it's called
                     with patch('heidi_todoist.blueprint.logging') as mock_logging:
@@ -246,4 +257,1055 @@ class TestBlueprint:
 
             response_data = json.loads(response.get_body())
             assert response_data['success'] is False
-            assert 'task_name is required in JSON body' in response_data['error']
\ No newline at end of file
+            assert 'task_name is required in JSON body' in response_data['error']
+
+    def test_complete_task_invalid_settings(self):
+        """Test that invalid configuration is reported as a 500."""
+        with patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123', 'TASK_WRITE_MODE': 'bogus'}):
+            mock_req = Mock(spec=func.HttpRequest)
+            mock_req.get_json.return_value = {'task_name': 'Test Task'}
+
+            response = complete_task(mock_req)
+
+            assert response.status_code == 500
+            assert 'TASK_WRITE_MODE must be one of' in json.loads(response.get_body())['error']
+
+    def test_stats_reports_client_pool(self):
+        """Test that the stats route reports client pool counters."""
+        mock_req = Mock(spec=func.HttpRequest)
+
+        with patch('heidi_todoist.pool.client_pool') as mock_pool:
+            mock_pool.stats.return_value = {'hits': 3, 'misses': 1}
+
+            response = stats(mock_req)
+
+            assert response.status_code == 200
+            response_data = json.loads(response.get_body())
+            assert response_data['client_pool'] == {'hits': 3, 'misses': 1}
+            assert response_data['pid'] == os.getpid()
+
+    def test_stats_reports_circuit_breaker(self):
+        """Test that the stats route reports the circuit breaker state."""
+        response = stats(Mock(spec=func.HttpRequest))
+
+        breaker_stats = json.loads(response.get_body())['circuit_breaker']
+        assert breaker_stats['state'] == 'closed'
+        assert breaker_stats['opens'] == 0
+
+    def test_complete_task_circuit_open(self):
+        """Test that an open circuit breaker gives a fast 503 with a retry hint."""
+        with patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123'}):
+            mock_req = Mock(spec=func.HttpRequest)
+            mock_req.get_json.return_value = {'task_name': 'Test Task'}
+
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+                mock_get_service.return_value.complete_and_recreate_task.return_value = {
+                    'success': False,
+                    'error': 'Todoist is unavailable, retry after 12 seconds',
+                    'circuit_open': True,
+                    'retry_after': 11.2
+                }
+
+                response = complete_task(mock_req)
+
+                assert response.status_code == 503
+                assert response.headers['Retry-After'] == '12'
+
+
+class TestCompleteTasksRoute:
+    """Test cases for the batch completeTasks route."""
+
+    def setup_method(self):
+        """Set up a configured environment before each test method."""
+        self.env_patcher = patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123'}, clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    def _call(self, body, result=None):
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = body
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_tasks.return_value = result
+            response = complete_tasks(mock_req)
+            return response, mock_get_service.return_value
+
+    @pytest.mark.parametrize('result, status_code', [
+        ({'success': True, 'succeeded': 2, 'failed': 0, 'results': []}, 200),
+        ({'success': False, 'succeeded': 1, 'failed': 1, 'results': []}, 207),
+        ({'success': False, 'succeeded': 0, 'failed': 2, 'results': []}, 500),
+        ({'success': False, 'error': 'API error: Bad Gateway', 'results': []}, 500),
+        ({'success': False, 'error': 'Todoist is unavailable', 'circuit_open': True, 'retry_after': 3, 'results': []}, 503),
+        ({'success': False, 'error': 'Rate limited by Todoist', 'retry_after': 7.2, 'results': []}, 429),
+    ])
+    def test_status_codes(self, result, status_code):
+        """Test that overall, partial and total failure map to distinct status codes."""
+        response, service = self._call({'task_names': ['Feed', 'Walk']}, result)
+
+        assert response.status_code == status_code
+        assert json.loads(response.get_body()) == result
+        service.complete_and_recreate_tasks.assert_called_once_with('test_project_123', ['Feed', 'Walk'])
+
+    def test_rate_limited_passes_on_retry_after(self):
+        """Test that a rate-limited batch is a 429 with the wait rounded up, not a generic 500."""
+        response, _ = self._call({'task_names': ['Feed']},
+                                 {'success': False, 'error': 'Rate limited by Todoist', 'retry_after': 7.2, 'results': []})
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '8'
+
+    @pytest.mark.parametrize('body', [None, {}, {'task_names': []}, {'task_names': 'Feed'}, {'task_names': ['Feed', '']}])
+    def test_invalid_task_names(self, body):
+        """Test that missing or malformed task_names is a 400."""
+        response, _ = self._call(body)
+
+        assert response.status_code == 400
+        assert 'task_names must be a non-empty list' in json.loads(response.get_body())['error']
+
+    def test_oversized_batch(self):
+        """Test that more distinct names than one Sync API request can carry is a 400."""
+        response, service = self._call({'task_names': [f'Task {number}' for number in range(51)]})
+
+        assert response.status_code == 400
+        assert json.loads(response.get_body())['error'] == 'At most 50 tasks can be completed at once'
+        service.complete_and_recreate_tasks.assert_not_called()
+
+    def test_repeated_names_count_once(self):
+        """Test that the limit counts distinct names, as the service drops repeats."""
+        response, service = self._call({'task_names': ['Feed'] * 51},
+                                       {'success': True, 'succeeded': 1, 'failed': 0, 'results': []})
+
+        assert response.status_code == 200
+
+    def test_invalid_json(self):
+        """Test that an unparseable body is a 400."""
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.side_effect = ValueError("Invalid JSON")
+
+        response = complete_tasks(mock_req)
+
+        assert response.status_code == 400
+
+    def test_missing_project_id(self):
+        """Test error when HEIDI_PROJECT_ID is not configured."""
+        with patch.dict(os.environ, {}, clear=True):
+            response, _ = self._call({'task_names': ['Feed']})
+
+        assert response.status_code == 500
+        assert 'HEIDI_PROJECT_ID not configured' in json.loads(response.get_body())['error']
+
+    def test_missing_token(self):
+        """Test that a missing API token is a 500."""
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = {'task_names': ['Feed']}
+
+        response = complete_tasks(mock_req)
+
+        assert response.status_code == 500
+        assert 'TODOIST_API_TOKEN environment variable not set' in json.loads(response.get_body())['error']
+
+    def test_unexpected_exception(self):
+        """Test handling of unexpected exceptions."""
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = {'task_names': ['Feed']}
+
+        with patch('heidi_todoist.blueprint.get_todoist_service', side_effect=Exception("Unexpected error")):
+            with patch('heidi_todoist.blueprint.logging') as mock_logging:
+                response = complete_tasks(mock_req)
+
+        assert response.status_code == 500
+        mock_logging.error.assert_called_once()
+
+
+
+class TestCompleteTaskAsyncRoute:
+    """Test cases for the async completeTaskAsync route."""
+
+    def setup_method(self):
+        """Set up a configured environment before each test method."""
+        self.env_patcher = patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123'}, clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    def _call(self, body, result=None):
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = body
+        with patch('heidi_todoist.blueprint.get_async_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task = AsyncMock(return_value=result)
+            response = asyncio.run(complete_task_async(mock_req))
+            return response, mock_get_service.return_value
+
+    @pytest.mark.parametrize('result, status_code', [
+        ({'success': True, 'new_task_id': 'new_456'}, 200),
+        ({'success': False, 'error': 'Task not found in project'}, 404),
+        ({'success': False, 'error': 'API error: boom'}, 500),
+        ({'success': False, 'error': 'Rate limited by Todoist', 'retry_after': 2.5}, 429),
+    ])
+    def test_status_codes(self, result, status_code):
+        """Test that results map to the same status codes as the sync route."""
+        response, service = self._call({'task_name': 'Test Task'}, result)
+
+        assert response.status_code == status_code
+        assert json.loads(response.get_body()) == result
+        service.complete_and_recreate_task.assert_awaited_once_with('test_project_123', 'Test Task')
+
+    def test_rate_limited_sets_retry_after(self):
+        """Test that a rate-limited result passes the wait on in a Retry-After header."""
+        response, _ = self._call({'task_name': 'Test Task'},
+                                 {'success': False, 'error': 'Rate limited by Todoist', 'retry_after': 2.5})
+
+        assert response.headers['Retry-After'] == '3'
+
+    @pytest.mark.parametrize('body', [None, {}, {'task_name': ''}])
+    def test_missing_task_name(self, body):
+        """Test that a missing task_name is a 400."""
+        response, _ = self._call(body)
+
+        assert response.status_code == 400
+
+    def test_invalid_json(self):
+        """Test that an unparseable body is a 400."""
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.side_effect = ValueError("Invalid JSON")
+
+        response = asyncio.run(complete_task_async(mock_req))
+
+        assert response.status_code == 400
+
+    def test_missing_project_id(self):
+        """Test error when HEIDI_PROJECT_ID is not configured."""
+        with patch.dict(os.environ, {}, clear=True):
+            response, _ = self._call({'task_name': 'Test Task'})
+
+        assert response.status_code == 500
+
+    def test_missing_token(self):
+        """Test that a missing API token is a 500."""
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = {'task_name': 'Test Task'}
+
+        response = asyncio.run(complete_task_async(mock_req))
+
+        assert response.status_code == 500
+        assert 'TODOIST_API_TOKEN environment variable not set' in json.loads(response.get_body())['error']
+
+    def test_unexpected_exception(self):
+        """Test handling of unexpected exceptions."""
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = {'task_name': 'Test Task'}
+
+        with patch('heidi_todoist.blueprint.get_async_todoist_service', side_effect=Exception("Unexpected error")):
+            with patch('heidi_todoist.blueprint.logging') as mock_logging:
+                response = asyncio.run(complete_task_async(mock_req))
+
+        assert response.status_code == 500
+        mock_logging.error.assert_called_once()
+
+
+
+class TestIdempotency:
+    """Test cases for duplicate request suppression on the single-task routes."""
+
+    def setup_method(self):
+        """Set up a configured environment before each test method."""
+        self.env_patcher = patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123'}, clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request(body, headers=None):
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = body
+        mock_req.headers = headers or {}
+        return mock_req
+
+    def test_repeat_within_window_is_replayed(self):
+        """Test that a double-fired request is answered without calling Todoist."""
+        result = {'success': True, 'new_task_id': 'new_456'}
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = result
+
+            first = complete_task(self._request({'task_name': 'Test Task'}))
+            second = complete_task(self._request({'task_name': 'Test Task'}))
+
+            assert mock_get_service.return_value.complete_and_recreate_task.call_count == 1
+        assert first.headers.get('Idempotent-Replayed') is None
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        assert json.loads(second.get_body()) == result
+
+    def test_window_disabled(self):
+        """Test that IDEMPOTENCY_WINDOW=0 turns off derived keys."""
+        with patch.dict(os.environ, {'IDEMPOTENCY_WINDOW': '0'}):
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+                mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+
+                complete_task(self._request({'task_name': 'Test Task'}))
+                complete_task(self._request({'task_name': 'Test Task'}))
+
+                assert mock_get_service.return_value.complete_and_recreate_task.call_count == 2
+
+    def test_explicit_keys(self):
+        """Test that distinct keys from the header or body are processed separately."""
+        with patch.dict(os.environ, {'IDEMPOTENCY_WINDOW': '0'}):
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+                mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+
+                complete_task(self._request({'task_name': 'Test Task'}, {'Idempotency-Key': 'a'}))
+                complete_task(self._request({'task_name': 'Test Task', 'idempotency_key': 'a'}))
+                complete_task(self._request({'task_name': 'Test Task', 'idempotency_key': 'b'}))
+
+                assert mock_get_service.return_value.complete_and_recreate_task.call_count == 2
+
+    def test_failures_are_not_stored(self):
+        """Test that a failed attempt can be retried."""
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': False, 'error': 'x'}
+
+            complete_task(self._request({'task_name': 'Test Task'}))
+            complete_task(self._request({'task_name': 'Test Task'}))
+
+            assert mock_get_service.return_value.complete_and_recreate_task.call_count == 2
+
+    def test_async_route_shares_store(self):
+        """Test that the async route replays results stored by the sync route."""
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+            complete_task(self._request({'task_name': 'Test Task'}))
+
+        with patch('heidi_todoist.blueprint.get_async_todoist_service') as mock_get_async:
+            response = asyncio.run(complete_task_async(self._request({'task_name': 'Test Task'})))
+
+            mock_get_async.assert_not_called()
+        assert response.headers['Idempotent-Replayed'] == 'true'
+
+    def test_async_route_stores_result(self):
+        """Test that the async route stores successful results."""
+        with patch('heidi_todoist.blueprint.get_async_todoist_service') as mock_get_async:
+            mock_get_async.return_value.complete_and_recreate_task = AsyncMock(return_value={'success': True})
+            asyncio.run(complete_task_async(self._request({'task_name': 'Test Task'})))
+
+        response = complete_task(self._request({'task_name': 'Test Task'}))
+
+        assert response.headers['Idempotent-Replayed'] == 'true'
+
+    def test_stats_includes_idempotency(self):
+        """Test that the stats route reports idempotency cache counters."""
+        response = stats(Mock(spec=func.HttpRequest))
+
+        assert json.loads(response.get_body())['idempotency'] == {'hits': 0, 'misses': 0, 'size': 0}
+
+
+class TestTimings:
+    """Test cases for per-phase timing on the single-task routes."""
+
+    def setup_method(self):
+        """Set up a configured environment before each test method."""
+        self.env_patcher = patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123', 'IDEMPOTENCY_WINDOW': '0'},
+                                      clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request():
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = {'task_name': 'Test Task'}
+        mock_req.headers = {}
+        return mock_req
+
+    def test_timings_logged_as_custom_dimensions(self):
+        """Test that every invocation logs its phases as Application Insights custom dimensions."""
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+            with patch('heidi_todoist.blueprint.logging.getLogger') as mock_get_logger:
+                response = complete_task(self._request())
+
+        dimensions = mock_get_logger.return_value.info.call_args.kwargs['extra']['custom_dimensions']
+        assert dimensions['route'] == 'completeTask'
+        assert dimensions['status_code'] == 200
+        assert {'config_ms', 'client_ms', 'total_ms'} <= dimensions.keys()
+        assert 'Server-Timing' not in response.headers
+
+    def test_server_timing_header_when_enabled(self):
+        """Test that TIMING_HEADER adds the phases to the response as a Server-Timing header."""
+        with patch.dict(os.environ, {'TIMING_HEADER': 'true'}):
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+                mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+                response = complete_task(self._request())
+
+        assert response.headers['Server-Timing'].startswith('config;dur=')
+        assert 'client;dur=' in response.headers['Server-Timing']
+
+    def test_async_route_timings(self):
+        """Test that phases recorded by the async service land on the async route's timer."""
+        async def complete_and_recreate_task(project_id, task_name):
+            with timed('lookup'):
+                count('pages', 2)
+            return {'success': True}
+
+        with patch.dict(os.environ, {'TIMING_HEADER': 'true'}):
+            with patch('heidi_todoist.blueprint.get_async_todoist_service') as mock_get_async:
+                mock_get_async.return_value.complete_and_recreate_task = complete_and_recreate_task
+                response = asyncio.run(complete_task_async(self._request()))
+
+        assert 'lookup;dur=' in response.headers['Server-Timing']
+
+
+class TestQueuedMode:
+    """Test cases for the queued completeTaskQueued route and its queue trigger."""
+
+    def setup_method(self):
+        """Set up a configured environment before each test method."""
+        self.env_patcher = patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123'}, clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request(body, headers=None):
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = body
+        mock_req.headers = headers or {}
+        return mock_req
+
+    @staticmethod
+    def _queue_message(message):
+        return func.QueueMessage(id='msg-1', body=json.dumps(message).encode())
+
+    def test_request_is_queued_with_202(self):
+        """Test that the route enqueues the task and answers 202 without calling Todoist."""
+        msg = Mock()
+
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            response = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), msg)
+
+            mock_get_service.assert_not_called()
+        assert response.status_code == 202
+        message = json.loads(msg.set.call_args.args[0])
+        assert message['task_name'] == 'Feed Heidi'
+        assert message['project_id'] == 'test_project_123'
+        body = json.loads(response.get_body())
+        assert body['request_id'] == message['request_id']
+        assert body['requested_at'] == message['requested_at']
+
+    def test_missing_task_name(self):
+        """Test that an invalid request is rejected before anything is queued."""
+        msg = Mock()
+
+        response = complete_task_queued(self._request({}), msg)
+
+        assert response.status_code == 400
+        msg.set.assert_not_called()
+
+    def test_unauthenticated_tenant_rejected(self):
+        """Test that a tenant with the wrong key is a 401 and nothing is queued."""
+        os.environ['TENANTS'] = json.dumps({'sam': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'sam-key'}})
+        msg = Mock()
+
+        response = complete_task_queued(
+            self._request({'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'wrong'}), msg)
+
+        assert response.status_code == 401
+        msg.set.assert_not_called()
+
+    def test_missing_project(self):
+        """Test that a missing HEIDI_PROJECT_ID is reported before anything is queued."""
+        del os.environ['HEIDI_PROJECT_ID']
+        msg = Mock()
+
+        response = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), msg)
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body())['error'] == 'HEIDI_PROJECT_ID not configured'
+        msg.set.assert_not_called()
+
+    def test_invalid_json(self):
+        """Test that an unparseable body is a 400."""
+        mock_req = self._request(None)
+        mock_req.get_json.side_effect = ValueError("Invalid JSON")
+        msg = Mock()
+
+        response = complete_task_queued(mock_req, msg)
+
+        assert response.status_code == 400
+        msg.set.assert_not_called()
+
+    def test_invalid_settings(self):
+        """Test that invalid configuration is a 500 rather than an unhandled error."""
+        os.environ['TIMEZONE'] = 'Mars/Olympus'
+
+        response = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), Mock())
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body())['error'] == 'TIMEZONE Mars/Olympus is not a valid IANA time zone'
+
+    def test_queue_failure(self):
+        """Test that a message that could not be queued is a 500 and not remembered as queued."""
+        msg = Mock()
+        msg.set.side_effect = RuntimeError('Queue unavailable')
+
+        response = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), msg)
+        msg.set.side_effect = None
+        retry = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), msg)
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body()) == {'success': False, 'error': 'Queue unavailable'}
+        assert retry.status_code == 202
+        assert 'Idempotent-Replayed' not in retry.headers
+
+    def test_double_tap_queues_once(self):
+        """Test that a repeat within the idempotency window is answered without queueing again."""
+        first_msg, second_msg = Mock(), Mock()
+
+        first = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), first_msg)
+        second = complete_task_queued(self._request({'task_name': 'Feed Heidi'}), second_msg)
+
+        second_msg.set.assert_not_called()
+        assert second.status_code == 202
+        assert second.headers['Idempotent-Replayed'] == 'true'
+        assert json.loads(second.get_body()) == json.loads(first.get_body())
+
+    def test_trigger_counts_due_time_from_requested_at(self):
+        """Test that the queue trigger passes the request time through to the service."""
+        message = {'request_id': 'r1', 'project_id': 'test_project_123', 'task_name': 'Feed Heidi',
+                   'requested_at': '2024-01-15T17:00:00+00:00'}
+
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True, 'message': 'ok'}
+            process_queued_task(self._queue_message(message))
+
+            mock_get_service.return_value.complete_and_recreate_task.assert_called_once_with(
+                'test_project_123', 'Feed Heidi', requested_at=datetime(2024, 1, 15, 17, 0, tzinfo=timezone.utc)
+            )
+
+    def test_trigger_skips_redelivered_message(self):
+        """Test that a message delivered again after succeeding is not applied twice."""
+        message = {'request_id': 'r1', 'project_id': 'test_project_123', 'task_name': 'Feed Heidi',
+                   'requested_at': '2024-01-15T17:00:00+00:00'}
+
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True, 'message': 'ok'}
+            process_queued_task(self._queue_message(message))
+            process_queued_task(self._queue_message(message))
+
+            assert mock_get_service.return_value.complete_and_recreate_task.call_count == 1
+
+    def test_trigger_failure_raises_for_retry(self):
+        """Test that a failed completion is raised so the queue retries the message."""
+        message = {'request_id': 'r1', 'project_id': 'test_project_123', 'task_name': 'Feed Heidi',
+                   'requested_at': '2024-01-15T17:00:00+00:00'}
+
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': False,
+                                                                                      'error': 'API error: 503'}
+            with pytest.raises(RuntimeError, match='API error: 503'):
+                process_queued_task(self._queue_message(message))
+
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True, 'message': 'ok'}
+            process_queued_task(self._queue_message(message))
+
+            assert mock_get_service.return_value.complete_and_recreate_task.call_count == 2
+
+    def test_trigger_drops_malformed_message(self):
+        """Test that a message that can never succeed is dropped rather than retried."""
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            process_queued_task(func.QueueMessage(id='msg-1', body=b'not json'))
+
+            mock_get_service.assert_not_called()
+
+
+class TestCoalescing:
+    """Test cases for sharing one completion between concurrent requests for the same task."""
+
+    def setup_method(self):
+        """Set up a configured environment without derived idempotency keys."""
+        self.env_patcher = patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'test_project_123', 'IDEMPOTENCY_WINDOW': '0'},
+                                      clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request(body, headers=None):
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = body
+        mock_req.headers = headers or {}
+        return mock_req
+
+    def _concurrent(self, requests_):
+        """Send the requests at once while the first completion is held in flight."""
+        release = threading.Event()
+        result = {'success': True, 'new_task_id': 'new_456'}
+
+        def complete_and_recreate_task(project_id, task_name):
+            release.wait(5)
+            return result
+
+        responses = []
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.side_effect = complete_and_recreate_task
+            threads = [threading.Thread(target=lambda r=r: responses.append(complete_task(r))) for r in requests_]
+            for thread in threads:
+                thread.start()
+            while task_coalescer.stats()['leaders'] + task_coalescer.stats()['shared'] < len(requests_):
+                threading.Event().wait(0.001)
+            release.set()
+            for thread in threads:
+                thread.join()
+
+            return responses, mock_get_service.return_value.complete_and_recreate_task.call_count
+
+    def test_concurrent_requests_share_one_completion(self):
+        """Test that a burst for the same task reaches Todoist once and every caller gets the result."""
+        responses, call_count = self._concurrent([self._request({'task_name': 'Test Task'}) for _ in range(3)])
+
+        assert call_count == 1
+        assert [response.status_code for response in responses] == [200, 200, 200]
+        assert all(json.loads(response.get_body())['new_task_id'] == 'new_456' for response in responses)
+        assert sorted(response.headers.get('Coalesced', 'false') for response in responses) == ['false', 'true', 'true']
+
+    def test_distinct_idempotency_keys_not_coalesced(self):
+        """Test that requests the caller marked as distinct each reach Todoist."""
+        responses, call_count = self._concurrent([
+            self._request({'task_name': 'Test Task'}, {'Idempotency-Key': 'a'}),
+            self._request({'task_name': 'Test Task'}, {'Idempotency-Key': 'b'}),
+        ])
+
+        assert call_count == 2
+
+    def test_stats_includes_coalescing(self):
+        """Test that the stats route reports coalescing counters."""
+        response = stats(Mock(spec=func.HttpRequest))
+
+        assert json.loads(response.get_body())['coalescing'] == {'leaders': 0, 'shared': 0, 'in_flight': 0}
+
+
+class TestTenants:
+    """Test cases for routing requests to a tenant's token and project."""
+
+    def setup_method(self):
+        """Set up the default account and one tenant before each test method."""
+        self.env_patcher = patch.dict(os.environ, {
+            'TODOIST_API_TOKEN': 'test_token',
+            'HEIDI_PROJECT_ID': 'test_project_123',
+            'TENANTS': json.dumps({'sam': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'sam-key'}})
+        }, clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request(body, headers=None):
+        mock_req = Mock(spec=func.HttpRequest)
+        mock_req.get_json.return_value = body
+        mock_req.headers = headers or {}
+        return mock_req
+
+    def test_tenant_uses_own_service_and_project(self):
+        """Test that an authenticated tenant's request runs against its own token and project."""
+        req = self._request({'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'sam-key'})
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+
+            response = complete_task(req)
+
+        assert response.status_code == 200
+        mock_get_service.assert_called_once_with('sam')
+        mock_get_service.return_value.complete_and_recreate_task.assert_called_once_with('Heidi', 'Feed Heidi')
+
+    def test_async_route_uses_tenant(self):
+        """Test that the async route routes by tenant too."""
+        req = self._request({'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'sam-key'})
+        with patch('heidi_todoist.blueprint.get_async_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task = AsyncMock(return_value={'success': True})
+
+            response = asyncio.run(complete_task_async(req))
+
+        assert response.status_code == 200
+        mock_get_service.assert_called_once_with('sam')
+        mock_get_service.return_value.complete_and_recreate_task.assert_awaited_once_with('Heidi', 'Feed Heidi')
+
+    def test_async_route_rejects_unauthenticated_tenant(self):
+        """Test that the async route answers a wrong key with a 401 that never reaches Todoist."""
+        req = self._request({'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'wrong'})
+        with patch('heidi_todoist.blueprint.get_async_todoist_service') as mock_get_service:
+            response = asyncio.run(complete_task_async(req))
+
+        assert response.status_code == 401
+        mock_get_service.assert_not_called()
+
+    def test_no_tenant_uses_default_account(self):
+        """Test that a request naming no tenant keeps using TODOIST_API_TOKEN and HEIDI_PROJECT_ID."""
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True}
+
+            complete_task(self._request({'task_name': 'Feed Heidi'}))
+
+        mock_get_service.assert_called_once_with(None)
+        mock_get_service.return_value.complete_and_recreate_task.assert_called_once_with(
+            'test_project_123', 'Feed Heidi')
+
+    @pytest.mark.parametrize('headers', [
+        {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'wrong'},
+        {'X-Tenant-ID': 'sam'},
+        {'X-Tenant-ID': 'alex', 'X-Tenant-Key': 'sam-key'},
+    ])
+    def test_unauthenticated_tenant_rejected(self, headers):
+        """Test that a wrong key or unknown tenant is a 401 that never reaches Todoist."""
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            response = complete_task(self._request({'task_name': 'Feed Heidi'}, headers))
+
+        assert response.status_code == 401
+        assert json.loads(response.get_body())['error'] == 'Invalid X-Tenant-ID or X-Tenant-Key'
+        mock_get_service.assert_not_called()
+
+    def test_tenant_required_without_default_account(self):
+        """Test that with only tenants configured a request must name one."""
+        del os.environ['TODOIST_API_TOKEN']
+
+        response = complete_tasks(self._request({'task_names': ['Feed Heidi']}))
+
+        assert response.status_code == 401
+        assert json.loads(response.get_body())['error'] == 'X-Tenant-ID header is required'
+
+    @pytest.mark.parametrize('headers', [{'Idempotency-Key': 'tap-1'}, {}])
+    def test_tenants_sharing_project_name_not_replayed(self, headers):
+        """Test that one tenant's stored result is never replayed to another tenant with the same project."""
+        os.environ['IDEMPOTENCY_WINDOW'] = '60'
+        os.environ['TENANTS'] = json.dumps({
+            'alice': {'token': 'token_a', 'project_id': 'Heidi', 'key': 'alice-key'},
+            'bob': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'bob-key'}
+        })
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.side_effect = [
+                {'success': True, 'message': 'alice'}, {'success': True, 'message': 'bob'}
+            ]
+
+            alice = complete_task(self._request(
+                {'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'alice', 'X-Tenant-Key': 'alice-key', **headers}))
+            bob = complete_task(self._request(
+                {'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'bob', 'X-Tenant-Key': 'bob-key', **headers}))
+
+        assert json.loads(alice.get_body())['message'] == 'alice'
+        assert json.loads(bob.get_body())['message'] == 'bob'
+        assert 'Idempotent-Replayed' not in bob.headers
+        assert [c.args[0] for c in mock_get_service.call_args_list] == ['alice', 'bob']
+
+    def test_queued_message_processed_as_tenant(self):
+        """Test that a tenant's queued request is processed with the tenant's service."""
+        msg = Mock()
+        req = self._request({'task_name': 'Feed Heidi'}, {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'sam-key'})
+        complete_task_queued(req, msg)
+        message = json.loads(msg.set.call_args[0][0])
+
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.complete_and_recreate_task.return_value = {'success': True, 'message': 'ok'}
+            process_queued_task(func.QueueMessage(id='msg-1', body=json.dumps(message).encode()))
+
+        assert message['tenant_id'] == 'sam'
+        assert message['project_id'] == 'Heidi'
+        mock_get_service.assert_called_once_with('sam')
+
+
+class TestNextDueRoute:
+    """Test cases for the read-only nextDue route."""
+
+    def setup_method(self):
+        """Set up a configured environment before each test method."""
+        self.env_patcher = patch.dict(os.environ, {
+            'TODOIST_API_TOKEN': 'test_token', 'HEIDI_PROJECT_ID': 'test_project_123', 'NEXT_DUE_MAX_AGE': '120'
+        }, clear=True)
+        self.env_patcher.start()
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request(params, headers=None):
+        return func.HttpRequest(method='GET', url='/api/nextDue', body=b'', params=params, headers=headers or {})
+
+    def _call(self, params, result=None, headers=None):
+        with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+            mock_get_service.return_value.next_due.return_value = result
+            response = next_due(self._request(params, headers))
+            return response, mock_get_service
+
+    def test_cached_answer(self):
+        """Test that a cached answer is returned with its age."""
+        result = {'success': True, 'task_name': 'Feed Heidi', 'task_id': 'task123', 'due': '2025-01-01T18:00:00',
+                  'cached': True, 'age': 42.7}
+
+        response, mock_get_service = self._call({'task_name': 'Feed Heidi'}, result)
+
+        assert response.status_code == 200
+        assert json.loads(response.get_body()) == result
+        assert response.headers['Age'] == '42'
+        mock_get_service.return_value.next_due.assert_called_once_with('test_project_123', 'Feed Heidi', 120.0)
+
+    def test_max_age_only_tightens(self):
+        """Test that a caller can ask for fresher state than NEXT_DUE_MAX_AGE, but not staler."""
+        result = {'success': True, 'age': 0.0}
+
+        _, fresher = self._call({'task_name': 'Feed Heidi', 'max_age': '0'}, result)
+        _, staler = self._call({'task_name': 'Feed Heidi', 'max_age': '3600'}, result)
+
+        assert fresher.return_value.next_due.call_args[0][2] == 0.0
+        assert staler.return_value.next_due.call_args[0][2] == 120.0
+
+    @pytest.mark.parametrize('params, error', [
+        ({}, 'task_name query parameter is required'),
+        ({'task_name': 'Feed Heidi', 'max_age': 'soon'}, 'max_age must be a non-negative number of seconds'),
+        ({'task_name': 'Feed Heidi', 'max_age': '-1'}, 'max_age must be a non-negative number of seconds'),
+        ({'task_name': 'Feed Heidi', 'max_age': 'nan'}, 'max_age must be a non-negative number of seconds'),
+    ])
+    def test_invalid_request(self, params, error):
+        """Test that a missing name or a bad max_age is a 400 that never reaches Todoist."""
+        response, mock_get_service = self._call(params)
+
+        assert response.status_code == 400
+        assert json.loads(response.get_body())['error'] == error
+        mock_get_service.assert_not_called()
+
+    @pytest.mark.parametrize('result, status_code', [
+        ({'success': False, 'error': 'Task "Feed Heidi" not found in project'}, 404),
+        ({'success': False, 'error': 'Todoist is unavailable', 'circuit_open': True, 'retry_after': 5.0}, 503),
+        ({'success': False, 'error': 'API error: boom'}, 500),
+    ])
+    def test_failures(self, result, status_code):
+        """Test that misses that could not be answered map to the same statuses as completeTask."""
+        response, _ = self._call({'task_name': 'Feed Heidi'}, result)
+
+        assert response.status_code == status_code
+
+    def test_tenant(self):
+        """Test that a tenant reads its own project."""
+        os.environ['TENANTS'] = json.dumps({'sam': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'sam-key'}})
+
+        _, mock_get_service = self._call({'task_name': 'Feed Heidi'}, {'success': True, 'age': 0.0},
+                                         {'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'sam-key'})
+
+        mock_get_service.assert_called_once_with('sam')
+        assert mock_get_service.return_value.next_due.call_args[0][0] == 'Heidi'
+
+    def test_unauthenticated_tenant_rejected(self):
+        """Test that a tenant with the wrong key gets a 401 without reading any state."""
+        os.environ['TENANTS'] = json.dumps({'sam': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'sam-key'}})
+
+        response, mock_get_service = self._call({'task_name': 'Feed Heidi'},
+                                                headers={'X-Tenant-ID': 'sam', 'X-Tenant-Key': 'wrong'})
+
+        assert response.status_code == 401
+        mock_get_service.assert_not_called()
+
+    def test_missing_project(self):
+        """Test that a missing HEIDI_PROJECT_ID is reported."""
+        del os.environ['HEIDI_PROJECT_ID']
+
+        response, _ = self._call({'task_name': 'Feed Heidi'})
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body())['error'] == 'HEIDI_PROJECT_ID not configured'
+
+    @pytest.mark.parametrize('error', [ValueError('TODOIST_API_TOKEN not configured'), RuntimeError('boom')])
+    def test_errors(self, error):
+        """Test that configuration and unexpected errors are reported as 500s."""
+        with patch('heidi_todoist.blueprint.get_todoist_service', side_effect=error):
+            response = next_due(self._request({'task_name': 'Feed Heidi'}))
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body()) == {'success': False, 'error': str(error)}
+
+
+class TestKeepWarmTimer:
+    """Test cases for the keep-warm timer trigger."""
+
+    def setup_method(self):
+        """Set up a configured environment with no jitter before each test method."""
+        self.env_patcher = patch.dict(os.environ, {
+            'TODOIST_API_TOKEN': 'test_token', 'HEIDI_PROJECT_ID': 'test_project_123', 'PREWARM_JITTER': '0'
+        }, clear=True)
+        self.env_patcher.start()
+        self.timer = Mock(spec=func.TimerRequest, past_due=False)
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    def test_refreshes_and_logs_timings(self):
+        """Test that a tick refreshes the project and logs what it did."""
+        result = {'project_id': 'p1', 'lookup_mode': 'mirror', 'refreshed': False, 'changes': 0}
+
+        with patch('heidi_todoist.blueprint.keep_warm', return_value=result) as mock_keep_warm:
+            with patch('heidi_todoist.timing.PhaseTimer.log') as mock_log:
+                keep_warm_timer(self.timer)
+
+        mock_keep_warm.assert_called_once_with()
+        assert mock_log.call_args.args[1] == 'keepWarm timings'
+        assert mock_log.call_args.kwargs['changes'] == 0
+        assert mock_log.call_args.kwargs['past_due'] is False
+
+    def test_jitter(self):
+        """Test that a tick waits a random part of PREWARM_JITTER first."""
+        os.environ['PREWARM_JITTER'] = '30'
+
+        with patch('heidi_todoist.blueprint.keep_warm', return_value={'refreshed': False}):
+            with patch('heidi_todoist.blueprint.random.uniform', return_value=12.5) as mock_uniform:
+                with patch('heidi_todoist.blueprint.time.sleep') as mock_sleep:
+                    keep_warm_timer(self.timer)
+
+        mock_uniform.assert_called_once_with(0, 30.0)
+        mock_sleep.assert_called_once_with(12.5)
+
+    def test_skipped_without_configuration(self):
+        """Test that nothing is called when the token or project id is missing."""
+        del os.environ['HEIDI_PROJECT_ID']
+
+        with patch('heidi_todoist.blueprint.keep_warm') as mock_keep_warm:
+            keep_warm_timer(self.timer)
+
+        mock_keep_warm.assert_not_called()
+
+    def test_skipped_with_invalid_settings(self):
+        """Test that invalid settings are logged and the tick skipped rather than raised."""
+        os.environ['PREWARM_JITTER'] = 'soon'
+
+        with patch('heidi_todoist.blueprint.keep_warm') as mock_keep_warm:
+            with patch('heidi_todoist.blueprint.logging.error') as mock_error:
+                keep_warm_timer(self.timer)
+
+        mock_keep_warm.assert_not_called()
+        assert mock_error.call_args.args[0].startswith('Skipping keep-warm, invalid settings:')
+
+    def test_failure_is_logged(self):
+        """Test that a failed refresh is logged instead of raised, leaving it to the next tick."""
+        with patch('heidi_todoist.blueprint.keep_warm', side_effect=requests.exceptions.ConnectionError('down')):
+            with patch('heidi_todoist.blueprint.logging.warning') as mock_warning:
+                keep_warm_timer(self.timer)
+
+        mock_warning.assert_called_once_with('Keep-warm failed: down')
+
+
+class TestTodoistWebhook:
+    """Test cases for the todoistWebhook route, replaying recorded payloads."""
+
+    def setup_method(self):
+        """Set up a configured environment and a service with a loaded index before each test method."""
+        self.env_patcher = patch.dict(os.environ, {
+            'TODOIST_API_TOKEN': 'test_token', 'TODOIST_CLIENT_SECRET': 'client_secret'
+        }, clear=True)
+        self.env_patcher.start()
+        self.service = Mock()
+        self.service.task_index = TaskIndex()
+        self.service.task_index.replace(PROJECT_ID, {})
+
+    def teardown_method(self):
+        """Clean up after each test method."""
+        self.env_patcher.stop()
+
+    @staticmethod
+    def _request(fixture, secret='client_secret'):
+        with open(os.path.join(FIXTURES, fixture), 'rb') as fixture_file:
+            body = fixture_file.read()
+        return func.HttpRequest(
+            method='POST',
+            url='/api/todoistWebhook',
+            body=body,
+            headers={'X-Todoist-Hmac-SHA256': sign(body, secret), 'X-Todoist-Delivery-ID': 'delivery-1'}
+        )
+
+    def _replay(self, *fixtures):
+        with patch('heidi_todoist.blueprint.get_todoist_service', return_value=self.service):
+            return [todoist_webhook(self._request(fixture)) for fixture in fixtures]
+
+    def test_replayed_events_keep_index_current(self):
+        """Test that recorded add, rename and complete events are applied in order without calling Todoist."""
+        responses = self._replay('item_added.json', 'item_updated.json')
+
+        assert [response.status_code for response in responses] == [200, 200]
+        assert json.loads(responses[0].get_body()) == {'success': True, 'event_name': 'item:added', 'applied': True}
+        assert self.service.task_index.entries(PROJECT_ID) == {'Feed Heidi dinner': TASK_ID}
+
+        self._replay('item_completed.json')
+        assert self.service.task_index.entries(PROJECT_ID) == {}
+        assert self.service.method_calls == []
+
+    def test_applied_to_every_warm_service(self):
+        """Test that an event reaches the index of every tenant warm in this worker."""
+        other = Mock()
+        other.task_index = TaskIndex()
+        with patch('heidi_todoist.blueprint.warm_todoist_services', return_value=[other, self.service]):
+            with patch('heidi_todoist.blueprint.get_todoist_service') as mock_get_service:
+                response = todoist_webhook(self._request('item_added.json'))
+
+        assert json.loads(response.get_body())['applied'] is True
+        assert self.service.task_index.entries(PROJECT_ID) == {'Feed Heidi': TASK_ID}
+        mock_get_service.assert_not_called()
+
+    def test_other_events_acknowledged(self):
+        """Test that events the index does not track are still answered 200 so Todoist doesn't redeliver them."""
+        response, = self._replay('note_added.json')
+
+        assert response.status_code == 200
+        assert json.loads(response.get_body())['applied'] is False
+
+    def test_invalid_signature(self):
+        """Test that a payload signed with another secret is rejected before it is applied."""
+        with patch('heidi_todoist.blueprint.get_todoist_service', return_value=self.service):
+            response = todoist_webhook(self._request('item_added.json', secret='wrong'))
+
+        assert response.status_code == 401
+        assert json.loads(response.get_body())['error'] == 'Invalid webhook signature'
+        assert self.service.task_index.entries(PROJECT_ID) == {}
+
+    def test_invalid_payload(self):
+        """Test that a correctly signed body that is not an item event is a 400."""
+        body = b'{"event_name": "item:added"}'
+        req = func.HttpRequest(method='POST', url='/api/todoistWebhook', body=body,
+                               headers={'X-Todoist-Hmac-SHA256': sign(body, 'client_secret')})
+
+        response = todoist_webhook(req)
+
+        assert response.status_code == 400
+
+    def test_secret_not_configured(self):
+        """Test that the route refuses every delivery without TODOIST_CLIENT_SECRET."""
+        del os.environ['TODOIST_CLIENT_SECRET']
+
+        response = todoist_webhook(self._request('item_added.json'))
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body())['error'] == 'TODOIST_CLIENT_SECRET not configured'
+
+    def test_invalid_settings(self):
+        """Test that invalid configuration is a 500 rather than an unhandled error."""
+        os.environ['TIMEZONE'] = 'Mars/Olympus'
+
+        response = todoist_webhook(self._request('item_added.json'))
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body())['error'] == 'TIMEZONE Mars/Olympus is not a valid IANA time zone'
+
+    def test_unexpected_error(self):
+        """Test that an error applying the event is a 500, so Todoist delivers it again."""
+        with patch('heidi_todoist.blueprint.warm_todoist_services', side_effect=RuntimeError('boom')):
+            response = todoist_webhook(self._request('item_added.json'))
+
+        assert response.status_code == 500
+        assert json.loads(response.get_body()) == {'success': False, 'error': 'boom'}
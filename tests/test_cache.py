@@ -0,0 +1,266 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+from heidi_todoist.cache import ENTRY_BYTES, SharedTaskIndex, TaskIndex
+
+
+def _complete_in_other_process(path: str) -> None:
+    index = SharedTaskIndex(path, ttl=60)
+    index.remove('project123', 'Test Task', 'task123')
+    index.put('project123', 'Test Task', 'new456')
+
+
+class TestTaskIndex:
+    """Test cases for the TaskIndex class."""
+
+    def setup_method(self):
+        """Set up a fresh index before each test method."""
+        self.index = TaskIndex(ttl=60)
+
+    def test_lookup_unloaded_project_is_miss(self):
+        """Test that an unloaded project reports not fresh."""
+        assert self.index.lookup('project123', 'Test Task') == (False, None)
+        assert self.index.misses == 1
+
+    def test_lookup_loaded_project(self):
+        """Test lookup of present and absent tasks in a loaded project."""
+        self.index.replace('project123', {'Test Task': 'task123'})
+
+        assert self.index.lookup('project123', 'Test Task') == (True, 'task123')
+        assert self.index.lookup('project123', 'Other Task') == (True, None)
+        assert self.index.hits == 2
+
+    def test_entries_returns_copy(self):
+        """Test that entries returns a detached copy of a fresh project."""
+        assert self.index.entries('project123') is None
+
+        self.index.replace('project123', {'Test Task': 'task123'})
+        entries = self.index.entries('project123')
+        entries['Other'] = 'x'
+
+        assert self.index.lookup('project123', 'Other') == (True, None)
+
+    def test_entries_expire_after_ttl(self):
+        """Test that a project is dropped once its TTL has passed."""
+        with patch('heidi_todoist.cache.time.monotonic', return_value=100.0):
+            self.index.replace('project123', {'Test Task': 'task123'})
+
+        with patch('heidi_todoist.cache.time.monotonic', return_value=161.0):
+            assert self.index.is_fresh('project123') is False
+            assert self.index.lookup('project123', 'Test Task') == (False, None)
+
+    def test_age(self):
+        """Test that age is reported for a fresh project and None once it expires."""
+        with patch('heidi_todoist.cache.time.monotonic', return_value=100.0):
+            assert self.index.age('project123') is None
+            self.index.replace('project123', {'Test Task': 'task123'})
+
+        with patch('heidi_todoist.cache.time.monotonic', return_value=130.0):
+            assert self.index.age('project123') == 30.0
+        with patch('heidi_todoist.cache.time.monotonic', return_value=161.0):
+            assert self.index.age('project123') is None
+
+    def test_put_and_remove_write_through(self):
+        """Test that writes update a loaded project."""
+        self.index.replace('project123', {'Test Task': 'task123'})
+
+        self.index.remove('project123', 'Test Task')
+        assert self.index.lookup('project123', 'Test Task') == (True, None)
+
+        self.index.put('project123', 'Test Task', 'new456')
+        assert self.index.lookup('project123', 'Test Task') == (True, 'new456')
+
+    def test_remove_with_task_id_keeps_newer_entry(self):
+        """Test that removing a closed task does not erase a newer id for the same content."""
+        self.index.replace('project123', {'Test Task': 'new456'})
+
+        self.index.remove('project123', 'Test Task', 'task123')
+        assert self.index.lookup('project123', 'Test Task') == (True, 'new456')
+
+        self.index.remove('project123', 'Test Task', 'new456')
+        assert self.index.lookup('project123', 'Test Task') == (True, None)
+
+    def test_writes_ignored_for_unloaded_project(self):
+        """Test that writes never make a partially known project look fresh."""
+        self.index.put('project123', 'Test Task', 'new456')
+        self.index.remove('project123', 'Test Task')
+
+        assert self.index.is_fresh('project123') is False
+
+    def test_update_task_moves_between_projects(self):
+        """Test that a task moved to another project is dropped from the old one and added to the new one."""
+        self.index.replace('project123', {'Test Task': 'task123'})
+        self.index.replace('project456', {})
+
+        assert self.index.update_task('task123', 'project456', 'Test Task') is True
+
+        assert self.index.entries('project123') == {}
+        assert self.index.entries('project456') == {'Test Task': 'task123'}
+
+    def test_update_task_unchanged(self):
+        """Test that a change to a task that leaves it where it is indexed changes nothing."""
+        self.index.replace('project123', {'Test Task': 'task123'}, {'task123': None})
+
+        assert self.index.update_task('task123', 'project123', 'Test Task') is False
+        assert self.index.lookup('project123', 'Test Task') == (True, 'task123')
+
+    def test_update_task_keeps_first_duplicate(self):
+        """Test that a second task with an indexed name does not replace the first, as in a full listing."""
+        self.index.replace('project123', {'Test Task': 'task123'})
+
+        assert self.index.update_task('task999', 'project123', 'Test Task') is False
+        assert self.index.lookup('project123', 'Test Task') == (True, 'task123')
+
+    def test_update_task_skips_expired_project(self):
+        """Test that an outside change leaves a project whose listing has expired alone."""
+        with patch('heidi_todoist.cache.time.monotonic', return_value=100.0):
+            self.index.replace('project123', {'Test Task': 'task123'})
+
+        with patch('heidi_todoist.cache.time.monotonic', return_value=161.0):
+            assert self.index.update_task('task123', 'project456', 'Test Task') is False
+
+    def test_invalidate(self):
+        """Test invalidating a single project and all projects."""
+        self.index.replace('project123', {})
+        self.index.replace('project456', {})
+
+        self.index.invalidate('project123')
+        assert self.index.is_fresh('project123') is False
+        assert self.index.is_fresh('project456') is True
+
+        self.index.invalidate()
+        assert self.index.is_fresh('project456') is False
+
+    def test_lookup_due(self):
+        """Test that due dates listed with the project are answered while it is recent enough."""
+        self.index.replace('project123', {'Feed': 'task1', 'Walk': 'task2', 'Brush': 'task3'},
+                           {'task1': '2025-01-01T18:00:00', 'task2': None})
+
+        assert self.index.lookup_due('project123', 'Feed', 60)['due'] == '2025-01-01T18:00:00'
+        assert self.index.lookup_due('project123', 'Walk', 60)['due'] is None
+        assert self.index.lookup_due('project123', 'Absent', 60)['task_id'] is None
+        # Listed without a due date known, and older than the caller accepts
+        assert self.index.lookup_due('project123', 'Brush', 60) is None
+        assert self.index.lookup_due('project123', 'Feed', 0) is None
+        assert self.index.lookup_due('project456', 'Feed', 60) is None
+        assert (self.index.hits, self.index.misses) == (3, 3)
+
+    def test_due_written_through(self):
+        """Test that created, changed and completed tasks keep due dates current."""
+        self.index.replace('project123', {'Feed': 'task1'}, {'task1': '2025-01-01T08:30:00'})
+
+        self.index.put('project123', 'Feed', 'task2', '2025-01-01T13:00:00')
+        assert self.index.lookup_due('project123', 'Feed', 60)['due'] == '2025-01-01T13:00:00'
+
+        assert self.index.update_task('task2', 'project123', 'Feed', '2025-01-02T08:30:00') is True
+        assert self.index.update_task('task2', 'project123', 'Feed', '2025-01-02T08:30:00') is False
+        assert self.index.lookup_due('project123', 'Feed', 60)['due'] == '2025-01-02T08:30:00'
+
+        self.index.remove('project123', 'Feed', 'task2')
+        assert self.index.lookup_due('project123', 'Feed', 60)['task_id'] is None
+
+    def test_replace_without_due_times_forgets_them(self):
+        """Test that a reload that does not carry due dates leaves them unknown rather than stale."""
+        self.index.replace('project123', {'Feed': 'task1'}, {'task1': '2025-01-01T08:30:00'})
+
+        self.index.replace('project123', {'Feed': 'task1'})
+
+        assert self.index.lookup_due('project123', 'Feed', 60) is None
+
+    def test_memory_bytes(self):
+        """Test that the estimate grows with the indexed tasks and their due dates."""
+        self.index.replace('project123', {'Feed': 'task1', 'Walk': 'task2'}, {'task1': '2025-01-01T18:00:00'})
+
+        assert self.index.memory_bytes() == 3 * ENTRY_BYTES
+
+    def test_stats(self):
+        """Test that stats count projects and indexed tasks."""
+        self.index.replace('project123', {'A': '1', 'B': '2'})
+        self.index.lookup('project123', 'A')
+
+        assert self.index.stats() == {'hits': 1, 'misses': 0, 'projects': 1, 'tasks': 2}
+
+
+class TestSharedTaskIndex(TestTaskIndex):
+    """Runs the TaskIndex cases against the SQLite-backed index, plus sharing between processes."""
+
+    def setup_method(self):
+        """Set up an index on a fresh database file before each test method."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'tasks.db')
+        self.index = SharedTaskIndex(self.path, ttl=60)
+
+    def teardown_method(self):
+        """Remove the database file."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_entries_expire_after_ttl(self):
+        """Test that a project is stale once its TTL has passed on the wall clock."""
+        with patch('heidi_todoist.cache.time.time', return_value=100.0):
+            self.index.replace('project123', {'Test Task': 'task123'})
+
+        with patch('heidi_todoist.cache.time.time', return_value=161.0):
+            assert self.index.is_fresh('project123') is False
+            assert self.index.lookup('project123', 'Test Task') == (False, None)
+
+    def test_age(self):
+        """Test that age is reported for a fresh project and None once it expires."""
+        with patch('heidi_todoist.cache.time.time', return_value=100.0):
+            assert self.index.age('project123') is None
+            self.index.replace('project123', {'Test Task': 'task123'})
+
+        with patch('heidi_todoist.cache.time.time', return_value=130.0):
+            assert self.index.age('project123') == 30.0
+        with patch('heidi_todoist.cache.time.time', return_value=161.0):
+            assert self.index.age('project123') is None
+
+    def test_update_task_skips_expired_project(self):
+        """Test that an outside change leaves a project whose listing has expired on the wall clock alone."""
+        with patch('heidi_todoist.cache.time.time', return_value=100.0):
+            self.index.replace('project123', {'Test Task': 'task123'})
+
+        with patch('heidi_todoist.cache.time.time', return_value=161.0):
+            assert self.index.update_task('task123', 'project456', 'Test Task') is False
+
+    def test_memory_bytes(self):
+        """Test that tasks kept in the shared file are not counted against this process."""
+        self.index.replace('project123', {'Feed': 'task1', 'Walk': 'task2'}, {'task1': '2025-01-01T18:00:00'})
+
+        assert self.index.memory_bytes() == 0
+
+    def test_uses_wal_journal(self):
+        """Test that the database is switched to WAL so readers are not blocked by a writer."""
+        self.index.is_fresh('project123')
+
+        assert self.index._connect().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+    def test_listing_shared_between_indexes(self):
+        """Test that a project listed through one index is a hit in another on the same file."""
+        other = SharedTaskIndex(self.path, ttl=60)
+        self.index.replace('project123', {'Test Task': 'task123'})
+
+        assert other.lookup('project123', 'Test Task') == (True, 'task123')
+        assert other.stats() == {'hits': 1, 'misses': 0, 'projects': 1, 'tasks': 1}
+        assert self.index.stats()['hits'] == 0
+
+    def test_write_through_seen_by_other_process(self):
+        """Test that a task completed in another worker process is visible here."""
+        self.index.replace('project123', {'Test Task': 'task123'})
+
+        process = multiprocessing.get_context('spawn').Process(target=_complete_in_other_process, args=(self.path,))
+        process.start()
+        process.join(30)
+
+        assert process.exitcode == 0
+        assert self.index.lookup('project123', 'Test Task') == (True, 'new456')
+
+    def test_unusable_file_is_a_miss(self):
+        """Test that a database that cannot be opened is treated as a miss rather than an error."""
+        index = SharedTaskIndex(os.path.join(self.directory, 'missing', 'tasks.db'), ttl=60)
+        index.replace('project123', {'Test Task': 'task123'})
+
+        assert index.lookup('project123', 'Test Task') == (False, None)
+        assert index.stats() == {'hits': 0, 'misses': 1, 'projects': 0, 'tasks': 0}
+        assert index.update_task('task123', 'project123', 'Other Task') is False
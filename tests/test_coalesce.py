@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import pytest
+from heidi_todoist.coalesce import Coalescer
+
+
+class TestCoalescer:
+    """Test cases for the Coalescer class."""
+
+    def setup_method(self):
+        """Set up a fresh coalescer before each test."""
+        self.coalescer = Coalescer()
+
+    def _start_leader(self, key, result=None, error=None):
+        """Start a call for key on a thread and hold it in flight until released."""
+        started = threading.Event()
+        release = threading.Event()
+        outcome = {}
+
+        def call():
+            started.set()
+            release.wait(5)
+            if error:
+                raise error
+            return result
+
+        def leader():
+            try:
+                outcome['value'] = self.coalescer.run(key, call)
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        started.wait(5)
+        return thread, release, outcome
+
+    def _wait_for_waiters(self, count):
+        while self.coalescer.shared < count:
+            threading.Event().wait(0.001)
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that callers arriving while a call is in flight get its result without running their own."""
+        thread, release, outcome = self._start_leader('task', {'success': True})
+        results = []
+        waiters = [threading.Thread(target=lambda: results.append(self.coalescer.run('task', dict)))
+                   for _ in range(3)]
+        for waiter in waiters:
+            waiter.start()
+        self._wait_for_waiters(3)
+
+        release.set()
+        for waiter in waiters + [thread]:
+            waiter.join()
+
+        assert outcome['value'] == ({'success': True}, False)
+        assert results == [({'success': True}, True)] * 3
+        assert self.coalescer.stats() == {'leaders': 1, 'shared': 3, 'in_flight': 0}
+
+    def test_error_fans_out(self):
+        """Test that every waiter sees the leader's exception."""
+        thread, release, outcome = self._start_leader('task', error=RuntimeError('boom'))
+        errors = []
+
+        def waiter():
+            try:
+                self.coalescer.run('task', dict)
+            except RuntimeError as e:
+                errors.append(e)
+
+        waiter_thread = threading.Thread(target=waiter)
+        waiter_thread.start()
+        self._wait_for_waiters(1)
+        release.set()
+        waiter_thread.join()
+        thread.join()
+
+        assert outcome['error'] is errors[0]
+
+    def test_sequential_calls_run_separately(self):
+        """Test that a call after the previous one finished runs again."""
+        calls = []
+
+        self.coalescer.run('task', lambda: calls.append(1) or {'success': True})
+        self.coalescer.run('task', lambda: calls.append(2) or {'success': True})
+
+        assert calls == [1, 2]
+
+    def test_different_keys_do_not_share(self):
+        """Test that only callers with the same key are grouped."""
+        thread, release, _ = self._start_leader('task', {'success': True})
+
+        assert self.coalescer.run('other', lambda: {'other': True}) == ({'other': True}, False)
+
+        release.set()
+        thread.join()
+
+    def test_async_callers_share_one_call(self):
+        """Test that gathered async callers run the call once."""
+        calls = []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {'success': True}
+
+        async def main():
+            return await asyncio.gather(*(self.coalescer.run_async('task', call) for _ in range(3)))
+
+        results = asyncio.run(main())
+
+        assert calls == [1]
+        assert sorted(shared for _, shared in results) == [False, True, True]
+
+    def test_async_caller_waits_on_sync_call(self):
+        """Test that an async caller joins a call started by a sync caller."""
+        thread, release, _ = self._start_leader('task', {'success': True})
+
+        async def main():
+            waiter = asyncio.ensure_future(self.coalescer.run_async('task', pytest.fail))
+            await asyncio.sleep(0.01)
+            release.set()
+            return await waiter
+
+        assert asyncio.run(main()) == ({'success': True}, True)
+        thread.join()
@@ -0,0 +1,28 @@
+import subprocess
+import sys
+from heidi_todoist.dues import due_date, todoist_due_date
+
+
+class TestDueDate:
+    """Test cases for reading due dates from Todoist task payloads."""
+
+    def test_due_date(self):
+        """Test that the due date string is read, and a missing or empty due is None."""
+        assert due_date({'due': {'date': '2023-01-01T19:30:00Z', 'is_recurring': False}}) == '2023-01-01T19:30:00Z'
+        assert due_date({'due': {'date': '2023-01-01'}}) == '2023-01-01'
+        assert due_date({'due': None}) is None
+        assert due_date({}) is None
+
+    def test_todoist_due_date(self):
+        """Test that aware due times are normalised to UTC and floating ones kept, as Todoist reports them."""
+        assert todoist_due_date('2023-01-01T14:30:00-05:00') == '2023-01-01T19:30:00Z'
+        assert todoist_due_date('2023-07-01T14:30:00.123456-04:00') == '2023-07-01T18:30:00Z'
+        assert todoist_due_date('2023-01-01T14:30:00') == '2023-01-01T14:30:00'
+
+    def test_webhook_path_imports_no_http_client(self):
+        """Test that applying webhooks does not pull requests and its thread pools into the import."""
+        code = 'import sys, heidi_todoist.webhooks; print("requests" in sys.modules)'
+
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+
+        assert output.strip() == 'False'
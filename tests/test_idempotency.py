@@ -0,0 +1,86 @@
+from unittest.mock import patch
+from heidi_todoist.idempotency import IdempotencyStore, derive_key, idempotency_store, valid_key
+
+
+class TestIdempotencyHelpers:
+    """Test cases for key validation and derivation."""
+
+    def test_valid_key(self):
+        """Test that only non-empty strings of reasonable length are accepted."""
+        assert valid_key('abc-123') == 'abc-123'
+        assert valid_key('') is None
+        assert valid_key(None) is None
+        assert valid_key(123) is None
+        assert valid_key('x' * 256) is None
+
+    def test_derive_key(self):
+        """Test that derived keys depend on the project and task name."""
+        assert derive_key('project123', 'Feed') == derive_key('project123', 'Feed')
+        assert derive_key('project123', 'Feed') != derive_key('project123', 'Walk')
+        assert derive_key('project123', 'Feed') != derive_key('project456', 'Feed')
+        assert derive_key('project123', 'Feed', 'alice') != derive_key('project123', 'Feed', 'bob')
+        assert derive_key('project123', 'Feed', 'alice') != derive_key('project123', 'Feed')
+
+
+class TestIdempotencyStore:
+    """Test cases for the IdempotencyStore class."""
+
+    def test_put_and_get(self):
+        """Test that a stored result is returned until it expires."""
+        store = IdempotencyStore()
+        with patch('heidi_todoist.idempotency.time.time', return_value=1000.0):
+            store.put('key', {'success': True}, ttl=60)
+            assert store.get('key') == {'success': True}
+        with patch('heidi_todoist.idempotency.time.time', return_value=1061.0):
+            assert store.get('key') is None
+
+        assert store.stats() == {'hits': 1, 'misses': 1, 'size': 0}
+
+    def test_lru_eviction(self):
+        """Test that the least recently used result is dropped when full."""
+        store = IdempotencyStore(max_size=2)
+        store.put('a', {'n': 1}, ttl=60)
+        store.put('b', {'n': 2}, ttl=60)
+        store.get('a')
+        store.put('c', {'n': 3}, ttl=60)
+
+        assert store.get('b') is None
+        assert store.get('a') == {'n': 1}
+
+    def test_persistent_store_survives_new_process(self, tmp_path):
+        """Test that a result stored by one store is served by another using the same file."""
+        path = str(tmp_path / 'idempotency.sqlite')
+        IdempotencyStore(path=path).put('key', {'success': True}, ttl=60)
+
+        fresh = IdempotencyStore(path=path)
+
+        assert fresh.get('key') == {'success': True}
+        assert fresh.stats()['size'] == 1
+
+    def test_persistent_store_respects_expiry(self, tmp_path):
+        """Test that expired persisted results are not returned."""
+        path = str(tmp_path / 'idempotency.sqlite')
+        with patch('heidi_todoist.idempotency.time.time', return_value=1000.0):
+            IdempotencyStore(path=path).put('key', {'success': True}, ttl=60)
+
+        with patch('heidi_todoist.idempotency.time.time', return_value=1061.0):
+            assert IdempotencyStore(path=path).get('key') is None
+
+    def test_persistent_store_errors_are_tolerated(self, tmp_path):
+        """Test that an unusable database degrades to in-memory behaviour."""
+        store = IdempotencyStore(path=str(tmp_path / 'missing' / 'idempotency.sqlite'))
+
+        store.put('key', {'success': True}, ttl=60)
+        assert store.get('key') == {'success': True}
+        store.clear()
+        assert store.get('key') is None
+
+    def test_idempotency_store_shared_and_configured(self, tmp_path):
+        """Test that every route in the process gets the same store, configured from settings on first use."""
+        path = str(tmp_path / 'idempotency.sqlite')
+        with patch.dict('os.environ', {'IDEMPOTENCY_CACHE_SIZE': '8', 'IDEMPOTENCY_STORE_PATH': path}):
+            store = idempotency_store()
+
+        assert idempotency_store() is store
+        assert store.max_size == 8
+        assert store.path == path
@@ -0,0 +1,47 @@
+import json
+import logging
+import os
+from heidi_todoist.json_files import load_json_file, save_json_file
+
+logger = logging.getLogger(__name__)
+
+
+class TestJsonFiles:
+    """Test cases for reading and atomically writing JSON state files."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that a saved file loads back and no temporary file is left behind."""
+        path = str(tmp_path / 'state.json')
+
+        save_json_file(path, {'a': 1}, logger, 'state')
+
+        assert load_json_file(path, logger, 'state') == {'a': 1}
+        assert os.listdir(tmp_path) == ['state.json']
+
+    def test_replaces_existing_file(self, tmp_path):
+        """Test that saving over a file swaps in the new content whole."""
+        path = tmp_path / 'state.json'
+        path.write_text(json.dumps({'a': 1}))
+
+        save_json_file(str(path), {'b': 2}, logger, 'state')
+
+        assert json.loads(path.read_text()) == {'b': 2}
+
+    def test_missing_or_corrupt_file_is_none(self, tmp_path, caplog):
+        """Test that an unusable file is logged and read as None."""
+        corrupt = tmp_path / 'corrupt.json'
+        corrupt.write_text('{not json')
+
+        with caplog.at_level(logging.INFO):
+            assert load_json_file(str(tmp_path / 'missing.json'), logger, 'state') is None
+            assert load_json_file(str(corrupt), logger, 'state') is None
+
+        assert 'No usable state at' in caplog.text
+
+    def test_failed_write_logged(self, tmp_path, caplog):
+        """Test that a file that can't be written is logged rather than raised."""
+        path = str(tmp_path / 'missing' / 'state.json')
+
+        save_json_file(path, {'a': 1}, logger, 'state')
+
+        assert f'Failed to write state {path}' in caplog.text
@@ -0,0 +1,31 @@
+import json
+import pytest
+from heidi_todoist.json_settings import load_json_setting
+
+
+class TestLoadJsonSetting:
+    """Test cases for settings given as inline JSON or as a JSON file."""
+
+    @pytest.mark.parametrize('value', [None, '', '   '])
+    def test_blank_is_empty(self, value):
+        """Test that an unset setting is an empty object."""
+        assert load_json_setting(value, 'RULES', 'names to rules') == {}
+
+    def test_inline_and_file_agree(self, tmp_path):
+        """Test that inline JSON and a file holding the same JSON load the same object."""
+        config = {'Feed': {'interval': 6}}
+        path = tmp_path / 'rules.json'
+        path.write_text(json.dumps(config))
+
+        assert load_json_setting(json.dumps(config), 'RULES', 'names to rules') == config
+        assert load_json_setting(str(path), 'RULES', 'names to rules') == config
+
+    @pytest.mark.parametrize('value, message', [
+        ('{"Feed": ', 'RULES must be a JSON object of names to rules'),
+        ('{"Feed": 6}', 'RULES must be a JSON object of names to rules'),
+        ('/missing/rules.json', 'RULES file /missing/rules.json could not be read'),
+    ])
+    def test_invalid(self, value, message):
+        """Test that malformed JSON, non-object entries and unreadable files are named in the error."""
+        with pytest.raises(ValueError, match=message):
+            load_json_setting(value, 'RULES', 'names to rules')
@@ -0,0 +1,134 @@
+import json
+from unittest.mock import Mock, patch
+from heidi_todoist.mirror import ProjectMirror
+
+
+def _item(task_id, content, project_id='project123', **kwargs):
+    return {'id': task_id, 'content': content, 'project_id': project_id, **kwargs}
+
+
+class TestProjectMirror:
+    """Test cases for the ProjectMirror class."""
+
+    def setup_method(self):
+        """Set up a mirror with a mocked Sync client."""
+        self.sync_client = Mock()
+        self.mirror = ProjectMirror('project123', self.sync_client)
+
+    def test_full_sync_then_delta(self):
+        """Test that the first refresh is full and later ones apply only deltas."""
+        self.sync_client.sync.return_value = {
+            'full_sync': True,
+            'sync_token': 'token1',
+            'items': [_item('1', 'Feed'), _item('2', 'Walk'), _item('3', 'Elsewhere', 'other')]
+        }
+        assert self.mirror.refresh() == {'Feed': '1', 'Walk': '2'}
+        self.sync_client.sync.assert_called_with('*')
+
+        self.sync_client.sync.return_value = {
+            'full_sync': False,
+            'sync_token': 'token2',
+            'items': [_item('1', 'Feed', checked=True), _item('4', 'Feed'), _item('2', 'Walk', is_deleted=True)]
+        }
+        assert self.mirror.refresh() == {'Feed': '4'}
+        self.sync_client.sync.assert_called_with('token1')
+        assert self.mirror.sync_token == 'token2'
+
+    def test_due_times_follow_deltas(self):
+        """Test that each mirrored task's due date is kept current and dropped once it closes."""
+        self.sync_client.sync.return_value = {
+            'full_sync': True,
+            'sync_token': 'token1',
+            'items': [_item('1', 'Feed', due={'date': '2025-01-01T18:00:00'}), _item('2', 'Walk', due=None)]
+        }
+        self.mirror.refresh()
+        assert self.mirror.due_times == {'1': '2025-01-01T18:00:00', '2': None}
+
+        self.sync_client.sync.return_value = {'sync_token': 'token2', 'items': [_item('1', 'Feed', checked=True)]}
+        self.mirror.refresh()
+        assert self.mirror.due_times == {'2': None}
+
+    def test_task_moved_out_of_project_is_dropped(self):
+        """Test that a task moved to another project leaves the mirror."""
+        self.mirror.tasks = {'1': 'Feed'}
+        self.sync_client.sync.return_value = {'sync_token': 't', 'items': [_item('1', 'Feed', 'other')]}
+
+        assert self.mirror.refresh() == {}
+
+    def test_duplicate_names_keep_first(self):
+        """Test that the first mirrored task wins for duplicate names."""
+        self.mirror.tasks = {'1': 'Feed', '2': 'Feed'}
+
+        assert self.mirror.entries() == {'Feed': '1'}
+
+    def test_stats(self):
+        """Test delta size and full sync metrics."""
+        assert self.mirror.seconds_since_refresh() is None
+        assert self.mirror.stats()['seconds_since_full_sync'] is None
+
+        self.sync_client.sync.return_value = {'full_sync': True, 'sync_token': 't', 'items': [_item('1', 'Feed')]}
+        with patch('heidi_todoist.mirror.time.time', return_value=1000.0):
+            self.mirror.refresh()
+        with patch('heidi_todoist.mirror.time.time', return_value=1030.0):
+            stats = self.mirror.stats()
+
+        assert stats == {
+            'tasks': 1,
+            'deltas': 1,
+            'full_syncs': 1,
+            'last_delta_size': 1,
+            'seconds_since_full_sync': 30.0
+        }
+        assert self.mirror.seconds_since_refresh() >= 0
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test that a new mirror resumes from the previous snapshot and pulls only a delta."""
+        path = str(tmp_path / 'mirror.json')
+        first = ProjectMirror('project123', self.sync_client, path)
+        self.sync_client.sync.return_value = {'full_sync': True, 'sync_token': 'token1',
+                                              'items': [_item('1', 'Feed', due={'date': '2025-01-01'})]}
+        first.refresh()
+
+        resumed = ProjectMirror('project123', self.sync_client, path)
+        assert resumed.due_times == {'1': '2025-01-01'}
+        self.sync_client.sync.return_value = {'sync_token': 'token2', 'items': []}
+
+        assert resumed.refresh() == {'Feed': '1'}
+        self.sync_client.sync.assert_called_with('token1')
+        assert resumed.full_sync_at == first.full_sync_at
+
+    def test_empty_delta_does_not_rewrite_snapshot(self, tmp_path):
+        """Test that an unchanged project leaves the snapshot alone."""
+        path = tmp_path / 'mirror.json'
+        mirror = ProjectMirror('project123', self.sync_client, str(path))
+        self.sync_client.sync.return_value = {'sync_token': 'token2', 'items': []}
+
+        mirror.refresh()
+
+        assert not path.exists()
+
+    def test_snapshot_for_other_project_ignored(self, tmp_path):
+        """Test that a snapshot written for a different project is not used."""
+        path = tmp_path / 'mirror.json'
+        path.write_text(json.dumps({'project_id': 'other', 'sync_token': 'x', 'tasks': {'1': 'Feed'}}))
+
+        mirror = ProjectMirror('project123', self.sync_client, str(path))
+
+        assert mirror.sync_token == '*'
+        assert mirror.tasks == {}
+
+    def test_unreadable_snapshot_ignored(self, tmp_path):
+        """Test that a corrupt snapshot falls back to a full sync."""
+        path = tmp_path / 'mirror.json'
+        path.write_text('{not json')
+
+        mirror = ProjectMirror('project123', self.sync_client, str(path))
+
+        assert mirror.sync_token == '*'
+
+    def test_snapshot_write_failure_logged(self, tmp_path):
+        """Test that a failed snapshot write does not fail the refresh."""
+        mirror = ProjectMirror('project123', self.sync_client, str(tmp_path / 'missing' / 'mirror.json'))
+        self.sync_client.sync.return_value = {'full_sync': True, 'sync_token': 't', 'items': [_item('1', 'Feed')]}
+
+        assert mirror.refresh() == {'Feed': '1'}
@@ -0,0 +1,185 @@
+import json
+import os
+import pytest
+from unittest.mock import Mock, patch
+from heidi_todoist.pool import ClientPool, get_async_todoist_service, get_todoist_service, client_pool
+
+
+class TestClientPool:
+    """Test cases for the ClientPool class."""
+
+    def test_get_reuses_service_for_same_token(self):
+        """Test that a second lookup for the same token is a hit."""
+        pool = ClientPool()
+
+        first = pool.get('token_a')
+        second = pool.get('token_a')
+
+        assert first is second
+        assert pool.hits == 1
+        assert pool.misses == 1
+
+    def test_get_builds_new_service_for_new_token(self):
+        """Test that a changed token builds a separate client."""
+        pool = ClientPool()
+
+        first = pool.get('token_a')
+        second = pool.get('token_b')
+
+        assert first is not second
+        assert first.token == 'token_a'
+        assert second.token == 'token_b'
+        assert pool.misses == 2
+
+    def test_get_evicts_least_recently_used(self):
+        """Test that the pool closes and drops the oldest client when full."""
+        pool = ClientPool(max_size=1)
+
+        first = pool.get('token_a')
+        with patch.object(first.session, 'close') as mock_close:
+            pool.get('token_b')
+            mock_close.assert_called_once()
+
+        assert pool.evictions == 1
+        assert pool.stats()['size'] == 1
+
+    def test_explicit_limits_skip_settings(self):
+        """Test that a pool given every limit never reads settings, even invalid ones."""
+        pool = ClientPool(max_size=2, idle_ttl=60, memory_limit=1000)
+
+        with patch('heidi_todoist.pool.get_settings', side_effect=ValueError('invalid')):
+            assert pool._limits() == (2, 60, 1000)
+
+    def test_get_evicts_idle_services(self):
+        """Test that a client unused for the idle TTL is dropped on the next lookup."""
+        pool = ClientPool(idle_ttl=60)
+
+        with patch('heidi_todoist.pool.time.monotonic', return_value=100.0):
+            pool.get('token_a')
+            pool.get('token_b')
+        with patch('heidi_todoist.pool.time.monotonic', return_value=150.0):
+            pool.get('token_b')
+        with patch('heidi_todoist.pool.time.monotonic', return_value=170.0):
+            pool.get('token_c')
+
+        assert [service.token for service in pool.services()] == ['token_b', 'token_c']
+        assert pool.idle_evictions == 1
+
+    def test_get_evicts_over_memory_limit(self):
+        """Test that least recently used clients are dropped until cached tasks fit the memory limit."""
+        pool = ClientPool(memory_limit=1000)
+        first = pool.get('token_a')
+        first.task_index.replace('project_a', {f'Task {i}': str(i) for i in range(5)})
+        second = pool.get('token_b')
+        second.task_index.replace('project_b', {f'Task {i}': str(i) for i in range(5)})
+
+        pool.get('token_b')
+
+        assert pool.services() == [second]
+        assert pool.memory_evictions == 1
+        assert pool.stats()['cache_bytes'] == second.cache_bytes()
+
+    def test_current_service_never_evicted(self):
+        """Test that a client over the memory limit on its own is still returned."""
+        pool = ClientPool(memory_limit=1)
+        service = pool.get('token_a')
+        service.task_index.replace('project_a', {'Task': '1'})
+
+        assert pool.get('token_a') is service
+        assert pool.memory_evictions == 0
+
+    def test_get_async_wraps_pooled_service(self):
+        """Test that the async service is cached and wraps the pooled sync service."""
+        pool = ClientPool()
+
+        first = pool.get_async('token_a')
+        second = pool.get_async('token_a')
+
+        assert first is second
+        assert first.service is pool.get('token_a')
+
+    def test_get_async_rebuilt_after_eviction(self):
+        """Test that an evicted token gets a fresh async wrapper."""
+        pool = ClientPool(max_size=1)
+        first = pool.get_async('token_a')
+        pool.get('token_b')
+
+        assert pool.get_async('token_a') is not first
+
+    def test_stats_includes_connection_counts(self):
+        """Test that stats aggregates connection reuse from pooled sessions."""
+        pool = ClientPool()
+        pool.get('token_a')
+
+        with patch('heidi_todoist.pool.connection_stats') as mock_stats:
+            mock_stats.return_value = {'connections_opened': 1, 'requests_sent': 5}
+            result = pool.stats()
+
+        assert result == {
+            'hits': 0,
+            'misses': 1,
+            'evictions': 0,
+            'idle_evictions': 0,
+            'memory_evictions': 0,
+            'size': 1,
+            'cache_bytes': 0,
+            'connections_opened': 1,
+            'requests_sent': 5,
+            'index_hits': 0,
+            'index_misses': 0,
+            'index_hit_rate': None,
+            'retries': 0,
+            'rate_limit_waits': 0,
+            'mirrors': {}
+        }
+
+    def test_clear_resets_pool(self):
+        """Test that clear closes sessions and resets counters."""
+        pool = ClientPool()
+        service = pool.get('token_a')
+        service.session = Mock()
+
+        pool.clear()
+
+        service.session.close.assert_called_once()
+        assert pool.stats()['size'] == 0
+        assert pool.misses == 0
+
+
+class TestGetTodoistService:
+    """Test cases for the get_todoist_service helper."""
+
+    def test_returns_pooled_service(self):
+        """Test that the configured token is served from the shared pool."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            first = get_todoist_service()
+            second = get_todoist_service()
+
+        assert first is second
+        assert client_pool.hits == 1
+
+    def test_returns_pooled_async_service(self):
+        """Test that the async service shares the pooled sync service."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            async_service = get_async_todoist_service()
+            assert async_service.service is get_todoist_service()
+
+    def test_tenant_served_with_own_token(self):
+        """Test that each tenant gets a service for its own token."""
+        tenants = {'sam': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'sam-key'}}
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token', 'TENANTS': json.dumps(tenants)}):
+            assert get_todoist_service('sam').token == 'token_b'
+            assert get_async_todoist_service('sam').service.token == 'token_b'
+            assert get_todoist_service().token == 'test_token'
+
+    def test_unknown_tenant(self):
+        """Test that a tenant missing from TENANTS is an error rather than the default account."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            with pytest.raises(ValueError, match='Tenant sam is not configured in TENANTS'):
+                get_todoist_service('sam')
+
+    def test_missing_token(self):
+        """Test that a missing token raises the same error as TodoistService."""
+        with patch.dict(os.environ, {}, clear=True):
+            with pytest.raises(ValueError, match='TODOIST_API_TOKEN environment variable not set'):
+                get_todoist_service()
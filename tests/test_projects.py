@@ -0,0 +1,111 @@
+import json
+import threading
+import pytest
+from unittest.mock import Mock
+from heidi_todoist.projects import ProjectNotFoundError, ProjectResolver
+
+
+def _project(project_id, name='Project'):
+    project = Mock(id=project_id)
+    project.name = name
+    return project
+
+
+class TestProjectResolver:
+    """Test cases for resolving configured project ids to API ids."""
+
+    def setup_method(self):
+        """Set up an API listing three projects over two pages."""
+        self.api = Mock()
+        self.api.get_projects.side_effect = lambda: iter([
+            [_project('6cvcJh2HrqCMxvcF', 'Heidi'), _project('2203306141', 'Inbox')],
+            [_project('9aaaBBBcccDDDeee', 'heidi')]
+        ])
+        self.resolver = ProjectResolver()
+
+    @pytest.mark.parametrize('value, expected', [
+        ('6cvcJh2HrqCMxvcF', '6cvcJh2HrqCMxvcF'),
+        ('heidi-6cvcJh2HrqCMxvcF', '6cvcJh2HrqCMxvcF'),
+        ('dog-walks-9aaaBBBcccDDDeee', '9aaaBBBcccDDDeee'),
+        ('inbox', '2203306141'),
+    ])
+    def test_resolves_api_id_url_id_and_name(self, value, expected):
+        """Test that API ids, URL ids and names all resolve with one listing."""
+        assert self.resolver.resolve(value, self.api) == expected
+
+        self.api.get_projects.assert_called_once_with()
+
+    def test_duplicate_names_use_first(self, caplog):
+        """Test that a name shared by several projects resolves to the first listed, with a warning."""
+        assert self.resolver.resolve('HEIDI', self.api) == '6cvcJh2HrqCMxvcF'
+
+        assert '2 projects are named HEIDI, using 6cvcJh2HrqCMxvcF' in caplog.text
+
+    def test_not_found(self):
+        """Test that a value matching no project raises instead of guessing."""
+        with pytest.raises(ProjectNotFoundError, match='Project heidi-nope not found among 3 Todoist projects'):
+            self.resolver.resolve('heidi-nope', self.api)
+
+        assert self.resolver.cached('heidi-nope') is None
+
+    def test_cached_for_worker_lifetime(self):
+        """Test that a resolved value is never listed again."""
+        self.resolver.resolve('heidi-6cvcJh2HrqCMxvcF', self.api)
+        self.resolver.resolve('heidi-6cvcJh2HrqCMxvcF', self.api)
+
+        assert self.api.get_projects.call_count == 1
+        assert self.resolver.cached('heidi-6cvcJh2HrqCMxvcF') == '6cvcJh2HrqCMxvcF'
+        assert self.resolver.stats() == {'resolved': 1, 'lookups': 1}
+
+    def test_concurrent_resolves_list_once(self):
+        """Test that threads resolving the same value at once share one listing."""
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.resolver.resolve('inbox', self.api)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['2203306141'] * 8
+        assert self.api.get_projects.call_count == 1
+
+    def test_resolved_while_waiting_for_lock(self):
+        """Test that a value another thread resolved while this one waited is not listed again."""
+        self.resolver._project_ids['inbox'] = '2203306141'
+        self.resolver.cached = Mock(return_value=None)
+
+        assert self.resolver.resolve('inbox', self.api) == '2203306141'
+
+        self.api.get_projects.assert_not_called()
+
+    def test_persistent_cache(self, tmp_path):
+        """Test that a cold resolver starts from the cache file written by an earlier one."""
+        cache_path = str(tmp_path / 'projects.json')
+        ProjectResolver(cache_path).resolve('heidi-6cvcJh2HrqCMxvcF', self.api)
+
+        with open(cache_path) as cache_file:
+            assert json.load(cache_file) == {'heidi-6cvcJh2HrqCMxvcF': '6cvcJh2HrqCMxvcF'}
+
+        cold = ProjectResolver(cache_path)
+        assert cold.resolve('heidi-6cvcJh2HrqCMxvcF', self.api) == '6cvcJh2HrqCMxvcF'
+        assert self.api.get_projects.call_count == 1
+
+    def test_unreadable_cache_ignored(self, tmp_path):
+        """Test that a corrupt cache file is ignored rather than failing startup."""
+        cache_path = tmp_path / 'projects.json'
+        cache_path.write_text('{not json')
+
+        resolver = ProjectResolver(str(cache_path))
+
+        assert resolver.resolve('inbox', self.api) == '2203306141'
+
+    def test_failed_cache_write_logged(self, tmp_path, caplog):
+        """Test that a cache file that can't be written is logged and the resolution still returned."""
+        cache_path = str(tmp_path / 'missing' / 'projects.json')
+
+        assert ProjectResolver(cache_path).resolve('inbox', self.api) == '2203306141'
+
+        assert f'Failed to write project cache {cache_path}' in caplog.text
@@ -0,0 +1,53 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from heidi_todoist.queued import parse_task_message, task_message
+
+
+class TestQueued:
+    """Test cases for the queue message helpers."""
+
+    def test_task_message_round_trip(self):
+        """Test that a built message parses back with requested_at as an aware datetime."""
+        requested_at = datetime(2024, 1, 15, 14, 0, tzinfo=timezone.utc)
+
+        message = task_message('project123', 'Feed Heidi', requested_at)
+        parsed = parse_task_message(json.dumps(message).encode())
+
+        assert message['requested_at'] == '2024-01-15T14:00:00+00:00'
+        assert len(message['request_id']) == 32
+        assert parsed['requested_at'] == requested_at
+        assert parsed['task_name'] == 'Feed Heidi'
+        assert parsed['project_id'] == 'project123'
+
+    def test_task_message_defaults_to_now(self):
+        """Test that requested_at defaults to the current UTC time."""
+        before = datetime.now(timezone.utc)
+
+        message = task_message('project123', 'Feed Heidi')
+
+        assert before <= datetime.fromisoformat(message['requested_at']) <= datetime.now(timezone.utc)
+
+    def test_task_message_carries_tenant(self):
+        """Test that a tenant's message names the tenant whose token processes it."""
+        message = task_message('project123', 'Feed Heidi', tenant_id='sam')
+
+        assert 'tenant_id' not in task_message('project123', 'Feed Heidi')
+        assert parse_task_message(json.dumps(message))['tenant_id'] == 'sam'
+
+    @pytest.mark.parametrize('body, error', [
+        (b'not json', 'not valid JSON'),
+        (b'[]', 'must be a JSON object'),
+        (json.dumps({'request_id': 'r', 'project_id': 'p', 'requested_at': '2024-01-15T14:00:00+00:00'}),
+         'missing task_name'),
+        (json.dumps({'request_id': 'r', 'project_id': 'p', 'task_name': 't', 'requested_at': 'yesterday'}),
+         'invalid requested_at'),
+        (json.dumps({'request_id': 'r', 'project_id': 'p', 'task_name': 't', 'requested_at': '2024-01-15T14:00:00'}),
+         'must include a UTC offset'),
+        (json.dumps({'request_id': 'r', 'project_id': 'p', 'task_name': 't', 'tenant_id': '',
+                     'requested_at': '2024-01-15T14:00:00+00:00'}), 'invalid tenant_id'),
+    ])
+    def test_invalid_messages(self, body, error):
+        """Test that messages that can never be processed are rejected."""
+        with pytest.raises(ValueError, match=error):
+            parse_task_message(body)
@@ -0,0 +1,175 @@
+import json
+import threading
+import pytest
+import requests
+from unittest.mock import Mock
+from benchmarks.fake_todoist import task_payload
+from heidi_todoist.records import TASKS_FILTER_URL, TASKS_URL, TaskReader, TaskRecord, parse_task_page
+from heidi_todoist.timing import PhaseTimer
+
+
+def _response(tasks, next_cursor=None, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps({'results': tasks, 'next_cursor': next_cursor}).encode()
+    return response
+
+
+class TestParseTaskPage:
+    """Test cases for decoding task listing pages into records."""
+
+    def test_keeps_only_lookup_fields(self):
+        """Test that a full task payload becomes a record with id, content, project id and due date."""
+        body = json.dumps({
+            'results': [task_payload('task1', 'Feed', 'project123', due={'date': '2025-01-01T08:30:00'}),
+                        task_payload('task2', 'Walk', 'project123')],
+            'next_cursor': 'abc'
+        })
+
+        records, cursor = parse_task_page(body)
+
+        assert records == [TaskRecord('task1', 'Feed', 'project123', '2025-01-01T08:30:00'),
+                           TaskRecord('task2', 'Walk', 'project123')]
+        assert cursor == 'abc'
+
+    def test_last_page(self):
+        """Test that the last page has no cursor."""
+        records, cursor = parse_task_page(b'{"results": [], "next_cursor": null}')
+
+        assert records == []
+        assert cursor is None
+
+    def test_unexpected_shape(self):
+        """Test that a response without results is rejected like the SDK does."""
+        with pytest.raises(TypeError):
+            parse_task_page(b'[]')
+
+    def test_records_are_slotted(self):
+        """Test that records carry no per-instance dict."""
+        record = TaskRecord('task1', 'Feed', 'project123')
+
+        assert not hasattr(record, '__dict__')
+        with pytest.raises(AttributeError):
+            record.description = 'not kept'
+
+    def test_equality_and_repr(self):
+        """Test that records compare by value, not against other types, and show their fields."""
+        record = TaskRecord('task1', 'Feed', 'project123', '2025-01-01')
+
+        assert record == TaskRecord('task1', 'Feed', 'project123', '2025-01-01')
+        assert record != TaskRecord('task1', 'Feed', 'project123')
+        assert record.__eq__(('task1', 'Feed', 'project123', '2025-01-01')) is NotImplemented
+        assert repr(record) == "TaskRecord(id='task1', content='Feed', project_id='project123', due='2025-01-01')"
+
+
+class TestTaskReader:
+    """Test cases for paging through task listings."""
+
+    def setup_method(self):
+        """Set up a reader on a mocked session."""
+        self.session = Mock()
+        self.reader = TaskReader(self.session, 'test_token')
+
+    def test_follows_cursor(self):
+        """Test that pages are fetched lazily until the cursor runs out."""
+        self.session.get.side_effect = [
+            _response([task_payload('task1', 'Feed', 'project123')], next_cursor='1'),
+            _response([task_payload('task2', 'Walk', 'project123')])
+        ]
+
+        pages = self.reader.get_tasks(project_id='project123')
+        assert [record.id for record in next(pages)] == ['task1']
+        assert self.session.get.call_count == 1
+        assert [record.id for record in next(pages)] == ['task2']
+        assert list(pages) == []
+
+        first, second = self.session.get.call_args_list
+        assert first.args == (TASKS_URL,)
+        assert first.kwargs['params'] == {'project_id': 'project123'}
+        assert first.kwargs['headers'] == {'Authorization': 'Bearer test_token'}
+        assert second.kwargs['params'] == {'project_id': 'project123', 'cursor': '1'}
+
+    def test_filter(self):
+        """Test that filter listings use the filter endpoint and query."""
+        self.session.get.return_value = _response([])
+
+        assert list(self.reader.filter_tasks(query='#Heidi & search: Feed')) == [[]]
+        assert self.session.get.call_args.args == (TASKS_FILTER_URL,)
+        assert self.session.get.call_args.kwargs['params'] == {'query': '#Heidi & search: Feed'}
+
+    def test_http_error(self):
+        """Test that a failed page raises HTTPError like the SDK does."""
+        self.session.get.return_value = _response([], status_code=403)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            list(self.reader.get_tasks(project_id='project123'))
+
+    def test_page_size(self):
+        """Test that a configured page size is sent as the listing limit."""
+        self.session.get.return_value = _response([])
+
+        list(TaskReader(self.session, 'test_token', page_size=200).get_tasks(project_id='project123'))
+
+        assert self.session.get.call_args.kwargs['params'] == {'project_id': 'project123', 'limit': 200}
+
+
+class TestTaskReaderPrefetch:
+    """Test cases for fetching the next page while the current one is scanned."""
+
+    def setup_method(self):
+        """Set up a prefetching reader on a mocked session with three pages."""
+        self.session = Mock()
+        self.reader = TaskReader(self.session, 'test_token', prefetch=True)
+        self.pages = [
+            _response([task_payload('task1', 'Feed', 'project123')], next_cursor='1'),
+            _response([task_payload('task2', 'Walk', 'project123')], next_cursor='2'),
+            _response([task_payload('task3', 'Brush', 'project123')])
+        ]
+
+    def test_next_page_requested_before_it_is_read(self):
+        """Test that the next page is requested as soon as the current one arrives."""
+        second_requested = threading.Event()
+
+        def get(url, params, **kwargs):
+            if params.get('cursor') == '1':
+                second_requested.set()
+            return self.pages[int(params.get('cursor', 0))]
+        self.session.get.side_effect = get
+
+        pages = self.reader.get_tasks(project_id='project123')
+        assert [record.id for record in next(pages)] == ['task1']
+
+        assert second_requested.wait(timeout=5)
+        assert [[record.id for record in page] for page in pages] == [['task2'], ['task3']]
+
+    def test_stopping_early_drops_page_in_flight(self):
+        """Test that closing the pages once a match is found stops paging and drops the prefetched page."""
+        started = threading.Event()
+        release = threading.Event()
+
+        def get(url, params, **kwargs):
+            if params.get('cursor') == '1':
+                started.set()
+                release.wait(timeout=5)
+            return self.pages[int(params.get('cursor', 0))]
+        self.session.get.side_effect = get
+
+        with PhaseTimer() as timer:
+            pages = self.reader.get_tasks(project_id='project123')
+            next(pages)
+            assert started.wait(timeout=5)
+            pages.close()
+        release.set()
+
+        assert timer.counters == {'pages_discarded': 1}
+        assert self.session.get.call_count == 2
+
+    def test_error_raised_to_reader(self):
+        """Test that a failed prefetched page raises when it is read."""
+        self.session.get.side_effect = [self.pages[0], _response([], status_code=503)]
+
+        pages = self.reader.get_tasks(project_id='project123')
+        next(pages)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            next(pages)
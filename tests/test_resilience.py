@@ -0,0 +1,216 @@
+import time
+import pytest
+import requests
+from email.utils import formatdate
+from unittest.mock import Mock, patch
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from heidi_todoist.resilience import (CircuitBreaker, CircuitOpenError, RateLimitExceeded, RetryPolicy, TokenBucket,
+                                     retry_after_seconds, todoist_breaker)
+
+
+class TestRetryAfterSeconds:
+    """Test cases for parsing Retry-After headers."""
+
+    def test_seconds(self):
+        """Test a delay given in seconds."""
+        assert retry_after_seconds('7') == 7.0
+
+    def test_http_date(self):
+        """Test a delay given as an HTTP date."""
+        assert 0 < retry_after_seconds(formatdate(usegmt=True, timeval=time.time() + 30)) <= 30
+
+    @pytest.mark.parametrize('value', [None, '', 'soon'])
+    def test_missing_or_invalid(self, value):
+        """Test that an absent or unparseable header gives None."""
+        assert retry_after_seconds(value) is None
+
+
+class TestTokenBucket:
+    """Test cases for the TokenBucket class."""
+
+    def test_burst_up_to_capacity_without_waiting(self):
+        """Test that a full bucket serves its capacity immediately."""
+        bucket = TokenBucket(rate=1.0, capacity=3)
+
+        with patch('heidi_todoist.resilience.time.sleep') as mock_sleep:
+            waits = [bucket.acquire() for _ in range(3)]
+
+        assert waits == [0.0, 0.0, 0.0]
+        mock_sleep.assert_not_called()
+
+    def test_empty_bucket_waits_for_refill(self):
+        """Test that callers beyond the capacity sleep until their token is due."""
+        bucket = TokenBucket(rate=2.0, capacity=1)
+        bucket.acquire()
+
+        with patch('heidi_todoist.resilience.time.sleep') as mock_sleep:
+            first = bucket.acquire()
+            second = bucket.acquire()
+
+        assert first == pytest.approx(0.5, abs=0.01)
+        assert second == pytest.approx(1.0, abs=0.01)
+        assert mock_sleep.call_count == 2
+        assert bucket.waits == 2
+
+    def test_wait_beyond_max_raises(self):
+        """Test that a caller is turned away rather than held longer than max_wait."""
+        bucket = TokenBucket(rate=0.1, capacity=1, max_wait=5)
+        bucket.acquire()
+
+        with pytest.raises(RateLimitExceeded) as excinfo:
+            bucket.acquire()
+
+        assert excinfo.value.retry_after == pytest.approx(10, abs=0.01)
+        assert isinstance(excinfo.value, requests.exceptions.RequestException)
+
+    def test_pause_holds_back_callers(self):
+        """Test that a pause makes the next caller wait even with tokens left."""
+        bucket = TokenBucket(rate=100.0, capacity=10)
+        bucket.pause(2)
+
+        with patch('heidi_todoist.resilience.time.sleep') as mock_sleep:
+            bucket.acquire()
+
+        assert mock_sleep.call_args.args[0] == pytest.approx(2, abs=0.05)
+
+
+class TestRetryPolicy:
+    """Test cases for the RetryPolicy class."""
+
+    def setup_method(self):
+        """Set up a default policy."""
+        self.policy = RetryPolicy()
+
+    @pytest.mark.parametrize('method,status_code,expected', [
+        ('GET', 503, True),
+        ('DELETE', 502, True),
+        ('POST', 429, True),
+        ('POST', 503, False),
+        ('GET', 404, False),
+    ])
+    def test_should_retry_status(self, method, status_code, expected):
+        """Test that writes are only retried on 429."""
+        assert self.policy.should_retry_status(method, status_code) is expected
+
+    def test_post_retried_when_connection_never_made(self):
+        """Test that a POST is retried when it cannot have reached Todoist."""
+        refused = requests.exceptions.ConnectionError(MaxRetryError(Mock(), '/', NewConnectionError(Mock(), 'refused')))
+
+        assert self.policy.should_retry_error('POST', refused) is True
+        assert self.policy.should_retry_error('POST', requests.exceptions.ConnectTimeout()) is True
+
+    def test_post_not_retried_after_request_sent(self):
+        """Test that a POST whose response was lost is not sent again."""
+        assert self.policy.should_retry_error('POST', requests.exceptions.ReadTimeout()) is False
+        assert self.policy.should_retry_error('POST', requests.exceptions.ConnectionError('reset')) is False
+        assert self.policy.should_retry_error('GET', requests.exceptions.ReadTimeout()) is True
+
+    def test_delay_is_jittered_and_capped(self):
+        """Test full-jitter exponential backoff bounds."""
+        delays = [self.policy.delay(10) for _ in range(50)]
+
+        assert all(0 <= delay <= self.policy.backoff_max for delay in delays)
+        assert 0 <= self.policy.delay(0) <= self.policy.backoff_base
+
+    def test_delay_honours_retry_after(self):
+        """Test that Retry-After is used as given, unless it is longer than allowed."""
+        assert self.policy.delay(0, 4.0) == 4.0
+        assert self.policy.delay(0, 300.0) is None
+
+
+class TestCircuitBreaker:
+    """Test cases for the CircuitBreaker class."""
+
+    def setup_method(self):
+        """Set up a breaker that opens after two failures."""
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    def _open(self):
+        for _ in range(2):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_opens_after_consecutive_failures(self):
+        """Test that the threshold of consecutive failures opens the breaker."""
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+        self.breaker.record_failure()
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert self.breaker.opens == 1
+
+    def test_open_breaker_rejects_with_retry_hint(self):
+        """Test that calls fail fast while open, saying when to retry."""
+        self._open()
+
+        with pytest.raises(CircuitOpenError) as excinfo:
+            self.breaker.before_call()
+
+        assert 29 < excinfo.value.retry_after <= 30
+        assert isinstance(excinfo.value, requests.exceptions.RequestException)
+        assert self.breaker.rejected == 1
+
+    def test_half_open_allows_one_trial(self):
+        """Test that after the reset timeout one trial call goes through and the rest are rejected."""
+        self._open()
+
+        with patch('heidi_todoist.resilience.time.monotonic', return_value=time.monotonic() + 31):
+            self.breaker.before_call()
+            assert self.breaker.state == CircuitBreaker.HALF_OPEN
+            with pytest.raises(CircuitOpenError):
+                self.breaker.before_call()
+
+    def test_trial_success_closes(self):
+        """Test that a successful trial closes the breaker."""
+        self._open()
+
+        with patch('heidi_todoist.resilience.time.monotonic', return_value=time.monotonic() + 31):
+            self.breaker.before_call()
+        self.breaker.record_success()
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+        assert self.breaker.failures == 0
+        self.breaker.before_call()
+
+    def test_trial_failure_reopens(self):
+        """Test that a failed trial reopens the breaker for another reset timeout."""
+        self._open()
+
+        with patch('heidi_todoist.resilience.time.monotonic', return_value=time.monotonic() + 31):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+        assert self.breaker.opens == 2
+
+    def test_released_trial_can_be_retried(self):
+        """Test that a trial that never reached Todoist frees the slot for the next call."""
+        self._open()
+
+        with patch('heidi_todoist.resilience.time.monotonic', return_value=time.monotonic() + 31):
+            self.breaker.before_call()
+            self.breaker.release()
+            self.breaker.before_call()
+
+    def test_stats(self):
+        """Test the state metrics."""
+        self._open()
+
+        stats = self.breaker.stats()
+
+        assert stats['state'] == 'open'
+        assert stats['failures'] == 2
+        assert stats['opens'] == 1
+        assert 29 < stats['retry_after'] <= 30
+
+    def test_todoist_breaker_shared_and_configured(self):
+        """Test that every caller in the process gets the same breaker, configured from settings."""
+        with patch.dict('os.environ', {'CIRCUIT_BREAKER_THRESHOLD': '3', 'CIRCUIT_BREAKER_RESET_TIMEOUT': '10'}):
+            breaker = todoist_breaker()
+
+        assert todoist_breaker() is breaker
+        assert breaker.failure_threshold == 3
+        assert breaker.reset_timeout == 10.0
@@ -0,0 +1,139 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from heidi_todoist.scheduler import DueRule, load_due_schedule
+
+
+class TestDueRule:
+    """Test cases for evaluating compiled due-time rules."""
+
+    def test_default_rule(self):
+        """Test the default rule is 4.5 hours later, not before 8:30am."""
+        rule = load_due_schedule(None).default
+
+        assert rule.next_due(datetime(2023, 1, 1, 10, 0)) == datetime(2023, 1, 1, 14, 30)
+        assert rule.next_due(datetime(2023, 1, 1, 2, 0)) == datetime(2023, 1, 1, 8, 30)
+        assert rule.next_due(datetime(2023, 1, 1, 3, 59)) == datetime(2023, 1, 1, 8, 30)
+
+    def test_keeps_timezone(self):
+        """Test that an aware local time stays in its timezone."""
+        tz = ZoneInfo('America/New_York')
+        rule = DueRule.compile({'interval': 2})
+
+        assert rule.next_due(datetime(2024, 1, 15, 12, 0, tzinfo=tz)).isoformat() == '2024-01-15T14:00:00-05:00'
+
+    def test_not_after_moves_to_next_morning(self):
+        """Test that a due time past the latest time of day moves to the next day's earliest."""
+        rule = DueRule.compile({'interval': 4, 'not_before': '08:00', 'not_after': '20:00'})
+
+        assert rule.next_due(datetime(2023, 1, 1, 19, 0)) == datetime(2023, 1, 2, 8, 0)
+        assert rule.next_due(datetime(2023, 1, 1, 16, 0)) == datetime(2023, 1, 1, 20, 0)
+
+    @pytest.mark.parametrize('now, expected', [
+        (datetime(2023, 1, 1, 20, 0), datetime(2023, 1, 2, 7, 0)),
+        (datetime(2023, 1, 1, 23, 0), datetime(2023, 1, 2, 7, 0)),
+        (datetime(2023, 1, 1, 15, 0), datetime(2023, 1, 1, 19, 0)),
+    ])
+    def test_quiet_hours_past_midnight(self, now, expected):
+        """Test that a due time in quiet hours that run past midnight moves to when they end."""
+        rule = DueRule.compile({'interval': 4, 'quiet_hours': '22:00-07:00'})
+
+        assert rule.next_due(now) == expected
+
+    def test_quiet_hours_within_a_day(self):
+        """Test quiet hours that start and end on the same day."""
+        rule = DueRule.compile({'interval': 1, 'quiet_hours': '12:00-13:30'})
+
+        assert rule.next_due(datetime(2023, 1, 1, 11, 15)) == datetime(2023, 1, 1, 13, 30)
+
+    def test_weekdays_skip_to_next_allowed_day(self):
+        """Test that a due time on an excluded weekday moves to the start of the next allowed one."""
+        rule = DueRule.compile({'interval': 24, 'not_before': '09:00', 'weekdays': ['mon', 'thursday']})
+
+        # Monday 2023-01-02 + 1 day is a Tuesday, so the task is next due Thursday morning
+        assert rule.next_due(datetime(2023, 1, 2, 10, 0)) == datetime(2023, 1, 5, 9, 0)
+
+    def test_adjustments_combine(self):
+        """Test that quiet hours, clamps and weekdays are all respected together."""
+        rule = DueRule.compile({
+            'interval': 3, 'not_before': '08:30', 'quiet_hours': '22:00-07:00', 'weekdays': ['mon', 'tue', 'wed', 'thu', 'fri']
+        })
+
+        # Friday 2023-01-06 at 21:00 + 3h lands in Saturday's quiet hours, so Monday 8:30am
+        assert rule.next_due(datetime(2023, 1, 6, 21, 0)) == datetime(2023, 1, 9, 8, 30)
+
+    @pytest.mark.parametrize('spec, message', [
+        ({}, 'interval must be a number of hours'),
+        ({'interval': 0}, 'interval must be positive'),
+        ({'interval': 1, 'not_before': '8am'}, 'not_before must be a time of day'),
+        ({'interval': 1, 'not_after': '25:00'}, 'not_after must be a time of day'),
+        ({'interval': 1, 'not_before': '20:00', 'not_after': '08:00'}, 'not_before must not be later than not_after'),
+        ({'interval': 1, 'quiet_hours': '22:00'}, 'quiet_hours must look like'),
+        ({'interval': 1, 'quiet_hours': '22:00-22:00'}, 'must not start and end at the same time'),
+        ({'interval': 1, 'weekdays': ['someday']}, 'weekdays must be names'),
+        ({'interval': 1, 'weekdays': []}, 'weekdays must not be empty'),
+        ({'interval': 1, 'every': 'day'}, 'unknown fields: every'),
+    ])
+    def test_invalid_rules(self, spec, message):
+        """Test that invalid rules are rejected when compiled."""
+        with pytest.raises(ValueError, match=message):
+            DueRule.compile(spec)
+
+
+class TestDueSchedule:
+    """Test cases for loading DUE_RULES and looking up rules by task name."""
+
+    def test_task_rules_inherit_from_default(self):
+        """Test that a task rule takes the fields it leaves out from the default."""
+        schedule = load_due_schedule(json.dumps({
+            'default': {'not_before': '09:00'},
+            'Feed': {'interval': 8}
+        }))
+
+        assert schedule.default.interval == timedelta(hours=4.5)
+        assert schedule.rule_for('Feed') == DueRule(timedelta(hours=8), not_before=9 * 60)
+        assert schedule.rule_for('Walk') is schedule.default
+        assert schedule.rule_for(None) is schedule.default
+
+    def test_null_clears_inherited_field(self):
+        """Test that a task rule can drop a time of day limit set on the default."""
+        schedule = load_due_schedule(json.dumps({'Meds': {'interval': 12, 'not_before': None}}))
+
+        assert schedule.next_due('Meds', datetime(2023, 1, 1, 18, 0)) == datetime(2023, 1, 2, 6, 0)
+
+    def test_loads_from_file(self, tmp_path):
+        """Test that DUE_RULES can name a JSON file."""
+        path = tmp_path / 'rules.json'
+        path.write_text(json.dumps({'Feed': {'interval': 6}}))
+
+        assert load_due_schedule(str(path)).rule_for('Feed').interval == timedelta(hours=6)
+
+    @pytest.mark.parametrize('value, message', [
+        ('{"Feed": ', 'DUE_RULES must be a JSON object'),
+        ('{"Feed": 6}', 'DUE_RULES must be a JSON object'),
+        ('/nonexistent/rules.json', 'DUE_RULES file /nonexistent/rules.json could not be read'),
+    ])
+    def test_invalid_config(self, value, message):
+        """Test that unreadable or malformed DUE_RULES is rejected."""
+        with pytest.raises(ValueError, match=message):
+            load_due_schedule(value)
+
+    def test_next_due_many(self):
+        """Test that a batch gets each task's own due time, evaluating shared rules once."""
+        schedule = load_due_schedule(json.dumps({'Feed': {'interval': 8}}))
+        now = datetime(2023, 1, 1, 10, 0)
+
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            calls = []
+            next_due = DueRule.next_due
+            monkeypatch.setattr(DueRule, 'next_due', lambda rule, now: calls.append(rule) or next_due(rule, now))
+
+            due_times = schedule.next_due_many(['Feed', 'Walk', 'Brush'], now)
+
+        assert due_times == {
+            'Feed': datetime(2023, 1, 1, 18, 0),
+            'Walk': datetime(2023, 1, 1, 14, 30),
+            'Brush': datetime(2023, 1, 1, 14, 30)
+        }
+        assert len(calls) == 2
@@ -1,9 +1,20 @@
 import os
+import threading
 import pytest
 from unittest.mock import Mock, patch
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from dataclasses import replace
 import requests
+from heidi_todoist.resilience import CircuitOpenError, RateLimitExceeded
+from heidi_todoist.scheduler import load_due_schedule
 from heidi_todoist.services import TodoistService
+from heidi_todoist.sync_api import format_due
+from heidi_todoist.timing import PhaseTimer
+
+
+def _projects(*project_ids):
+    """Return a single page of projects with the given ids, as get_projects does."""
+    return iter([[Mock(id=project_id) for project_id in project_ids]])
 
 
 class TestTodoistService:
@@ -17,6 +28,8 @@ class TestTodoistService:
                 self.mock_api = Mock()
                 mock_api_class.return_value = self.mock_api
                 self.service = TodoistService()
+                self.mock_api.get_projects.return_value = _projects("project123")
+                self.service.tasks = self.mock_api
 
     def test_init_with_token(self):
         """Test successful initialization with valid token."""
@@ -25,6 +38,42 @@ class TestTodoistService:
             assert service.api is not None
             assert service.logger is not None
 
+    def test_init_with_explicit_token_and_session(self):
+        """Test initialization with a token and shared session passed in."""
+        session = requests.Session()
+        with patch.dict(os.environ, {}, clear=True):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                service = TodoistService(token='explicit_token', session=session)
+
+                mock_api_class.assert_called_once_with('explicit_token', session=session)
+                assert service.token == 'explicit_token'
+                assert service.session is session
+
+    def test_session_shares_process_circuit_breaker(self):
+        """Test that every service's session is guarded by the same process-wide breaker."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            first = TodoistService()
+            second = TodoistService(token='other_token')
+
+        breaker = first.session.get_adapter('https://api.todoist.com/').breaker
+        assert breaker is not None
+        assert second.session.get_adapter('https://api.todoist.com/').breaker is breaker
+
+    def test_other_tokens_get_own_cache_files(self):
+        """Test that a tenant's token resolves projects and mirrors through its own cache files."""
+        environ = {'TODOIST_API_TOKEN': 'test_token', 'PROJECT_CACHE_PATH': '/tmp/projects.json',
+                   'TASK_MIRROR_PATH': '/tmp/mirror.json'}
+        with patch.dict(os.environ, environ, clear=True):
+            default = TodoistService()
+            tenant = TodoistService(token='other_token')
+
+        assert default.project_resolver.cache_path == '/tmp/projects.json'
+        assert default.mirror_path == '/tmp/mirror.json'
+        assert tenant.project_resolver.cache_path.startswith('/tmp/projects.')
+        assert tenant.project_resolver.cache_path.endswith('.json')
+        assert tenant.project_resolver.cache_path != default.project_resolver.cache_path
+        assert tenant.mirror_path not in (None, default.mirror_path)
+
     def test_init_without_token(self):
         """Test initialization fails without token."""
         with patch.dict(os.environ, {}, clear=True):
@@ -70,23 +119,43 @@ class TestTodoistService:
             expected = "2023-01-01T08:30:00"
             assert result == expected
 
-    def test_extract_project_id_with_dash(self):
-        """Test project ID extraction from formatted string."""
-        project_id = "heidi-6cvcJh2HrqCMxvcF"
-        result = self.service._extract_project_id(project_id)
-        assert result == "6cvcJh2HrqCMxvcF"
+    def test_calculate_next_due_time_from_requested_at(self):
+        """Test that a queued request's due time counts from when it was requested, in the local timezone."""
+        requested_at = datetime(2024, 1, 15, 17, 0, tzinfo=timezone.utc)
+
+        result = self.service._calculate_next_due_time(requested_at)
+
+        assert result == '2024-01-15T16:30:00-05:00'
+
+    def test_calculate_next_due_time_from_requested_at_overnight(self):
+        """Test that the 8:30am floor applies to a request queued late in the evening."""
+        requested_at = datetime(2024, 1, 16, 2, 0, tzinfo=timezone.utc)
+
+        result = self.service._calculate_next_due_time(requested_at)
+
+        assert result == '2024-01-16T08:30:00-05:00'
+
+    def testresolve_project_id_from_url_id(self):
+        """Test that the id portion of a project URL resolves to the API id."""
+        self.mock_api.get_projects.return_value = _projects("6cvcJh2HrqCMxvcF")
+
+        assert self.service.resolve_project_id("heidi-6cvcJh2HrqCMxvcF") == "6cvcJh2HrqCMxvcF"
+
+    def testresolve_project_id_is_cached(self):
+        """Test that projects are listed once however often the id is resolved."""
+        assert self.service.resolve_project_id("project123") == "project123"
+        assert self.service.resolve_project_id("project123") == "project123"
+
+        self.mock_api.get_projects.assert_called_once_with()
 
-    def test_extract_project_id_without_dash(self):
-        """Test project ID extraction from plain string."""
-        project_id = "12345"
-        result = self.service._extract_project_id(project_id)
-        assert result == "12345"
+    def test_unknown_project_fails_without_writing(self):
+        """Test that a project id matching no project fails before any task is touched."""
+        result = self.service.complete_and_recreate_task("heidi-doesnotexist", "Test Task")
 
-    def test_extract_project_id_multiple_dashes(self):
-        """Test project ID extraction with multiple dashes."""
-        project_id = "project-name-with-dashes-12345"
-        result = self.service._extract_project_id(project_id)
-        assert result == "12345"
+        assert result['success'] is False
+        assert result['error'] == 'Project heidi-doesnotexist not found among 1 Todoist projects'
+        self.mock_api.get_tasks.assert_not_called()
+        self.mock_api.add_task.assert_not_called()
 
     @patch('heidi_todoist.services.datetime')
     def test_complete_and_recreate_task_success_existing_task(self, mock_datetime):
@@ -200,6 +269,38 @@ class TestTodoistService:
         assert result['completed_task_id'] is None
         assert result['created_task_id'] is None
 
+    def test_complete_and_recreate_task_rate_limited(self):
+        """Test that a 429 that outlasted the retries reports how long to wait."""
+        rate_limited = requests.exceptions.HTTPError("Too Many Requests")
+        rate_limited.response = Mock(status_code=429, headers={'Retry-After': '12'})
+        self.mock_api.get_tasks.side_effect = rate_limited
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is False
+        assert result['error'] == 'Rate limited by Todoist: Too Many Requests'
+        assert result['retry_after'] == 12.0
+
+    def test_complete_and_recreate_task_local_rate_limit(self):
+        """Test that the client-side limiter turning a request away reports how long to wait."""
+        self.mock_api.get_tasks.side_effect = RateLimitExceeded(20.5)
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is False
+        assert result['retry_after'] == 20.5
+        assert 'retry after 21 seconds' in result['error']
+
+    def test_complete_and_recreate_task_circuit_open(self):
+        """Test that an open circuit breaker is reported with a retry hint."""
+        self.mock_api.get_tasks.side_effect = CircuitOpenError(12.0)
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is False
+        assert result['circuit_open'] is True
+        assert result['retry_after'] == 12.0
+
     def test_complete_and_recreate_task_request_exception(self):
         """Test handling of general request exceptions."""
         # Mock general request exception
@@ -256,8 +357,8 @@ class TestTodoistService:
         assert result['new_task_id'] == "new_task456"
 
     @patch('heidi_todoist.services.datetime')
-    def test_complete_and_recreate_task_calls_extract_project_id(self, mock_datetime):
-        """Test that project ID extraction is called properly."""
+    def test_complete_and_recreate_task_callsresolve_project_id(self, mock_datetime):
+        """Test that the resolved project ID is used."""
         # Mock datetime
         mock_now = datetime(2023, 1, 1, 10, 0, 0)
         mock_datetime.now.return_value = mock_now
@@ -270,14 +371,817 @@ class TestTodoistService:
         mock_new_task.id = "new_task456"
         self.mock_api.add_task.return_value = mock_new_task
 
-        # Spy on the extract method
-        with patch.object(self.service, '_extract_project_id', return_value='extracted123') as mock_extract:
+        # Spy on the resolve method
+        with patch.object(self.service, 'resolve_project_id', return_value='extracted123') as mock_resolve:
             result = self.service.complete_and_recreate_task("original-project-123", "Test Task")
 
-            mock_extract.assert_called_once_with("original-project-123")
+            mock_resolve.assert_called_once_with("original-project-123")
 
-            # Verify the extracted project_id was used
+            # Verify the resolved project_id was used
             self.mock_api.get_tasks.assert_called_once_with(project_id='extracted123')
             self.mock_api.add_task.assert_called_once()
             add_task_call = self.mock_api.add_task.call_args
-            assert add_task_call.kwargs['project_id'] == 'extracted123'
\ No newline at end of file
+            assert add_task_call.kwargs['project_id'] == 'extracted123'
+
+class TestTodoistServiceTaskIndex:
+    """Test cases for the cached task name -> id index in TodoistService."""
+
+    def setup_method(self):
+        """Set up a service with a mocked API."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                self.mock_api = Mock()
+                mock_api_class.return_value = self.mock_api
+                self.service = TodoistService()
+                self.mock_api.get_projects.return_value = _projects("project123")
+                self.service.tasks = self.mock_api
+
+        mock_task = Mock()
+        mock_task.content = "Test Task"
+        mock_task.id = "task123"
+        mock_task.due = "2023-01-01T14:30:00"
+        self.mock_api.get_tasks.side_effect = lambda **kwargs: iter([[mock_task]])
+        self.mock_api.complete_task.return_value = True
+        self.mock_api.add_task.return_value = Mock(id="new_task456")
+
+    @staticmethod
+    def _not_found_error():
+        mock_response = Mock()
+        mock_response.status_code = 404
+        http_error = requests.exceptions.HTTPError("Not Found")
+        http_error.response = mock_response
+        return http_error
+
+    def test_second_request_served_from_index(self):
+        """Test that a warm index skips the project listing entirely."""
+        self.service.complete_and_recreate_task("project123", "Test Task")
+        self.mock_api.add_task.return_value = Mock(id="new_task789")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert self.mock_api.get_tasks.call_count == 1
+        assert result['completed_task_id'] == "new_task456"
+        assert result['new_task_id'] == "new_task789"
+        self.mock_api.complete_task.assert_called_with(task_id="new_task456")
+
+    def test_shared_index_serves_other_worker_process(self, tmp_path):
+        """Test that with TASK_CACHE_PATH a project listed by one worker's service is a hit for another."""
+        environ = {'TODOIST_API_TOKEN': 'test_token', 'TASK_CACHE_PATH': str(tmp_path / 'tasks.db')}
+        with patch.dict(os.environ, environ, clear=True):
+            with patch('heidi_todoist.services.TodoistAPI', return_value=self.mock_api):
+                first, second = TodoistService(), TodoistService()
+        first.tasks = second.tasks = self.mock_api
+        self.mock_api.get_projects.side_effect = lambda: _projects("project123")
+
+        first.complete_and_recreate_task("project123", "Test Task")
+        self.mock_api.add_task.return_value = Mock(id="new_task789")
+        second.complete_and_recreate_task("project123", "Test Task")
+
+        assert self.mock_api.get_tasks.call_count == 1
+        self.mock_api.complete_task.assert_called_with(task_id="new_task456")
+        assert second.task_index.stats()['hits'] == 1
+
+    def test_next_due_lists_once_then_served_from_index(self):
+        """Test that the first next-due read lists the project and later ones never leave the process."""
+        first = self.service.next_due("project123", "Test Task", 300)
+        second = self.service.next_due("project123", "Test Task", 300)
+
+        assert first == {'success': True, 'task_name': 'Test Task', 'task_id': 'task123',
+                         'due': '2023-01-01T14:30:00', 'cached': False, 'age': 0.0}
+        assert second['cached'] is True
+        assert second['due'] == '2023-01-01T14:30:00'
+        assert self.mock_api.get_tasks.call_count == 1
+
+    def test_next_due_reflects_completion(self):
+        """Test that the recreated task's id and due time are served without another listing."""
+        with patch.object(self.service, '_calculate_next_due_time', return_value='2023-01-01T19:00:00'):
+            self.service.complete_and_recreate_task("project123", "Test Task")
+
+        result = self.service.next_due("project123", "Test Task", 300)
+
+        assert (result['task_id'], result['due'], result['cached']) == ('new_task456', '2023-01-01T19:00:00', True)
+        assert self.mock_api.get_tasks.call_count == 1
+
+    def test_next_due_written_through_in_todoist_format(self):
+        """Test that a local due time written through after an add is cached as Todoist lists it, in UTC."""
+        with patch.object(self.service, '_calculate_next_due_time', return_value='2023-01-01T14:30:00-05:00'):
+            self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert self.service.next_due("project123", "Test Task", 300)['due'] == '2023-01-01T19:30:00Z'
+
+    def test_next_due_older_than_max_age_relists(self):
+        """Test that an index older than the caller accepts is read again."""
+        self.service.next_due("project123", "Test Task", 300)
+
+        result = self.service.next_due("project123", "Test Task", 0)
+
+        assert result['cached'] is False
+        assert self.mock_api.get_tasks.call_count == 2
+
+    def test_next_due_not_found(self):
+        """Test that a name with no open task is reported as not found."""
+        result = self.service.next_due("project123", "Other Task", 300)
+
+        assert result['success'] is False
+        assert result['error'] == 'Task "Other Task" not found in project'
+
+    def test_next_due_circuit_open(self):
+        """Test that a miss while Todoist is failing fast reports when to retry."""
+        self.mock_api.get_tasks.side_effect = CircuitOpenError(12.0)
+
+        result = self.service.next_due("project123", "Test Task", 300)
+
+        assert result['circuit_open'] is True
+        assert result['retry_after'] == 12.0
+
+    def test_next_due_errors(self):
+        """Test that a miss Todoist could not answer reports the same errors as completing a task."""
+        rate_limited = requests.exceptions.HTTPError("Too Many Requests")
+        rate_limited.response = Mock(status_code=429, headers={'Retry-After': '7'})
+        server_error = requests.exceptions.HTTPError("Bad Gateway")
+        server_error.response = Mock(status_code=502)
+        errors = [rate_limited, server_error, RateLimitExceeded(20.5),
+                  requests.exceptions.ConnectionError("Network error")]
+        self.mock_api.get_tasks.side_effect = errors
+
+        results = [self.service.next_due("project123", "Test Task", 300) for _ in errors]
+
+        assert results == [
+            {'success': False, 'error': 'Rate limited by Todoist: Too Many Requests', 'retry_after': 7.0},
+            {'success': False, 'error': 'API error: Bad Gateway'},
+            {'success': False, 'error': str(RateLimitExceeded(20.5)), 'retry_after': 20.5},
+            {'success': False, 'error': 'API request error: Network error'},
+        ]
+
+    def test_index_remembers_absent_task(self):
+        """Test that a fresh index that lacks the task skips the close."""
+        self.service.task_index.replace("project123", {})
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        self.mock_api.get_tasks.assert_not_called()
+        self.mock_api.complete_task.assert_not_called()
+        assert result['success'] is True
+        assert self.service.task_index.lookup("project123", "Test Task") == (True, "new_task456")
+
+    def test_stale_id_refreshes_and_retries(self):
+        """Test that a 404 on close refreshes the index and closes the current id."""
+        self.service.task_index.replace("project123", {"Test Task": "stale999"})
+        self.mock_api.complete_task.side_effect = [self._not_found_error(), True]
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+        assert result['completed_task_id'] == "task123"
+        assert self.mock_api.get_tasks.call_count == 1
+        self.mock_api.complete_task.assert_called_with(task_id="task123")
+
+    def test_stale_id_and_task_gone(self):
+        """Test that a stale id whose task no longer exists just creates the new task."""
+        self.service.task_index.replace("project123", {"Test Task": "stale999"})
+        self.mock_api.get_tasks.side_effect = lambda **kwargs: iter([[]])
+        self.mock_api.complete_task.side_effect = self._not_found_error()
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+        assert 'completed_task_id' not in result
+        assert self.mock_api.complete_task.call_count == 1
+
+    def test_non_404_close_error_is_not_retried(self):
+        """Test that other HTTP errors on close propagate to the error handler."""
+        self.service.task_index.replace("project123", {"Test Task": "task123"})
+        mock_response = Mock()
+        mock_response.status_code = 500
+        http_error = requests.exceptions.HTTPError("Internal Server Error")
+        http_error.response = mock_response
+        self.mock_api.complete_task.side_effect = http_error
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is False
+        assert "API error" in result['error']
+        self.mock_api.get_tasks.assert_not_called()
+
+    def test_failed_close_invalidates_index(self):
+        """Test that an unsuccessful close forces a fresh listing next time."""
+        self.service.task_index.replace("project123", {"Test Task": "task123"})
+        self.mock_api.complete_task.return_value = False
+
+        self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert self.service.task_index.is_fresh("project123") is False
+
+
+class TestTodoistServiceLookupModes:
+    """Test cases for the selectable task lookup modes."""
+
+    def setup_method(self):
+        """Set up a service with a mocked API."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                self.mock_api = Mock()
+                mock_api_class.return_value = self.mock_api
+                self.service = TodoistService()
+                self.mock_api.get_projects.return_value = _projects("project123")
+                self.service.tasks = self.mock_api
+
+        self.mock_api.complete_task.return_value = True
+        self.mock_api.add_task.return_value = Mock(id="new_task456")
+
+    @staticmethod
+    def _task(task_id, content, project_id="project123"):
+        task = Mock()
+        task.id = task_id
+        task.content = content
+        task.project_id = project_id
+        return task
+
+    def test_invalid_lookup_mode(self):
+        """Test that an unknown TASK_LOOKUP_MODE is rejected at construction."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token', 'TASK_LOOKUP_MODE': 'bogus'}):
+            with pytest.raises(ValueError, match='TASK_LOOKUP_MODE must be one of'):
+                TodoistService()
+
+    def test_lookup_mode_from_environment(self):
+        """Test that TASK_LOOKUP_MODE selects the default mode."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token', 'TASK_LOOKUP_MODE': 'filter'}):
+            service = TodoistService()
+        assert service.lookup_mode == 'filter'
+
+    def test_scan_mode_stops_at_first_match(self):
+        """Test that scan mode pages only until the task is found and bypasses the index."""
+        pages = iter([[self._task("other1", "Other")], [self._task("task123", "Test Task")], [self._task("x", "X")]])
+        self.mock_api.get_tasks.return_value = pages
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task", lookup_mode='scan')
+
+        assert result['completed_task_id'] == "task123"
+        assert next(pages)[0].id == "x"
+        assert self.service.task_index.is_fresh("project123") is False
+
+    def test_scan_mode_records_pages_and_tasks_scanned(self):
+        """Test that the lookup phase, pages fetched and tasks scanned land on the invocation's timer."""
+        self.mock_api.get_tasks.return_value = iter([[self._task("other1", "Other")], [self._task("task123", "Test Task")]])
+
+        with PhaseTimer() as timer:
+            self.service.complete_and_recreate_task("project123", "Test Task", lookup_mode='scan')
+
+        assert timer.counters == {'pages': 2, 'tasks_scanned': 2}
+        assert {'lookup', 'close', 'due', 'add'} <= timer.phases.keys()
+
+    def test_scan_mode_no_match(self):
+        """Test that scan mode reports no task when none matches."""
+        self.mock_api.get_tasks.return_value = iter([[self._task("other1", "Other")]])
+
+        assert self.service._find_task_id("project123", "Test Task", 'scan') is None
+
+    def test_filter_mode_builds_scoped_query(self):
+        """Test that filter mode scopes the query to the project and verifies the exact match."""
+        self.mock_api.get_project.return_value = Mock()
+        self.mock_api.get_project.return_value.name = "Heidi"
+        self.mock_api.filter_tasks.return_value = iter([[
+            self._task("sub1", "Test Task (extra)"),
+            self._task("elsewhere", "Test Task", project_id="other"),
+            self._task("task123", "Test Task"),
+        ]])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task", lookup_mode='filter')
+
+        assert result['completed_task_id'] == "task123"
+        self.mock_api.filter_tasks.assert_called_once_with(query='#Heidi & search: Test Task')
+        self.mock_api.get_tasks.assert_not_called()
+
+    def test_filter_mode_no_match_caches_project_name(self):
+        """Test that the project name is fetched once across filter lookups."""
+        self.mock_api.get_project.return_value = Mock()
+        self.mock_api.get_project.return_value.name = "Heidi"
+        self.mock_api.filter_tasks.side_effect = lambda **kwargs: iter([[]])
+
+        assert self.service._find_task_id("project123", "Test Task", 'filter') is None
+        assert self.service._find_task_id("project123", "Test Task", 'filter') is None
+
+        self.mock_api.get_project.assert_called_once_with("project123")
+
+    def test_mirror_mode_pulls_delta_each_time(self):
+        """Test that mirror mode resolves from the mirror and loads it into the index."""
+        self.service.sync = Mock()
+        self.service.sync.sync.return_value = {
+            'full_sync': True, 'sync_token': 't1',
+            'items': [{'id': 'task123', 'content': 'Test Task', 'project_id': 'project123'}]
+        }
+
+        assert self.service._find_task_id("project123", "Test Task", 'mirror') == "task123"
+        self.service.sync.sync.return_value = {'sync_token': 't2', 'items': []}
+        assert self.service._find_task_id("project123", "Test Task", 'mirror') == "task123"
+
+        assert self.service.sync.sync.call_count == 2
+        assert self.service.task_index.lookup("project123", "Test Task") == (True, "task123")
+        assert self.service.mirror_stats()["project123"]['deltas'] == 2
+        self.mock_api.get_tasks.assert_not_called()
+
+    def test_mirror_mode_interval_uses_index(self):
+        """Test that deltas are skipped within TASK_MIRROR_INTERVAL."""
+        self.service.mirror_interval = 60
+        self.service.sync = Mock()
+        self.service.sync.sync.return_value = {'full_sync': True, 'sync_token': 't1', 'items': []}
+
+        self.service._find_task_id("project123", "Test Task", 'mirror')
+        self.service.task_index.put("project123", "Test Task", "new456")
+
+        assert self.service._find_task_id("project123", "Test Task", 'mirror') == "new456"
+        assert self.service.sync.sync.call_count == 1
+
+    def test_refresh_project_mirror_skips_empty_delta(self):
+        """Test that a refresh with an empty mirror delta leaves a fresh index alone."""
+        self.service.lookup_mode = 'mirror'
+        self.service.sync = Mock()
+        self.service.sync.sync.return_value = {
+            'full_sync': True, 'sync_token': 't1',
+            'items': [{'id': 'task123', 'content': 'Test Task', 'project_id': 'project123'}]
+        }
+
+        first = self.service.refresh_project("project123")
+        self.service.task_index.put("project123", "Written Through", "new456")
+        self.service.sync.sync.return_value = {'sync_token': 't2', 'items': []}
+        second = self.service.refresh_project("project123")
+
+        assert first == {'project_id': 'project123', 'lookup_mode': 'mirror', 'refreshed': True, 'changes': 1}
+        assert second == {'project_id': 'project123', 'lookup_mode': 'mirror', 'refreshed': False, 'changes': 0}
+        assert self.service.task_index.lookup("project123", "Written Through") == (True, "new456")
+
+    def test_refresh_project_index_relists_past_half_ttl(self):
+        """Test that index mode only re-lists the project once the index is past half its TTL."""
+        self.mock_api.get_tasks.side_effect = lambda **kwargs: iter([[self._task("task123", "Test Task")]])
+
+        with patch('heidi_todoist.cache.time.monotonic', return_value=1000.0):
+            assert self.service.refresh_project("project123")['refreshed'] is True
+        with patch('heidi_todoist.cache.time.monotonic', return_value=1100.0):
+            assert self.service.refresh_project("project123")['refreshed'] is False
+        with patch('heidi_todoist.cache.time.monotonic', return_value=1200.0):
+            assert self.service.refresh_project("project123")['refreshed'] is True
+
+        assert self.mock_api.get_tasks.call_count == 2
+
+    def test_refresh_project_scan_caches_nothing(self):
+        """Test that scan mode only resolves the project."""
+        self.service.lookup_mode = 'scan'
+
+        assert self.service.refresh_project("project123") == {
+            'project_id': 'project123', 'lookup_mode': 'scan', 'refreshed': False
+        }
+        self.mock_api.get_tasks.assert_not_called()
+
+    def test_escape_filter(self):
+        """Test that filter query operators in names are escaped."""
+        assert self.service._escape_filter('Feed (wet) & water!') == 'Feed \\(wet\\) \\& water\\!'
+
+
+class TestTodoistServiceBatch:
+    """Test cases for completing several tasks in one Sync API request."""
+
+    def setup_method(self):
+        """Set up a service with mocked REST and Sync clients."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                self.mock_api = Mock()
+                mock_api_class.return_value = self.mock_api
+                self.service = TodoistService()
+                self.mock_api.get_projects.return_value = _projects("project123")
+                self.service.tasks = self.mock_api
+
+        self.service.sync = Mock()
+        self.service.task_index.replace("project123", {"Feed": "task1", "Walk": "task2"})
+        self.service._local_now = Mock(return_value=datetime(2023, 1, 1, 10, 0, 0))
+
+    def _respond(self, statuses):
+        """Make the mocked Sync API answer each command in order with the given statuses."""
+        def execute(commands):
+            self.commands = commands
+            return {
+                'sync_status': {command['uuid']: status for command, status in zip(commands, statuses)},
+                'temp_id_mapping': {
+                    command['temp_id']: f"new_{command['args']['content']}"
+                    for command in commands if 'temp_id' in command
+                }
+            }
+        self.service.sync.execute.side_effect = execute
+
+    def test_all_succeed_in_one_request(self):
+        """Test closes and adds for every name are sent as one batch."""
+        self._respond(['ok', 'ok', 'ok', 'ok', 'ok'])
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed", "Walk", "Brush"])
+
+        self.service.sync.execute.assert_called_once()
+        assert [command['type'] for command in self.commands] == [
+            'item_close', 'item_add', 'item_close', 'item_add', 'item_add'
+        ]
+        assert result['success'] is True
+        assert result['succeeded'] == 3
+        assert result['results'][0] == {
+            'task_name': 'Feed',
+            'success': True,
+            'completed_task_id': 'task1',
+            'new_task_id': 'new_Feed',
+            'new_due_time': '2023-01-01T14:30:00'
+        }
+        assert 'completed_task_id' not in result['results'][2]
+        self.mock_api.get_tasks.assert_not_called()
+        assert self.service.task_index.lookup("project123", "Brush") == (True, "new_Brush")
+
+    def test_oversized_batch_rejected(self):
+        """Test that a batch too large for one Sync API request is refused before any call."""
+        result = self.service.complete_and_recreate_tasks("project123", [f"Task {number}" for number in range(51)])
+
+        assert result == {'success': False, 'error': 'At most 50 tasks can be completed in one batch', 'results': []}
+        self.service.sync.execute.assert_not_called()
+
+    def test_partial_failure(self):
+        """Test that per-item command errors are reported without failing the batch."""
+        self._respond(['ok', 'ok', {'error': 'Item not found'}, 'ok'])
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed", "Walk"])
+
+        assert result['success'] is False
+        assert result['succeeded'] == 1
+        assert result['failed'] == 1
+        assert result['results'][1]['success'] is False
+        assert 'Item not found' in result['results'][1]['error']
+        assert result['results'][1]['new_task_id'] == 'new_Walk'
+        assert self.service.task_index.is_fresh("project123") is False
+
+    def test_add_failure(self):
+        """Test that a failed add is reported for its item."""
+        self._respond([{'error': 'Invalid due'}])
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Brush"])
+
+        assert result['success'] is False
+        assert result['results'][0]['error'] == 'Failed to create new task: Invalid due'
+
+    def test_duplicate_names_collapsed(self):
+        """Test that a repeated name is only closed and recreated once."""
+        self._respond(['ok', 'ok'])
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed", "Feed"])
+
+        assert len(self.commands) == 2
+        assert len(result['results']) == 1
+
+    def test_stale_index_reads_project_once(self):
+        """Test that a stale index is refreshed with a single project listing."""
+        self.service.task_index.invalidate()
+        task = Mock()
+        task.content = "Feed"
+        task.id = "task9"
+        self.mock_api.get_tasks.return_value = iter([[task]])
+        self._respond(['ok', 'ok', 'ok'])
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed", "Walk"])
+
+        self.mock_api.get_tasks.assert_called_once_with(project_id="project123")
+        assert result['results'][0]['completed_task_id'] == "task9"
+
+    def test_due_times_follow_each_tasks_rule(self):
+        """Test that every task in a batch is due according to its own rule."""
+        self.service.settings = replace(
+            self.service.settings, due_schedule=load_due_schedule('{"Walk": {"interval": 8}}')
+        )
+        self._respond(['ok', 'ok', 'ok', 'ok'])
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed", "Walk"])
+
+        assert [item['new_due_time'] for item in result['results']] == [
+            '2023-01-01T14:30:00', '2023-01-01T18:00:00'
+        ]
+        assert [command['args']['due'] for command in self.commands if command['type'] == 'item_add'] == [
+            format_due('2023-01-01T14:30:00'), format_due('2023-01-01T18:00:00')
+        ]
+
+    @pytest.mark.parametrize('error, message', [
+        (requests.exceptions.HTTPError('Bad Gateway'), 'API error: Bad Gateway'),
+        (requests.exceptions.ConnectionError('Network error'), 'API request error: Network error'),
+        (Exception('Unexpected error'), 'Unexpected error'),
+    ])
+    def test_request_errors(self, error, message):
+        """Test that a failed Sync API request fails every item."""
+        self.service.sync.execute.side_effect = error
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed"])
+
+        assert result == {'success': False, 'error': message, 'results': []}
+
+    def test_circuit_open(self):
+        """Test that an open circuit breaker fails the batch with a retry hint."""
+        self.service.sync.execute.side_effect = CircuitOpenError(5.0)
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed"])
+
+        assert result['circuit_open'] is True
+        assert result['retry_after'] == 5.0
+        assert result['results'] == []
+
+
+    def test_rate_limited(self):
+        """Test that a 429 from Todoist fails the batch with Todoist's Retry-After."""
+        rate_limited = requests.exceptions.HTTPError("Too Many Requests")
+        rate_limited.response = Mock(status_code=429, headers={'Retry-After': '9'})
+        self.service.sync.execute.side_effect = rate_limited
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed"])
+
+        assert result == {'success': False, 'error': 'Rate limited by Todoist: Too Many Requests',
+                          'retry_after': 9.0, 'results': []}
+
+    def test_local_rate_limit(self):
+        """Test that the client-side limiter turning the batch away reports how long to wait."""
+        self.service.sync.execute.side_effect = RateLimitExceeded(20.5)
+
+        result = self.service.complete_and_recreate_tasks("project123", ["Feed"])
+
+        assert result['retry_after'] == 20.5
+        assert result['results'] == []
+
+class TestTodoistServiceSyncWriteMode:
+    """Test cases for the single round-trip Sync API write mode."""
+
+    def setup_method(self):
+        """Set up a service in sync write mode with a mocked Sync client."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token', 'TASK_WRITE_MODE': 'sync'}):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                self.mock_api = Mock()
+                mock_api_class.return_value = self.mock_api
+                self.service = TodoistService()
+                self.mock_api.get_projects.return_value = _projects("project123")
+                self.service.tasks = self.mock_api
+
+        self.service.sync = Mock()
+        self.service.task_index.replace("project123", {"Test Task": "task123"})
+        self.service._calculate_next_due_time = Mock(return_value="2023-01-01T14:30:00")
+
+    def _respond(self, statuses):
+        def execute(commands):
+            self.commands = commands
+            return {
+                'sync_status': {command['uuid']: status for command, status in zip(commands, statuses)},
+                'temp_id_mapping': {command['temp_id']: "new_task456" for command in commands if 'temp_id' in command}
+            }
+        self.service.sync.execute.side_effect = execute
+
+    def test_invalid_write_mode(self):
+        """Test that an unknown TASK_WRITE_MODE is rejected at construction."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token', 'TASK_WRITE_MODE': 'bogus'}):
+            with pytest.raises(ValueError, match='TASK_WRITE_MODE must be one of'):
+                TodoistService()
+
+    def test_close_and_add_in_one_request(self):
+        """Test that both writes go out as one Sync API request with the usual response shape."""
+        self._respond(['ok', 'ok'])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        self.service.sync.execute.assert_called_once()
+        assert [command['type'] for command in self.commands] == ['item_close', 'item_add']
+        self.mock_api.complete_task.assert_not_called()
+        self.mock_api.add_task.assert_not_called()
+        assert result == {
+            'success': True,
+            'message': 'Task "Test Task" completed and recreated',
+            'new_task_id': 'new_task456',
+            'new_due_time': '2023-01-01T14:30:00',
+            'completed_task_id': 'task123'
+        }
+        assert self.service.task_index.lookup("project123", "Test Task") == (True, "new_task456")
+
+    def test_no_existing_task_sends_only_add(self):
+        """Test that only item_add is sent when nothing matches."""
+        self._respond(['ok'])
+
+        result = self.service.complete_and_recreate_task("project123", "New Task")
+
+        assert [command['type'] for command in self.commands] == ['item_add']
+        assert 'completed_task_id' not in result
+        assert "no existing task found" in result['message']
+
+    def _respond_in_turn(self, *statuses):
+        responses = iter(statuses)
+        self.requests = []
+
+        def execute(commands):
+            self.requests.append(commands)
+            return {
+                'sync_status': {command['uuid']: status for command, status in zip(commands, next(responses))},
+                'temp_id_mapping': {command['temp_id']: "new_task456" for command in commands if 'temp_id' in command}
+            }
+        self.service.sync.execute.side_effect = execute
+
+    def test_stale_close_resent_for_current_id(self):
+        """Test that a close rejected for a stale id is resent for the current id, skipping the new task."""
+        self._respond_in_turn([{'error': 'Item not found'}, 'ok'], ['ok'])
+        self.mock_api.get_tasks.return_value = iter([[
+            Mock(id="new_task456", content="Test Task"), Mock(id="task999", content="Test Task")
+        ]])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+        assert result['completed_task_id'] == "task999"
+        assert result['new_task_id'] == "new_task456"
+        assert [command['type'] for command in self.requests[1]] == ['item_close']
+        assert self.requests[1][0]['args'] == {'id': 'task999'}
+        assert self.service.task_index.lookup("project123", "Test Task") == (False, None)
+
+    def test_stale_close_with_nothing_left_to_close(self):
+        """Test that a stale id whose task is gone is treated as nothing to complete."""
+        self._respond_in_turn([{'error': 'Item not found'}, 'ok'])
+        self.mock_api.get_tasks.return_value = iter([[Mock(id="new_task456", content="Test Task")]])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+        assert 'completed_task_id' not in result
+        assert result['new_task_id'] == "new_task456"
+        assert len(self.requests) == 1
+
+    def test_close_rejected_for_current_id(self):
+        """Test that a close rejected for the task's current id is reported, not resent."""
+        self._respond_in_turn([{'error': 'Forbidden'}, 'ok'])
+        self.mock_api.get_tasks.return_value = iter([[Mock(id="task123", content="Test Task")]])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result == {
+            'success': False,
+            'error': 'Failed to complete existing task: Forbidden',
+            'completed_task_id': None,
+            'created_task_id': 'new_task456'
+        }
+        assert len(self.requests) == 1
+
+    def test_resent_close_rejected(self):
+        """Test that a resent close that is rejected too is reported."""
+        self._respond_in_turn([{'error': 'Item not found'}, 'ok'], [{'error': 'Forbidden'}])
+        self.mock_api.get_tasks.return_value = iter([[], [Mock(id="task999", content="Test Task")]])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is False
+        assert result['error'] == 'Failed to complete existing task: Forbidden'
+        assert result['created_task_id'] == "new_task456"
+
+    def test_add_rejected(self):
+        """Test that a rejected add is reported with the completed id."""
+        self._respond(['ok', {'error': 'Invalid due'}])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result == {
+            'success': False,
+            'error': 'Failed to create new task: Invalid due',
+            'completed_task_id': 'task123',
+            'created_task_id': None
+        }
+
+    def test_write_mode_argument_overrides_default(self):
+        """Test that write_mode can be chosen per call."""
+        self.mock_api.complete_task.return_value = True
+        self.mock_api.add_task.return_value = Mock(id="rest456")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task", write_mode='rest')
+
+        self.service.sync.execute.assert_not_called()
+        assert result['new_task_id'] == "rest456"
+
+
+class TestTodoistServiceParallelWriteMode:
+    """Test cases for issuing the close and the add concurrently."""
+
+    def setup_method(self):
+        """Set up a service in parallel write mode."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token', 'TASK_WRITE_MODE': 'parallel'}):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                self.mock_api = Mock()
+                mock_api_class.return_value = self.mock_api
+                self.service = TodoistService()
+                self.mock_api.get_projects.return_value = _projects("project123")
+                self.service.tasks = self.mock_api
+
+        self.service.task_index.replace("project123", {"Test Task": "task123"})
+        self.service._calculate_next_due_time = Mock(return_value="2023-01-01T14:30:00")
+        self.mock_api.complete_task.return_value = True
+        self.mock_api.add_task.return_value = Mock(id="new_task456")
+
+    def test_both_writes_succeed(self):
+        """Test the normal response shape and index state when both writes succeed."""
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+        assert result['completed_task_id'] == "task123"
+        assert result['new_task_id'] == "new_task456"
+        assert self.service.task_index.lookup("project123", "Test Task") == (True, "new_task456")
+
+    def test_writes_timed_from_executor_threads(self):
+        """Test that the close and add run on the write executor still record onto the caller's timer."""
+        with PhaseTimer() as timer:
+            self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert {'close', 'add'} <= timer.phases.keys()
+
+    def test_writes_overlap(self):
+        """Test that the add is issued before the close returns."""
+        add_started = threading.Event()
+
+        def complete_task(task_id):
+            assert add_started.wait(timeout=5)
+            return True
+
+        def add_task(**kwargs):
+            add_started.set()
+            return Mock(id="new_task456")
+
+        self.mock_api.complete_task.side_effect = complete_task
+        self.mock_api.add_task.side_effect = add_task
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+
+    def test_no_existing_task(self):
+        """Test that only the add runs when nothing matches."""
+        result = self.service.complete_and_recreate_task("project123", "New Task")
+
+        self.mock_api.complete_task.assert_not_called()
+        assert 'completed_task_id' not in result
+
+    def test_stale_id_not_retried(self):
+        """Test that a 404 on close never re-lists, which could find and close the concurrent replacement."""
+        not_found = requests.exceptions.HTTPError("Not Found")
+        not_found.response = Mock(status_code=404)
+        self.mock_api.complete_task.side_effect = not_found
+        replacement = Mock(id="new_task456", content="Test Task", due=None)
+        self.mock_api.get_tasks.side_effect = lambda **kwargs: iter([[replacement]])
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is True
+        assert result['new_task_id'] == "new_task456"
+        assert 'completed_task_id' not in result
+        self.mock_api.complete_task.assert_called_once_with(task_id="task123")
+        self.mock_api.get_tasks.assert_not_called()
+        self.mock_api.delete_task.assert_not_called()
+
+    def test_close_fails_deletes_new_task(self):
+        """Test that a failed close deletes the concurrently created task."""
+        self.mock_api.complete_task.side_effect = requests.exceptions.ConnectionError("Network error")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        self.mock_api.delete_task.assert_called_once_with(task_id="new_task456")
+        assert result == {
+            'success': False,
+            'error': 'API request error: Network error',
+            'completed_task_id': None,
+            'created_task_id': None
+        }
+        assert self.service.task_index.is_fresh("project123") is False
+
+    def test_close_fails_and_delete_fails(self):
+        """Test that an undeletable new task is still reported."""
+        self.mock_api.complete_task.side_effect = requests.exceptions.ConnectionError("Network error")
+        self.mock_api.delete_task.side_effect = requests.exceptions.ConnectionError("Still down")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['success'] is False
+        assert result['created_task_id'] == "new_task456"
+
+    def test_add_fails_reopens_closed_task(self):
+        """Test that a failed add reopens the task that was just closed."""
+        self.mock_api.add_task.side_effect = requests.exceptions.ConnectionError("Network error")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        self.mock_api.uncomplete_task.assert_called_once_with(task_id="task123")
+        assert result['success'] is False
+        assert result['completed_task_id'] is None
+
+    def test_add_fails_and_reopen_fails(self):
+        """Test that a task that could not be reopened is still reported as completed."""
+        self.mock_api.add_task.side_effect = requests.exceptions.ConnectionError("Network error")
+        self.mock_api.uncomplete_task.side_effect = requests.exceptions.ConnectionError("Still down")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        assert result['completed_task_id'] == "task123"
+
+    def test_both_fail_nothing_to_compensate(self):
+        """Test that no compensation runs when neither write took effect."""
+        self.mock_api.complete_task.side_effect = requests.exceptions.ConnectionError("Network error")
+        self.mock_api.add_task.side_effect = requests.exceptions.ConnectionError("Network error")
+
+        result = self.service.complete_and_recreate_task("project123", "Test Task")
+
+        self.mock_api.delete_task.assert_not_called()
+        self.mock_api.uncomplete_task.assert_not_called()
+        assert result['success'] is False
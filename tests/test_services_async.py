@@ -0,0 +1,77 @@
+import asyncio
+import os
+import threading
+from unittest.mock import Mock, patch
+from heidi_todoist.services import TodoistService
+from heidi_todoist.services_async import AsyncTodoistService
+from heidi_todoist.timing import PhaseTimer, timed
+
+
+class TestAsyncTodoistService:
+    """Test cases for AsyncTodoistService."""
+
+    def setup_method(self):
+        """Set up an async service around a TodoistService with a mocked Todoist client."""
+        with patch.dict(os.environ, {'TODOIST_API_TOKEN': 'test_token'}):
+            with patch('heidi_todoist.services.TodoistAPI') as mock_api_class:
+                self.mock_api = Mock()
+                mock_api_class.return_value = self.mock_api
+                self.service = TodoistService()
+        self.mock_api.get_projects.return_value = iter([[Mock(id="project123")]])
+        self.mock_api.complete_task.return_value = True
+        self.mock_api.add_task.return_value = Mock(id="new_task456")
+        self.service.task_index.replace("project123", {"Test Task": "task123"})
+        self.service._calculate_next_due_time = Mock(return_value="2023-01-01T14:30:00")
+
+        self.async_service = AsyncTodoistService(self.service)
+
+    def _run(self, *args, **kwargs):
+        return asyncio.run(self.async_service.complete_and_recreate_task(*args, **kwargs))
+
+    def test_complete_and_recreate_success(self):
+        """Test the same result and index updates as the sync service."""
+        result = self._run("project123", "Test Task")
+
+        assert result == {
+            'success': True,
+            'message': 'Task "Test Task" completed and recreated',
+            'new_task_id': 'new_task456',
+            'new_due_time': '2023-01-01T14:30:00',
+            'completed_task_id': 'task123'
+        }
+        assert self.service.task_index.lookup("project123", "Test Task") == (True, "new_task456")
+
+    def test_passes_modes_through(self):
+        """Test that the lookup and write modes reach the service."""
+        self.service.complete_and_recreate_task = Mock(return_value={'success': True})
+
+        assert self._run("project123", "Test Task", lookup_mode='scan', write_mode='sync') == {'success': True}
+        self.service.complete_and_recreate_task.assert_called_once_with("project123", "Test Task", 'scan', 'sync')
+
+    def test_runs_off_the_event_loop(self):
+        """Test that the blocking service call runs in a worker thread."""
+        threads = []
+
+        def complete(*args):
+            threads.append(threading.current_thread())
+            return {'success': True}
+
+        self.service.complete_and_recreate_task = complete
+        self._run("project123", "Test Task")
+
+        assert threads and threads[0] is not threading.current_thread()
+
+    def test_timings_land_on_caller_timer(self):
+        """Test that phases recorded in the worker thread reach the invocation's timer."""
+        def complete(*args):
+            with timed('lookup'):
+                return {'success': True}
+
+        self.service.complete_and_recreate_task = complete
+
+        async def invoke():
+            with PhaseTimer() as timer:
+                await self.async_service.complete_and_recreate_task("project123", "Test Task")
+            return timer
+
+        assert 'lookup' in asyncio.run(invoke()).phases
@@ -0,0 +1,225 @@
+import socket
+import requests
+from unittest.mock import Mock, patch
+from requests.adapters import HTTPAdapter
+import pytest
+from heidi_todoist.resilience import CircuitBreaker, CircuitOpenError, RateLimitExceeded, RetryPolicy, TokenBucket
+from heidi_todoist.session import (KeepAliveAdapter, TODOIST_API_PREFIX, TodoistAdapter, connection_stats,
+                                   create_session, rate_limit_stats)
+
+
+class TestSession:
+    """Test cases for the session module."""
+
+    def test_create_session_mounts_keepalive_adapter(self):
+        """Test that Todoist requests go through the tuned adapter."""
+        session = create_session(pool_maxsize=7)
+
+        adapter = session.get_adapter(TODOIST_API_PREFIX + 'api/v1/tasks')
+        assert isinstance(adapter, KeepAliveAdapter)
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 0
+
+    def test_adapter_enables_tcp_keepalive(self):
+        """Test that pooled connections are created with SO_KEEPALIVE."""
+        adapter = KeepAliveAdapter()
+
+        socket_options = adapter.poolmanager.connection_pool_kw['socket_options']
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in socket_options
+
+    def test_connection_stats_counts_pools(self):
+        """Test that connection and request counts are summed across host pools."""
+        session = requests.Session()
+        pool = Mock(num_connections=1, num_requests=4)
+        adapter = Mock()
+        adapter.poolmanager.pools = {'api.todoist.com': pool}
+        session.adapters = {TODOIST_API_PREFIX: adapter, 'other': Mock(spec=[])}
+
+        result = connection_stats(session)
+
+        assert result == {'connections_opened': 1, 'requests_sent': 4}
+
+
+class TestTodoistAdapter:
+    """Test cases for rate limiting and retries in the Todoist adapter."""
+
+    def setup_method(self):
+        """Set up an adapter with retries and patch out the real send and sleeps."""
+        self.limiter = TokenBucket(rate=100.0, capacity=100)
+        self.adapter = TodoistAdapter(self.limiter, RetryPolicy(max_retries=2))
+        self.send_patcher = patch.object(HTTPAdapter, 'send')
+        self.mock_send = self.send_patcher.start()
+        self.sleep_patcher = patch('heidi_todoist.session.time.sleep')
+        self.mock_sleep = self.sleep_patcher.start()
+
+    def teardown_method(self):
+        """Stop the patches."""
+        self.send_patcher.stop()
+        self.sleep_patcher.stop()
+
+    @staticmethod
+    def _request(method):
+        return requests.Request(method, TODOIST_API_PREFIX + 'api/v1/tasks').prepare()
+
+    @staticmethod
+    def _response(status_code, headers=None):
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = b''
+        response.headers.update(headers or {})
+        return response
+
+    def test_create_session_configures_limiter_and_retries(self):
+        """Test that create_session wires up the rate limit and retry count."""
+        session = create_session(rate_limit=900, rate_burst=5, max_retries=3)
+
+        adapter = session.get_adapter(TODOIST_API_PREFIX)
+        assert adapter.limiter.rate == 1.0
+        assert adapter.limiter.capacity == 5
+        assert adapter.retry_policy.max_retries == 3
+        assert create_session().get_adapter(TODOIST_API_PREFIX).limiter is None
+
+    def test_get_retried_on_5xx(self):
+        """Test that an idempotent request is retried after a transient server error."""
+        self.mock_send.side_effect = [self._response(503), self._response(200)]
+
+        response = self.adapter.send(self._request('GET'))
+
+        assert response.status_code == 200
+        assert self.mock_send.call_count == 2
+        assert self.adapter.retries == 1
+
+    def test_post_not_retried_on_5xx(self):
+        """Test that a write that may have been applied is not sent again."""
+        self.mock_send.return_value = self._response(503)
+
+        response = self.adapter.send(self._request('POST'))
+
+        assert response.status_code == 503
+        assert self.mock_send.call_count == 1
+
+    def test_post_retried_on_429_after_retry_after(self):
+        """Test that a rate-limited write waits out Retry-After through the shared limiter."""
+        self.mock_send.side_effect = [self._response(429, {'Retry-After': '2'}), self._response(200)]
+
+        with patch.object(self.limiter, 'pause', wraps=self.limiter.pause) as mock_pause:
+            response = self.adapter.send(self._request('POST'))
+
+        assert response.status_code == 200
+        mock_pause.assert_called_once_with(2.0)
+
+    def test_gives_up_after_max_retries(self):
+        """Test that the last response is returned once retries are used up."""
+        self.mock_send.return_value = self._response(429)
+
+        response = self.adapter.send(self._request('GET'))
+
+        assert response.status_code == 429
+        assert self.mock_send.call_count == 3
+
+    def test_retry_after_too_long_not_waited(self):
+        """Test that a Retry-After longer than the policy allows returns the 429 instead of sleeping."""
+        self.mock_send.return_value = self._response(429, {'Retry-After': '3600'})
+
+        response = self.adapter.send(self._request('GET'))
+
+        assert response.status_code == 429
+        assert self.mock_send.call_count == 1
+        self.mock_sleep.assert_not_called()
+
+    def test_connection_errors_retried_then_raised(self):
+        """Test that connection failures on reads are retried and then re-raised."""
+        self.mock_send.side_effect = requests.exceptions.ConnectTimeout()
+
+        try:
+            self.adapter.send(self._request('GET'))
+        except requests.exceptions.ConnectTimeout:
+            pass
+
+        assert self.mock_send.call_count == 3
+
+    def test_every_attempt_takes_a_token(self):
+        """Test that retries are paced by the limiter too."""
+        self.mock_send.side_effect = [self._response(503), self._response(200)]
+
+        with patch.object(self.limiter, 'acquire') as mock_acquire:
+            self.adapter.send(self._request('GET'))
+
+        assert mock_acquire.call_count == 2
+
+    def test_rate_limit_stats(self):
+        """Test that retries and limiter state are reported for the session."""
+        session = create_session(rate_limit=900, rate_burst=5)
+
+        assert rate_limit_stats(session) == {'retries': 0, 'tokens': 5, 'waits': 0}
+
+    def test_rate_limit_stats_without_todoist_adapter(self):
+        """Test that a session without the Todoist adapter has no rate limit stats."""
+        assert rate_limit_stats(requests.Session()) == {}
+
+
+class TestTodoistAdapterCircuitBreaker:
+    """Test cases for the circuit breaker in the Todoist adapter."""
+
+    def setup_method(self):
+        """Set up an adapter without retries whose breaker opens after two failures."""
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        self.adapter = TodoistAdapter(breaker=self.breaker)
+        self.send_patcher = patch.object(HTTPAdapter, 'send')
+        self.mock_send = self.send_patcher.start()
+
+    def teardown_method(self):
+        """Stop the patches."""
+        self.send_patcher.stop()
+
+    @staticmethod
+    def _request():
+        return requests.Request('GET', TODOIST_API_PREFIX + 'api/v1/tasks').prepare()
+
+    @staticmethod
+    def _response(status_code):
+        response = requests.Response()
+        response.status_code = status_code
+        return response
+
+    def test_server_errors_open_breaker_and_fail_fast(self):
+        """Test that repeated 5xx responses open the breaker and later calls never reach Todoist."""
+        self.mock_send.return_value = self._response(503)
+        self.adapter.send(self._request())
+        self.adapter.send(self._request())
+
+        with pytest.raises(CircuitOpenError):
+            self.adapter.send(self._request())
+
+        assert self.mock_send.call_count == 2
+
+    def test_timeouts_count_as_failures(self):
+        """Test that timeouts count towards opening the breaker."""
+        self.mock_send.side_effect = requests.exceptions.ReadTimeout()
+
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.ReadTimeout):
+                self.adapter.send(self._request())
+
+        assert self.breaker.state == CircuitBreaker.OPEN
+
+    def test_client_errors_count_as_success(self):
+        """Test that Todoist answering 4xx shows it is up."""
+        self.mock_send.side_effect = [self._response(503), self._response(404), self._response(503)]
+
+        for _ in range(3):
+            self.adapter.send(self._request())
+
+        assert self.breaker.state == CircuitBreaker.CLOSED
+
+    def test_limiter_rejection_releases_trial(self):
+        """Test that a half-open trial turned away by the rate limiter doesn't block the breaker."""
+        self.adapter.limiter = Mock()
+        self.adapter.limiter.acquire.side_effect = RateLimitExceeded(20)
+
+        with patch.object(self.breaker, 'release') as mock_release:
+            with pytest.raises(RateLimitExceeded):
+                self.adapter.send(self._request())
+
+        mock_release.assert_called_once()
+        self.mock_send.assert_not_called()
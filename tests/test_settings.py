@@ -0,0 +1,111 @@
+import json
+import pytest
+from zoneinfo import ZoneInfo
+from heidi_todoist.settings import Settings, get_settings
+
+
+class TestSettings:
+    """Test cases for the Settings class."""
+
+    def test_defaults(self):
+        """Test the defaults used when nothing is configured."""
+        settings = Settings.from_env({})
+
+        assert settings.todoist_api_token is None
+        assert settings.todoist_client_secret is None
+        assert settings.heidi_project_id is None
+        assert settings.timezone == ZoneInfo('America/New_York')
+        assert settings.task_index_ttl == 300
+        assert settings.lookup_mode == 'index'
+        assert settings.write_mode == 'rest'
+        assert settings.mirror_path is None
+        assert settings.idempotency_window == 60
+        assert settings.idempotency_cache_size == 256
+        assert settings.idempotency_store_path is None
+        assert settings.pool_maxsize == 10
+        assert settings.prewarm is False
+        assert settings.timing_header is False
+        assert settings.rate_limit == 1000
+        assert settings.rate_burst == 50
+        assert settings.max_retries == 3
+        assert settings.breaker_failure_threshold == 5
+        assert settings.breaker_reset_timeout == 30
+        assert settings.due_schedule.rules == {}
+        assert settings.project_cache_path is None
+        assert settings.task_cache_path is None
+        assert settings.page_size == 200
+        assert settings.prefetch_pages is True
+        assert settings.prewarm_jitter == 10
+        assert settings.tenants == {}
+        assert settings.client_pool_size == 4
+        assert settings.client_idle_ttl == 3600
+        assert settings.client_pool_memory_mb == 64
+        assert settings.next_due_max_age == 300
+
+    def test_values_from_environment(self):
+        """Test that configured values are parsed."""
+        settings = Settings.from_env({
+            'TODOIST_API_TOKEN': 'token',
+            'HEIDI_PROJECT_ID': 'heidi-123',
+            'TIMEZONE': 'Europe/London',
+            'TASK_INDEX_TTL': '30',
+            'TASK_LOOKUP_MODE': 'mirror',
+            'TASK_WRITE_MODE': 'sync',
+            'TODOIST_POOL_MAXSIZE': '4',
+            'PREWARM_ON_STARTUP': 'True',
+            'TIMING_HEADER': '1',
+            'TODOIST_RATE_LIMIT': '0',
+            'TODOIST_MAX_RETRIES': '1'
+        })
+
+        assert settings.todoist_api_token == 'token'
+        assert settings.heidi_project_id == 'heidi-123'
+        assert settings.timezone == ZoneInfo('Europe/London')
+        assert settings.task_index_ttl == 30.0
+        assert settings.lookup_mode == 'mirror'
+        assert settings.write_mode == 'sync'
+        assert settings.pool_maxsize == 4
+        assert settings.prewarm is True
+        assert settings.timing_header is True
+        assert settings.rate_limit == 0
+        assert settings.max_retries == 1
+
+    def test_pool_sized_for_tenants(self):
+        """Test that the client pool has room for every tenant and the default account."""
+        tenants = {f'tenant{i}': {'token': f'token{i}', 'project_id': 'Heidi', 'key': f'key{i}'} for i in range(6)}
+
+        settings = Settings.from_env({'TENANTS': json.dumps(tenants)})
+
+        assert set(settings.tenants) == set(tenants)
+        assert settings.client_pool_size == 7
+        assert Settings.from_env({'TENANTS': json.dumps(tenants), 'CLIENT_POOL_SIZE': '2'}).client_pool_size == 2
+
+    def test_settings_are_immutable(self):
+        """Test that settings cannot be changed after loading."""
+        settings = Settings.from_env({})
+
+        with pytest.raises(AttributeError):
+            settings.lookup_mode = 'scan'
+
+    @pytest.mark.parametrize('environ, message', [
+        ({'TIMEZONE': 'Mars/Olympus'}, 'TIMEZONE Mars/Olympus is not a valid IANA time zone'),
+        ({'TASK_LOOKUP_MODE': 'bogus'}, 'TASK_LOOKUP_MODE must be one of'),
+        ({'TASK_WRITE_MODE': 'bogus'}, 'TASK_WRITE_MODE must be one of'),
+        ({'TASK_INDEX_TTL': 'soon'}, 'TASK_INDEX_TTL must be a number'),
+        ({'TODOIST_POOL_MAXSIZE': 'many'}, 'TODOIST_POOL_MAXSIZE must be an integer'),
+        ({'DUE_RULES': '{"Feed": {"interval": "soon"}}'}, 'DUE_RULES Feed interval must be a number of hours'),
+        ({'TASK_PAGE_SIZE': '500'}, 'TASK_PAGE_SIZE must be between 1 and 200'),
+        ({'TENANTS': '{"alex": {}}'}, 'TENANTS alex token must be a non-empty string'),
+        ({'CLIENT_POOL_SIZE': '0'}, 'CLIENT_POOL_SIZE must be at least 1'),
+        ({'IDEMPOTENCY_CACHE_SIZE': 'abc'}, 'IDEMPOTENCY_CACHE_SIZE must be an integer'),
+        ({'IDEMPOTENCY_CACHE_SIZE': '0'}, 'IDEMPOTENCY_CACHE_SIZE must be at least 1'),
+        ({'CLIENT_POOL_MEMORY_MB': 'lots'}, 'CLIENT_POOL_MEMORY_MB must be a number'),
+    ])
+    def test_invalid_values(self, environ, message):
+        """Test that invalid configuration is rejected when loading."""
+        with pytest.raises(ValueError, match=message):
+            Settings.from_env(environ)
+
+    def test_get_settings_loads_once(self):
+        """Test that the process-wide settings are cached."""
+        assert get_settings() is get_settings()
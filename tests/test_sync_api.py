@@ -0,0 +1,78 @@
+import json
+import pytest
+import requests
+from unittest.mock import Mock
+from heidi_todoist.sync_api import SYNC_URL, SyncClient, add_command, close_command, command_error, format_due
+
+
+class TestSyncApi:
+    """Test cases for the sync_api module."""
+
+    def test_format_due_aware_converts_to_utc(self):
+        """Test that a zoned due time is sent as UTC."""
+        assert format_due('2023-01-01T14:30:00-05:00') == {'date': '2023-01-01T19:30:00Z'}
+
+    def test_format_due_naive_is_floating(self):
+        """Test that a naive due time is sent as a floating date."""
+        assert format_due('2023-01-01T14:30:00') == {'date': '2023-01-01T14:30:00'}
+
+    def test_close_command(self):
+        """Test item_close command construction."""
+        command = close_command('task123')
+        assert command['type'] == 'item_close'
+        assert command['args'] == {'id': 'task123'}
+        assert command['uuid']
+
+    def test_add_command(self):
+        """Test item_add command construction with a temp id."""
+        command = add_command('Test Task', 'project123', '2023-01-01T14:30:00')
+        assert command['type'] == 'item_add'
+        assert command['temp_id'] != command['uuid']
+        assert command['args'] == {
+            'content': 'Test Task',
+            'project_id': 'project123',
+            'due': {'date': '2023-01-01T14:30:00'}
+        }
+
+    def test_command_error(self):
+        """Test interpretation of sync_status entries."""
+        command = {'uuid': 'abc'}
+        assert command_error({'abc': 'ok'}, command) is None
+        assert command_error({'abc': {'error': 'Item not found', 'error_code': 22}}, command) == 'Item not found'
+        assert command_error({'abc': {'error_code': 22}}, command) == "{'error_code': 22}"
+        assert command_error({}, command) == 'No status returned for command'
+
+    def test_execute_posts_commands_once(self):
+        """Test that all commands go out in one authenticated request."""
+        session = Mock()
+        session.post.return_value.json.return_value = {'sync_status': {}}
+        client = SyncClient(session, 'test_token')
+        commands = [close_command('task123')]
+
+        result = client.execute(commands)
+
+        assert result == {'sync_status': {}}
+        session.post.assert_called_once()
+        args, kwargs = session.post.call_args
+        assert args == (SYNC_URL,)
+        assert kwargs['headers'] == {'Authorization': 'Bearer test_token'}
+        assert json.loads(kwargs['data']['commands']) == commands
+
+    def test_execute_raises_http_error(self):
+        """Test that HTTP failures surface as requests exceptions."""
+        session = Mock()
+        session.post.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError('Bad Gateway')
+        client = SyncClient(session, 'test_token')
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.execute([])
+
+    def test_sync_reads_items_since_token(self):
+        """Test that an incremental read sends the sync token and resource types."""
+        session = Mock()
+        session.post.return_value.json.return_value = {'sync_token': 'next'}
+        client = SyncClient(session, 'test_token')
+
+        assert client.sync('token1') == {'sync_token': 'next'}
+        kwargs = session.post.call_args.kwargs
+        assert kwargs['data'] == {'sync_token': 'token1', 'resource_types': '["items"]'}
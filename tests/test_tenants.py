@@ -0,0 +1,72 @@
+import json
+import pytest
+from heidi_todoist.tenants import Tenant, TenantAuthError, authenticate, load_tenants
+
+TENANTS = {
+    'alex': {'token': 'token_a', 'project_id': 'heidi-6cvcJh2HrqCMxvcF', 'key': 'alex-key'},
+    'sam': {'token': 'token_b', 'project_id': 'Heidi', 'key': 'sam-key'}
+}
+
+
+class TestLoadTenants:
+    """Test cases for parsing the TENANTS setting."""
+
+    def test_unset(self):
+        """Test that no TENANTS means no tenants."""
+        assert load_tenants(None) == {}
+        assert load_tenants('  ') == {}
+
+    def test_json(self):
+        """Test that tenants are parsed from inline JSON."""
+        tenants = load_tenants(json.dumps(TENANTS))
+
+        assert tenants['alex'] == Tenant('alex', 'token_a', 'heidi-6cvcJh2HrqCMxvcF', 'alex-key')
+        assert tenants['sam'].project_id == 'Heidi'
+
+    def test_file(self, tmp_path):
+        """Test that tenants are read from a file path."""
+        path = tmp_path / 'tenants.json'
+        path.write_text(json.dumps(TENANTS))
+
+        assert set(load_tenants(str(path))) == {'alex', 'sam'}
+
+    def test_secrets_not_in_repr(self):
+        """Test that a logged tenant does not leak its token or key."""
+        text = repr(load_tenants(json.dumps(TENANTS))['alex'])
+
+        assert 'token_a' not in text
+        assert 'alex-key' not in text
+
+    @pytest.mark.parametrize('value, message', [
+        ('{not json', 'TENANTS must be a JSON object'),
+        ('{"alex": "token_a"}', 'TENANTS must be a JSON object'),
+        ('/missing/tenants.json', 'TENANTS file /missing/tenants.json could not be read'),
+        ('{"alex": {"token": "t", "project_id": "p"}}', 'TENANTS alex key must be a non-empty string'),
+        ('{"alex": {"token": "t", "project_id": "p", "key": "k", "name": "Alex"}}', 'TENANTS alex has unknown fields'),
+    ])
+    def test_invalid(self, value, message):
+        """Test that an invalid configuration is rejected when loading."""
+        with pytest.raises(ValueError, match=message):
+            load_tenants(value)
+
+
+class TestAuthenticate:
+    """Test cases for authenticating a request as a tenant."""
+
+    def setup_method(self):
+        """Set up the configured tenants before each test method."""
+        self.tenants = load_tenants(json.dumps(TENANTS))
+
+    def test_valid_key(self):
+        """Test that the tenant's own key authenticates it."""
+        assert authenticate(self.tenants, 'sam', 'sam-key').token == 'token_b'
+
+    @pytest.mark.parametrize('tenant_id, key', [
+        ('sam', 'alex-key'),
+        ('sam', None),
+        ('unknown', 'sam-key'),
+    ])
+    def test_rejected(self, tenant_id, key):
+        """Test that a wrong or missing key and an unknown tenant are rejected alike."""
+        with pytest.raises(TenantAuthError, match='Invalid X-Tenant-ID or X-Tenant-Key'):
+            authenticate(self.tenants, tenant_id, key)
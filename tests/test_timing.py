@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import threading
+from unittest.mock import Mock
+from heidi_todoist.timing import PhaseTimer, count, timed
+
+
+class TestPhaseTimer:
+    """Test cases for the PhaseTimer class."""
+
+    def test_phases_and_counters_recorded_while_active(self):
+        """Test that timed() and count() record onto the active timer."""
+        with PhaseTimer() as timer:
+            with timed('lookup'):
+                count('pages')
+                count('pages', 2)
+
+        assert timer.phases['lookup'] >= 0
+        assert timer.counters == {'pages': 3}
+
+    def test_no_active_timer_is_a_no_op(self):
+        """Test that timed() and count() do nothing outside an invocation."""
+        with timed('lookup'):
+            count('pages')
+
+    def test_repeated_phase_accumulates(self):
+        """Test that a phase entered twice reports the combined time."""
+        timer = PhaseTimer()
+        with timer.phase('close'):
+            pass
+        first = timer.phases['close']
+        with timer.phase('close'):
+            pass
+
+        assert timer.phases['close'] >= first
+
+    def test_timer_removed_on_exit(self):
+        """Test that phases after the invocation are not recorded."""
+        with PhaseTimer() as timer:
+            pass
+        count('pages')
+
+        assert timer.counters == {}
+
+    def test_dimensions(self):
+        """Test the flat custom dimensions shape."""
+        timer = PhaseTimer()
+        timer.phases['add'] = 12.345
+        timer.count('pages', 2)
+
+        dimensions = timer.dimensions(route='completeTask')
+
+        assert dimensions['add_ms'] == 12.35
+        assert dimensions['pages'] == 2
+        assert dimensions['route'] == 'completeTask'
+        assert 'total_ms' in dimensions
+
+    def test_log_puts_json_in_message(self):
+        """Test that the timings can be parsed back out of the message text."""
+        timer = PhaseTimer()
+        timer.count('pages', 2)
+        logger = Mock(spec=logging.Logger)
+
+        timer.log(logger, 'completeTask timings', status_code=None)
+
+        message = logger.info.call_args.args[0]
+        assert message.startswith('completeTask timings: ')
+        dimensions = json.loads(message.removeprefix('completeTask timings: '))
+        assert dimensions == logger.info.call_args.kwargs['extra']['custom_dimensions']
+        assert dimensions['pages'] == 2
+        assert dimensions['status_code'] is None
+
+    def test_server_timing(self):
+        """Test the Server-Timing header format."""
+        timer = PhaseTimer()
+        timer.phases['lookup'] = 3.21
+        timer.phases['add'] = 40.0
+
+        header = timer.server_timing()
+
+        assert header.startswith('lookup;dur=3.2, add;dur=40.0, total;dur=')
+
+    def test_awaited_tasks_record_onto_caller_timer(self):
+        """Test that gathered coroutines and to_thread calls share the invocation's timer."""
+        async def invocation():
+            with PhaseTimer() as timer:
+                async def close():
+                    with timed('close'):
+                        await asyncio.sleep(0)
+
+                await asyncio.gather(close(), asyncio.to_thread(count, 'pages'))
+            return timer
+
+        timer = asyncio.run(invocation())
+
+        assert 'close' in timer.phases
+        assert timer.counters == {'pages': 1}
+
+    def test_concurrent_invocations_are_isolated(self):
+        """Test that invocations on different threads keep separate timers."""
+        timers = []
+
+        def invocation(pages):
+            with PhaseTimer() as timer:
+                count('pages', pages)
+            timers.append(timer)
+
+        threads = [threading.Thread(target=invocation, args=(pages,)) for pages in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(timer.counters['pages'] for timer in timers) == [1, 2]
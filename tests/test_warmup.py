@@ -0,0 +1,106 @@
+import os
+import pytest
+from unittest.mock import Mock, patch
+from heidi_todoist.projects import ProjectNotFoundError
+from heidi_todoist.warmup import keep_warm, prewarm, start_prewarm
+
+
+class TestWarmup:
+    """Test cases for the warmup module."""
+
+    def test_prewarm_opens_connection_on_pooled_session(self):
+        """Test that pre-warming builds the pooled service and sends one request on its session."""
+        service = Mock()
+        service.session.head.return_value = Mock(status_code=404)
+
+        with patch('heidi_todoist.pool.get_todoist_service', return_value=service):
+            prewarm()
+
+        service.session.head.assert_called_once()
+        assert service.session.head.call_args.args[0] == 'https://api.todoist.com/api/v1/'
+        service.session.head.return_value.close.assert_called_once()
+
+    def test_prewarm_resolves_configured_project(self):
+        """Test that pre-warming resolves HEIDI_PROJECT_ID so the first request does not."""
+        service = Mock()
+
+        with patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'heidi-6cvcJh2HrqCMxvcF'}, clear=True):
+            with patch('heidi_todoist.pool.get_todoist_service', return_value=service):
+                prewarm()
+
+        service.resolve_project_id.assert_called_once_with('heidi-6cvcJh2HrqCMxvcF')
+
+    def test_prewarm_logs_invalid_project(self):
+        """Test that a project id matching no project is reported at startup."""
+        service = Mock()
+        service.resolve_project_id.side_effect = ProjectNotFoundError('Project heidi-nope not found among 3 Todoist projects')
+
+        with patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'heidi-nope'}, clear=True):
+            with patch('heidi_todoist.pool.get_todoist_service', return_value=service):
+                with patch('heidi_todoist.warmup.logger') as mock_logger:
+                    prewarm()
+
+        mock_logger.error.assert_called_once_with(
+            'HEIDI_PROJECT_ID is invalid: Project heidi-nope not found among 3 Todoist projects'
+        )
+
+    def test_keep_warm_refreshes_project(self):
+        """Test that keep-warm refreshes the configured project without an extra connection request."""
+        service = Mock()
+        service.refresh_project.return_value = {'project_id': 'p1', 'lookup_mode': 'index', 'refreshed': True}
+
+        with patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'heidi-p1'}, clear=True):
+            with patch('heidi_todoist.pool.get_todoist_service', return_value=service):
+                assert keep_warm()['refreshed'] is True
+
+        service.refresh_project.assert_called_once_with('heidi-p1')
+        service.session.head.assert_not_called()
+
+    def test_keep_warm_keeps_connection_open_when_unchanged(self):
+        """Test that keep-warm still touches the connection when the refresh had nothing to do."""
+        service = Mock()
+        service.refresh_project.return_value = {'project_id': 'p1', 'lookup_mode': 'index', 'refreshed': False}
+
+        with patch.dict(os.environ, {'HEIDI_PROJECT_ID': 'heidi-p1'}, clear=True):
+            with patch('heidi_todoist.pool.get_todoist_service', return_value=service):
+                keep_warm()
+
+        service.session.head.assert_called_once()
+
+    def test_keep_warm_without_project(self):
+        """Test that keep-warm refuses to run without HEIDI_PROJECT_ID rather than refreshing nothing."""
+        with patch.dict(os.environ, {}, clear=True):
+            with patch('heidi_todoist.pool.get_todoist_service') as mock_get_service:
+                with pytest.raises(ValueError, match='HEIDI_PROJECT_ID not configured'):
+                    keep_warm()
+
+        mock_get_service.assert_not_called()
+
+    def test_start_prewarm_disabled_by_default(self):
+        """Test that nothing runs unless PREWARM_ON_STARTUP is set."""
+        with patch.dict(os.environ, {}, clear=True):
+            assert start_prewarm() is None
+
+    def test_start_prewarm_runs_in_background(self):
+        """Test that pre-warming runs on a background thread."""
+        with patch.dict(os.environ, {'PREWARM_ON_STARTUP': 'true'}):
+            with patch('heidi_todoist.warmup.prewarm') as mock_prewarm:
+                thread = start_prewarm()
+                thread.join(timeout=5)
+
+                mock_prewarm.assert_called_once()
+        assert thread.daemon is True
+
+    def test_start_prewarm_failure_is_logged(self):
+        """Test that a failed pre-warm never raises out of the background thread."""
+        with patch.dict(os.environ, {'PREWARM_ON_STARTUP': 'true'}):
+            with patch('heidi_todoist.warmup.prewarm', side_effect=ValueError('TODOIST_API_TOKEN environment variable not set')):
+                with patch('heidi_todoist.warmup.logger') as mock_logger:
+                    start_prewarm().join(timeout=5)
+
+                    mock_logger.warning.assert_called_once()
+
+    def test_start_prewarm_invalid_settings(self):
+        """Test that invalid settings skip pre-warming instead of failing app start."""
+        with patch.dict(os.environ, {'TASK_LOOKUP_MODE': 'bogus'}):
+            assert start_prewarm() is None
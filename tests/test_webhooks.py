@@ -0,0 +1,103 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+from heidi_todoist.cache import TaskIndex
+from heidi_todoist.webhooks import apply_task_event, sign, verify_signature
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'webhooks')
+
+PROJECT_ID = '6cvcJh2HrqCMxvcF'
+TASK_ID = '6X7rM8997g3RQmvh'
+
+
+def load_fixture(name: str) -> dict:
+    """Return a recorded webhook payload."""
+    with open(os.path.join(FIXTURES, name)) as fixture_file:
+        return json.load(fixture_file)
+
+
+class TestSignature:
+    """Test cases for webhook signature checks."""
+
+    def test_sign_matches_todoist(self):
+        """Test that the signature is base64 of the body's HMAC-SHA256 with the client secret."""
+        expected = base64.b64encode(hmac.new(b'secret', b'{"a": 1}', hashlib.sha256).digest()).decode()
+
+        assert sign(b'{"a": 1}', 'secret') == expected
+
+    def test_verify_signature(self):
+        """Test that only the signature of the exact body with the right secret is accepted."""
+        body = b'{"event_name": "item:added"}'
+
+        assert verify_signature(body, sign(body, 'secret'), 'secret') is True
+        assert verify_signature(body + b' ', sign(body, 'secret'), 'secret') is False
+        assert verify_signature(body, sign(body, 'other'), 'secret') is False
+        assert verify_signature(body, None, 'secret') is False
+        assert verify_signature(body, '', 'secret') is False
+
+
+class TestApplyTaskEvent:
+    """Test cases for applying recorded webhook events to the task index."""
+
+    def setup_method(self):
+        """Set up a loaded index for the project in the recorded payloads."""
+        self.index = TaskIndex()
+        self.index.replace(PROJECT_ID, {'Walk Heidi': 'walk1'})
+
+    def _apply(self, fixture: str) -> bool:
+        payload = load_fixture(fixture)
+        return apply_task_event(self.index, payload['event_name'], payload['event_data'])
+
+    def test_added(self):
+        """Test that an added task becomes resolvable by name."""
+        assert self._apply('item_added.json') is True
+
+        assert self.index.lookup(PROJECT_ID, 'Feed Heidi') == (True, TASK_ID)
+        assert self.index.lookup_due(PROJECT_ID, 'Feed Heidi', 60)['due'] == '2025-01-01T18:00:00'
+
+    def test_added_twice_is_idempotent(self):
+        """Test that a redelivered event changes nothing the second time."""
+        self._apply('item_added.json')
+
+        assert self._apply('item_added.json') is False
+
+    def test_updated_renames(self):
+        """Test that a renamed task moves to its new name."""
+        self._apply('item_added.json')
+
+        assert self._apply('item_updated.json') is True
+
+        assert self.index.lookup(PROJECT_ID, 'Feed Heidi') == (True, None)
+        assert self.index.lookup(PROJECT_ID, 'Feed Heidi dinner') == (True, TASK_ID)
+
+    def test_completed_and_deleted_remove(self):
+        """Test that completed and deleted tasks are dropped, whatever name they were indexed under."""
+        self._apply('item_added.json')
+        assert self._apply('item_completed.json') is True
+        assert self.index.lookup(PROJECT_ID, 'Feed Heidi') == (True, None)
+
+        self._apply('item_added.json')
+        assert self._apply('item_deleted.json') is True
+        assert self.index.lookup(PROJECT_ID, 'Feed Heidi') == (True, None)
+
+    def test_update_that_completes_removes(self):
+        """Test that an update carrying checked drops the task."""
+        self._apply('item_added.json')
+        payload = load_fixture('item_updated.json')
+        payload['event_data']['checked'] = True
+
+        assert apply_task_event(self.index, 'item:updated', payload['event_data']) is True
+        assert self.index.entries(PROJECT_ID) == {'Walk Heidi': 'walk1'}
+
+    def test_other_events_ignored(self):
+        """Test that events about comments, projects etc. are ignored."""
+        assert self._apply('note_added.json') is False
+        assert self.index.entries(PROJECT_ID) == {'Walk Heidi': 'walk1'}
+
+    def test_unloaded_project_ignored(self):
+        """Test that events for a project that is not indexed change nothing."""
+        self.index.invalidate()
+
+        assert self._apply('item_added.json') is False